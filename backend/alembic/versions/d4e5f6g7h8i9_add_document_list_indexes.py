@@ -0,0 +1,39 @@
+"""Add composite indexes behind the list_documents visibility filter.
+
+Revision ID: d4e5f6g7h8i9
+Revises: c3d4e5f6g7h8
+Create Date: 2026-10-15
+
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "d4e5f6g7h8i9"
+down_revision = "c3d4e5f6g7h8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # list_documents filters on (is_archived, is_personal, level) and ORs in
+    # uploaded_by; INCLUDE keeps the commonly projected columns in the leaf.
+    op.create_index(
+        "ix_documents_list",
+        "documents",
+        ["is_archived", "is_personal", "level", "uploaded_by"],
+        postgresql_include=["subject_id", "created_at"],
+        if_not_exists=True,
+    )
+    # "shared with me" EXISTS probe: look up by recipient, then document.
+    op.create_index(
+        "ix_document_shares_user_document",
+        "document_shares",
+        ["shared_with_user_id", "document_id"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_document_shares_user_document", table_name="document_shares", if_exists=True)
+    op.drop_index("ix_documents_list", table_name="documents", if_exists=True)
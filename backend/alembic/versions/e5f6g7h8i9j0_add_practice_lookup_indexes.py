@@ -0,0 +1,50 @@
+"""Add indexes behind the practice question/document lookups.
+
+Revision ID: e5f6g7h8i9j0
+Revises: d4e5f6g7h8i9
+Create Date: 2026-10-15
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers
+revision = "e5f6g7h8i9j0"
+down_revision = "d4e5f6g7h8i9"
+branch_labels = None
+depends_on = None
+
+_COMPLETED = sa.text("ingestion_status = 'COMPLETED'")
+
+
+def upgrade() -> None:
+    # start/next only look at ingested documents of a subject, matched by
+    # FK or (for unlinked documents) by subject name + level.
+    op.create_index(
+        "ix_documents_subject_completed",
+        "documents",
+        ["subject_id"],
+        postgresql_where=_COMPLETED,
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_documents_subject_level_completed",
+        "documents",
+        ["subject", "level"],
+        postgresql_where=_COMPLETED,
+        if_not_exists=True,
+    )
+    # Question.document_id IN (...) when picking the next question.
+    op.create_index(
+        "ix_questions_document_id",
+        "questions",
+        ["document_id"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_questions_document_id", table_name="questions", if_exists=True)
+    op.drop_index("ix_documents_subject_level_completed", table_name="documents", if_exists=True)
+    op.drop_index("ix_documents_subject_completed", table_name="documents", if_exists=True)
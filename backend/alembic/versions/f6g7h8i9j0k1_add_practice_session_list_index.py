@@ -0,0 +1,33 @@
+"""Add an index for keyset pagination of practice sessions.
+
+Revision ID: f6g7h8i9j0k1
+Revises: e5f6g7h8i9j0
+Create Date: 2026-10-15
+
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "f6g7h8i9j0k1"
+down_revision = "e5f6g7h8i9j0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # GET /api/practice seeks by (created_at, id) within one student's sessions.
+    op.create_index(
+        "ix_practice_sessions_student_created",
+        "practice_sessions",
+        ["student_id", "created_at", "id"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_practice_sessions_student_created",
+        table_name="practice_sessions",
+        if_exists=True,
+    )
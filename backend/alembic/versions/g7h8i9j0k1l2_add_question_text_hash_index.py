@@ -0,0 +1,30 @@
+"""Add a hash index for question text duplicate checks.
+
+Revision ID: g7h8i9j0k1l2
+Revises: f6g7h8i9j0k1
+Create Date: 2026-10-15
+
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "g7h8i9j0k1l2"
+down_revision = "f6g7h8i9j0k1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Question.text IN (...) when de-duplicating RAG-generated questions.
+    op.create_index(
+        "ix_questions_text_hash",
+        "questions",
+        ["text"],
+        postgresql_using="hash",
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_questions_text_hash", table_name="questions", if_exists=True)
@@ -0,0 +1,31 @@
+"""Store question options as a JSONB array instead of a "|"-joined string.
+
+Revision ID: h8i9j0k1l2m3
+Revises: g7h8i9j0k1l2
+Create Date: 2026-10-15
+
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "h8i9j0k1l2m3"
+down_revision = "g7h8i9j0k1l2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE questions ALTER COLUMN options TYPE jsonb "
+        "USING CASE WHEN options IS NULL OR options = '' THEN NULL "
+        "ELSE to_jsonb(string_to_array(options, '|')) END"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "ALTER TABLE questions ALTER COLUMN options TYPE text "
+        "USING CASE WHEN options IS NULL THEN NULL "
+        "ELSE array_to_string(ARRAY(SELECT jsonb_array_elements_text(options)), '|') END"
+    )
@@ -0,0 +1,29 @@
+"""Add an index on document filenames.
+
+Revision ID: i9j0k1l2m3n4
+Revises: h8i9j0k1l2m3
+Create Date: 2026-10-15
+
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "i9j0k1l2m3n4"
+down_revision = "h8i9j0k1l2m3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Document.filename IN (...) when resolving RAG source references.
+    op.create_index(
+        "ix_documents_filename",
+        "documents",
+        ["filename"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_documents_filename", table_name="documents", if_exists=True)
@@ -0,0 +1,29 @@
+"""Add progress_applied_at column to practice_sessions table.
+
+Revision ID: j0k1l2m3n4o5
+Revises: i9j0k1l2m3n4
+Create Date: 2026-10-16
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers
+revision = "j0k1l2m3n4o5"
+down_revision = "i9j0k1l2m3n4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Not backfilled: a session auto-completed by its last answer has not
+    # been through /complete yet, so its progress may still be unapplied.
+    op.add_column(
+        "practice_sessions",
+        sa.Column("progress_applied_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("practice_sessions", "progress_applied_at")
@@ -0,0 +1,47 @@
+"""Add indexes behind quiz generation and weak-topic lookups.
+
+Revision ID: k1l2m3n4o5p6
+Revises: j0k1l2m3n4o5
+Create Date: 2026-10-16
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers
+revision = "k1l2m3n4o5p6"
+down_revision = "j0k1l2m3n4o5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Progress.student_id = ? AND accuracy < WEAK_TOPIC_THRESHOLD.
+    op.create_index(
+        "ix_progress_student_accuracy",
+        "progress",
+        ["student_id", "accuracy"],
+        if_not_exists=True,
+    )
+    # Question.topic_id IN (...) for topic-focused and adaptive quizzes.
+    op.create_index(
+        "ix_questions_topic_id",
+        "questions",
+        ["topic_id"],
+        if_not_exists=True,
+    )
+    # Latest ingested document: ORDER BY created_at DESC LIMIT 1.
+    op.create_index(
+        "ix_documents_completed_created",
+        "documents",
+        ["created_at"],
+        postgresql_where=sa.text("ingestion_status = 'COMPLETED'"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_documents_completed_created", table_name="documents", if_exists=True)
+    op.drop_index("ix_questions_topic_id", table_name="questions", if_exists=True)
+    op.drop_index("ix_progress_student_accuracy", table_name="progress", if_exists=True)
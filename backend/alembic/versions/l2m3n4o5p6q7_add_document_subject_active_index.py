@@ -0,0 +1,32 @@
+"""Add a partial index for per-subject document counts.
+
+Revision ID: l2m3n4o5p6q7
+Revises: k1l2m3n4o5p6
+Create Date: 2026-10-16
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers
+revision = "l2m3n4o5p6q7"
+down_revision = "k1l2m3n4o5p6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Subject listings count documents by subject + level, skipping
+    # archived ones. student_subjects already has uq_student_subject.
+    op.create_index(
+        "ix_documents_subject_level_active",
+        "documents",
+        ["subject", "level"],
+        postgresql_where=sa.text("is_archived = false"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_documents_subject_level_active", table_name="documents", if_exists=True)
@@ -0,0 +1,50 @@
+"""Link documents to their subject rows and index them by subject_id.
+
+Revision ID: m3n4o5p6q7r8
+Revises: l2m3n4o5p6q7
+Create Date: 2026-10-16
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers
+revision = "m3n4o5p6q7r8"
+down_revision = "l2m3n4o5p6q7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Subject pages now filter on the subject_id FK instead of the text
+    # subject + level columns; link documents uploaded before their subject.
+    op.execute(
+        """
+        UPDATE documents d
+        SET subject_id = s.id
+        FROM subjects s
+        WHERE d.subject_id IS NULL
+          AND d.subject = s.name
+          AND d.level = s.level
+        """
+    )
+    op.drop_index("ix_documents_subject_level_active", table_name="documents", if_exists=True)
+    op.create_index(
+        "ix_documents_subject_active",
+        "documents",
+        ["subject_id"],
+        postgresql_where=sa.text("is_archived = false"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_documents_subject_active", table_name="documents", if_exists=True)
+    op.create_index(
+        "ix_documents_subject_level_active",
+        "documents",
+        ["subject", "level"],
+        postgresql_where=sa.text("is_archived = false"),
+        if_not_exists=True,
+    )
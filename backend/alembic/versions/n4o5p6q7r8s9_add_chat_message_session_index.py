@@ -0,0 +1,30 @@
+"""Index chat messages by session.
+
+Revision ID: n4o5p6q7r8s9
+Revises: m3n4o5p6q7r8
+Create Date: 2026-10-16
+
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "n4o5p6q7r8s9"
+down_revision = "m3n4o5p6q7r8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Chat transcripts load messages per session in created_at order and
+    # the session list counts them per session.
+    op.create_index(
+        "ix_chat_messages_session_created",
+        "chat_messages",
+        ["session_id", "created_at"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_messages_session_created", table_name="chat_messages", if_exists=True)
@@ -6,15 +6,12 @@ from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.api.deps import get_current_user
 from app.db.models import (
     Attempt,
     AttemptAnswer,
-    Document,
-    IngestionStatusEnum,
-    Progress,
     Question,
     Quiz,
     QuizQuestion,
@@ -22,8 +19,11 @@ from app.db.models import (
 )
 from app.db.session import get_db
 from app.schemas.attempt import AttemptRead, AttemptSubmit, TopicScore, AttemptDetailRead, AttemptAnswerRead
+from app.services.doc_lookup import get_latest_collection
 from app.services.rag_client import get_rag_client
 from app.services.grading import grade_answer
+from app.services.progress_cache import invalidate_progress
+from app.services.progress_updates import apply_topic_tallies
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -128,33 +128,18 @@ def submit_attempt(
 
     # ── Update per‑topic Progress rows ───────────────────────────────────
     # This enables the system to identify weak topics for adaptive learning
-    for topic_name, tally in topic_tallies.items():
-        if tally["topic_id"] is None:
-            continue
-        prog = (
-            db.query(Progress)
-            .filter(
-                Progress.student_id == current_user.id,
-                Progress.topic_id == tally["topic_id"],
-            )
-            .first()
-        )
-        if prog is None:
-            prog = Progress(student_id=current_user.id, topic_id=tally["topic_id"])
-            db.add(prog)
-            db.flush()
-
-        prog.total_correct += tally["correct"]
-        prog.total_questions += tally["total"]
-        prog.attempt_count += 1
-        prog.accuracy = (
-            round(prog.total_correct / prog.total_questions, 4)
-            if prog.total_questions
-            else 0.0
-        )
-        prog.last_attempted_at = datetime.now(timezone.utc)
+    apply_topic_tallies(
+        db,
+        current_user.id,
+        {
+            t["topic_id"]: (t["correct"], t["total"])
+            for t in topic_tallies.values()
+            if t["topic_id"] is not None
+        },
+    )
 
     db.commit()
+    invalidate_progress(current_user.id)
     db.refresh(attempt)
 
     # ── Build response ───────────────────────────────────────────────────
@@ -191,6 +176,7 @@ def list_attempts(
     """List the current student's past attempts."""
     rows = (
         db.query(Attempt)
+        .options(selectinload(Attempt.answers))
         .filter(Attempt.student_id == current_user.id)
         .order_by(Attempt.submitted_at.desc())
         .offset(skip)
@@ -273,7 +259,7 @@ def get_attempt(
                 correct_answer=q.correct_answer,
                 is_correct=aa.is_correct,
                 topic=topic_name,
-                options=q.options.split("|") if q.options else None,
+                options=q.options or None,
             )
         )
         bucket = topic_tallies.setdefault(topic_name, {"correct": 0, "total": 0})
@@ -310,15 +296,8 @@ def get_attempt(
 
 def _get_best_collection(db: Session) -> str | None:
     """Find the most recent ingested collection name."""
-    doc = (
-        db.query(Document)
-        .filter(Document.ingestion_status == IngestionStatusEnum.COMPLETED)
-        .order_by(Document.created_at.desc())
-        .first()
-    )
-    if doc:
-        return f"{doc.level.value}_{doc.subject}".replace(" ", "_")
-    return None
+    latest = get_latest_collection(db)
+    return latest[0] if latest else None
 
 
 def _build_attempt_summary(attempt: Attempt) -> str:
@@ -336,7 +315,7 @@ def _build_attempt_summary(attempt: Attempt) -> str:
         lines.append(f"\nQ{i} [{topic}] ({status_icon} {'Correct' if aa.is_correct else 'Wrong'}):")
         lines.append(f"  Question: {q.text}")
         if q.options:
-            for j, opt in enumerate(q.options.split("|")):
+            for j, opt in enumerate(q.options):
                 letter = chr(65 + j)
                 lines.append(f"    {letter}. {opt}")
         lines.append(f"  Student answered: {aa.answer}")
@@ -501,7 +480,7 @@ def explain_question_with_ai(
     # Build question context
     q_context = f"Question (Topic: {topic}):\n{q.text}\n"
     if q.options:
-        for j, opt in enumerate(q.options.split("|")):
+        for j, opt in enumerate(q.options):
             letter = chr(65 + j)
             q_context += f"  {letter}. {opt}\n"
     else:
@@ -573,7 +552,7 @@ def explain_question_with_ai(
                     f"but the correct answer is '{q.correct_answer}'.\n")
     if q.options:
         lines.append("### Options breakdown:")
-        for j, opt in enumerate(q.options.split("|")):
+        for j, opt in enumerate(q.options):
             letter = chr(65 + j)
             marker = "✓" if q.correct_answer and q.correct_answer.upper() == letter else ""
             lines.append(f"- **{letter}.** {opt} {marker}")
@@ -15,6 +15,8 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
+from pydantic_core import to_json
+from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
 from app.api.deps import get_current_user
@@ -69,15 +71,23 @@ class SessionDetailResponse(SessionResponse):
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
 
-def _session_to_response(session: ChatSession, include_messages: bool = False):
-    """Convert ORM model to response dict."""
+def _session_to_response(
+    session: ChatSession,
+    include_messages: bool = False,
+    message_count: int | None = None,
+):
+    """Convert ORM model to response dict.
+
+    Pass ``message_count`` when it is already known to avoid loading the
+    session's messages just to count them.
+    """
     base = {
         "id": str(session.id),
         "collection": session.collection,
         "title": session.title,
         "created_at": session.created_at.isoformat(),
         "updated_at": session.updated_at.isoformat(),
-        "message_count": len(session.messages),
+        "message_count": len(session.messages) if message_count is None else message_count,
     }
     if include_messages:
         base["messages"] = [
@@ -112,7 +122,7 @@ def create_session(
     db.commit()
     db.refresh(session)
     logger.info("Created chat session %s for user %s", session.id, current_user.id)
-    return _session_to_response(session)
+    return _session_to_response(session, message_count=0)
 
 
 @router.get("/sessions")
@@ -124,17 +134,20 @@ def list_sessions(
     db: Session = Depends(get_db),
 ):
     """List the current user's chat sessions, newest first."""
-    q = (
-        db.query(ChatSession)
-        .options(joinedload(ChatSession.messages))
-        .filter(ChatSession.user_id == current_user.id)
-    )
+    q = db.query(ChatSession).filter(ChatSession.user_id == current_user.id)
     if collection:
         q = q.filter(ChatSession.collection == collection)
     sessions = (
         q.order_by(ChatSession.updated_at.desc()).offset(skip).limit(limit).all()
     )
-    return [_session_to_response(s) for s in sessions]
+    # Listings only show a count, so don't load message bodies
+    counts = dict(
+        db.query(ChatMessage.session_id, func.count(ChatMessage.id))
+        .filter(ChatMessage.session_id.in_([s.id for s in sessions]))
+        .group_by(ChatMessage.session_id)
+        .all()
+    ) if sessions else {}
+    return [_session_to_response(s, message_count=counts.get(s.id, 0)) for s in sessions]
 
 
 @router.get("/sessions/{session_id}")
@@ -194,7 +207,7 @@ def add_message(
         session_id=session.id,
         role=body.role,
         content=body.content,
-        sources_json=json.dumps(body.sources) if body.sources else None,
+        sources_json=to_json(body.sources).decode() if body.sources else None,
     )
     db.add(message)
 
@@ -209,6 +222,6 @@ def add_message(
         "id": str(message.id),
         "role": message.role,
         "content": message.content,
-        "sources": json.loads(message.sources_json) if message.sources_json else None,
+        "sources": body.sources or None,
         "created_at": message.created_at.isoformat(),
     }
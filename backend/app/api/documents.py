@@ -1,31 +1,51 @@
 """Document upload, listing, PDF serving, and sharing routes."""
 
 import logging
+import os
 import threading
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
 from fastapi.responses import FileResponse
-from sqlalchemy import or_
-from sqlalchemy.orm import Session, joinedload, selectinload
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import Boolean, bindparam, exists, func, or_, select, update
+from sqlalchemy.orm import Session, joinedload, load_only, raiseload
 
 from app.api.deps import get_current_user, require_admin
-from app.db.models import Document, DocumentCategoryEnum, DocumentComment, EducationLevelEnum, Subject, User, DocumentShare, RoleEnum
-from app.db.session import get_db
+from app.db.models import (
+    Document,
+    DocumentCategoryEnum,
+    DocumentComment,
+    DocumentShare,
+    EducationLevelEnum,
+    IngestionStatusEnum,
+    RoleEnum,
+    Subject,
+    User,
+    uuid7,
+)
+from app.db.session import dialect_insert, get_db
 from app.schemas.document import (
     DocumentArchiveRequest,
     DocumentCategory,
     DocumentCommentCreate,
     DocumentCommentRead,
     DocumentCommentUpdate,
+    DocumentCreate,
     DocumentRead,
     DocumentShareRequest,
     DocumentShareResponse,
+    DocumentUploadRequest,
     DocumentWithShareInfo,
     EducationLevel,
 )
+from app.services.subject_cache import invalidate_subject_caches
+from app.services.uploads import StreamedUpload, multipart_openapi, stream_upload, validate_form
 from app.tasks import ingest_document
 from app.config import settings
 
@@ -34,19 +54,98 @@ router = APIRouter()
 
 UPLOAD_DIR = Path("uploads")
 
+# Schema enum → ORM enum lookups, so request handlers don't re-validate
+# the enum value on every call.
+_LEVEL_MAP: dict[EducationLevel, EducationLevelEnum] = {
+    lvl: EducationLevelEnum(lvl.value) for lvl in EducationLevel
+}
+_CATEGORY_MAP: dict[DocumentCategory, DocumentCategoryEnum] = {
+    cat: DocumentCategoryEnum(cat.value) for cat in DocumentCategory
+}
+
+# ORM enum → response string, used per row by _doc_to_read.
+_LEVEL_VALUES = {m: m.value for m in EducationLevelEnum}
+_STATUS_VALUES = {m: m.value for m in IngestionStatusEnum}
+_CATEGORY_VALUES = {m: m.value for m in DocumentCategoryEnum}
+
+# ── Visibility filters ────────────────────────────────────────────────────────
+# Built once at import time with bound parameters (``viewer_id`` /
+# ``viewer_level``) so every request reuses the same expression objects and
+# hits the same entry in SQLAlchemy's compiled-statement cache.
+
+_NOT_ARCHIVED = Document.is_archived == False  # noqa: E712
+_ADMIN_DOC = Document.is_personal == False  # noqa: E712
+_ADMIN_DOC_FOR_LEVEL = _ADMIN_DOC & (Document.level == bindparam("viewer_level"))
+_OWNED_BY_VIEWER = Document.uploaded_by == bindparam("viewer_id")
+_SHARED_WITH_VIEWER = exists().where(
+    DocumentShare.document_id == Document.id,
+    DocumentShare.shared_with_user_id == bindparam("viewer_id"),
+)
+# Owner, share recipient, same-level student (admin docs) or admin, as one
+# boolean column so the access decision comes back with the row.
+_VIEWER_CAN_ACCESS = or_(
+    bindparam("viewer_is_admin", type_=Boolean),
+    _OWNED_BY_VIEWER,
+    _ADMIN_DOC_FOR_LEVEL,
+    _SHARED_WITH_VIEWER,
+).label("can_access")
+_COMMENT_COUNT = (
+    select(func.count(DocumentComment.id))
+    .where(DocumentComment.document_id == Document.id)
+    .correlate(Document)
+    .scalar_subquery()
+    .label("comment_count")
+)
+_SHARED_WITH_VIEWER_ONLY = (
+    (Document.is_personal == True)  # noqa: E712
+    & (Document.uploaded_by != bindparam("viewer_id"))
+    & _SHARED_WITH_VIEWER
+)
+
 
-def _doc_to_read(doc: Document) -> DocumentRead:
-    """Convert a Document ORM object to DocumentRead with enriched fields."""
-    return DocumentRead(
+# Columns _doc_to_read reads — list queries skip the large text columns
+# (instructions, marking_scheme) and file_path.
+_DOC_READ_COLUMNS = load_only(
+    Document.id,
+    Document.filename,
+    Document.subject,
+    Document.level,
+    Document.year,
+    Document.uploaded_by,
+    Document.ingestion_status,
+    Document.document_category,
+    Document.is_personal,
+    Document.is_shared,
+    Document.official_duration_minutes,
+    Document.page_count,
+    Document.subject_id,
+    Document.collection_name,
+    Document.is_archived,
+    Document.archived_at,
+    Document.archived_by,
+    Document.archive_reason,
+    Document.created_at,
+)
+
+
+def _doc_to_read(doc: Document, comment_count: int = 0) -> DocumentRead:
+    """Convert a Document ORM object to DocumentRead with enriched fields.
+
+    ``comment_count`` comes from the ``_COMMENT_COUNT`` column selected
+    alongside the document, so comments are never loaded just to count them.
+    Every value already has the schema's type, so the model is built with
+    ``model_construct`` rather than re-validated field by field.
+    """
+    return DocumentRead.model_construct(
         id=doc.id,
         filename=doc.filename,
         subject=doc.subject,
-        level=doc.level.value,
+        level=_LEVEL_VALUES[doc.level],
         year=doc.year,
         uploaded_by=doc.uploaded_by,
         uploader_name=doc.uploader.full_name if doc.uploader else None,
-        ingestion_status=doc.ingestion_status.value,
-        document_category=doc.document_category.value if doc.document_category else "exam_paper",
+        ingestion_status=_STATUS_VALUES[doc.ingestion_status],
+        document_category=_CATEGORY_VALUES.get(doc.document_category, "exam_paper"),
         is_personal=doc.is_personal,
         is_shared=doc.is_shared,
         official_duration_minutes=doc.official_duration_minutes,
@@ -58,7 +157,7 @@ def _doc_to_read(doc: Document) -> DocumentRead:
         archived_by=doc.archived_by,
         archive_reason=doc.archive_reason,
         archiver_name=doc.archiver.full_name if doc.archiver else None,
-        comment_count=len(doc.comments) if doc.comments else 0,
+        comment_count=comment_count or 0,
         created_at=doc.created_at,
     )
 
@@ -82,71 +181,112 @@ def _trigger_ingestion(document_id: str, file_path: str) -> None:
         ingest_document.delay(document_id, file_path)
 
 
-@router.post("/admin", response_model=DocumentRead, status_code=status.HTTP_201_CREATED)
-def upload_admin_document(
-    file: UploadFile = File(...),
-    subject: str = Form(...),
-    level: EducationLevel = Form(...),
-    year: str = Form(...),
-    document_category: DocumentCategory = Form(DocumentCategory.EXAM_PAPER),
-    official_duration_minutes: int | None = Form(None),
-    instructions: str | None = Form(None),
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db),
-):
-    """Upload an exam paper PDF designated for a specific level (admin only).
-    
-    This document will be visible to all students with that education level.
+def _upload_dest(filename: str) -> Path:
+    """Return a unique path under ``UPLOAD_DIR`` for an uploaded file.
+
+    Only the last component of the client-supplied name is kept, so a name
+    like ``../../etc/x`` (or a Windows ``C:\\...\\x``) cannot escape
+    ``UPLOAD_DIR``.
     """
     UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-    dest = UPLOAD_DIR / f"{uuid.uuid4()}_{file.filename}"
-    with open(dest, "wb") as f:
-        content = file.file.read()
-        f.write(content)
+    name = os.path.basename(filename.replace("\\", "/")) or "upload.pdf"
+    return UPLOAD_DIR / f"{uuid7().hex}_{name}"
 
-    # Count pages
-    page_count = _count_pdf_pages(dest)
 
-    doc = Document(
-        filename=file.filename or "unknown.pdf",
-        subject=subject,
-        level=EducationLevelEnum(level.value),
-        year=year,
-        document_category=DocumentCategoryEnum(document_category.value),
-        official_duration_minutes=official_duration_minutes,
-        instructions=instructions,
-        file_path=str(dest),
-        uploaded_by=current_user.id,
-        is_personal=False,
-        page_count=page_count,
-    )
-    # Auto-link to subject if one matches
+async def _receive_upload(request: Request, schema: type[BaseModel]) -> tuple[StreamedUpload, Any]:
+    """Stream the upload to disk and validate its form fields against *schema*."""
+    upload = await stream_upload(request, _upload_dest)
+    try:
+        meta = validate_form(schema, upload.fields)
+    except RequestValidationError:
+        upload.path.unlink(missing_ok=True)  # type: ignore[union-attr]
+        raise
+    return upload, meta
+
+
+def _insert_document(db: Session, doc: Document) -> None:
+    """Auto-link *doc* to a matching Subject, then INSERT and commit it.
+
+    ``page_count`` is left NULL here; the ingestion task fills it in so the
+    upload response doesn't wait on PDF parsing.
+    """
     matched_subject = (
         db.query(Subject)
-        .filter(Subject.name == subject, Subject.level == EducationLevelEnum(level.value))
+        .filter(Subject.name == doc.subject, Subject.level == doc.level)
         .first()
     )
     if matched_subject:
         doc.subject_id = matched_subject.id
     db.add(doc)
     db.commit()
+    invalidate_subject_caches()
     db.refresh(doc)
 
+
+async def _store_upload(db: Session, doc: Document, dest: Path) -> None:
+    """Insert the Document row for a file already on disk.
+
+    Runs in the threadpool (sync SQLAlchemy session). On failure the
+    transaction is rolled back and the file removed.
+    """
+    try:
+        await run_in_threadpool(_insert_document, db, doc)
+    except Exception:
+        await run_in_threadpool(db.rollback)
+        dest.unlink(missing_ok=True)
+        raise
+
+
+@router.post(
+    "/admin",
+    response_model=DocumentRead,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=multipart_openapi(DocumentCreate),
+)
+async def upload_admin_document(
+    request: Request,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    """Upload an exam paper PDF designated for a specific level (admin only).
+    
+    This document will be visible to all students with that education level.
+    The multipart body is parsed as it streams in and the PDF is written
+    straight to its final path (no intermediate spooled temp file).
+    """
+    upload, meta = await _receive_upload(request, DocumentCreate)
+    dest = upload.path
+
+    doc = Document(
+        filename=upload.filename or "unknown.pdf",
+        subject=meta.subject,
+        level=_LEVEL_MAP[meta.level],
+        year=meta.year,
+        document_category=_CATEGORY_MAP[meta.document_category],
+        official_duration_minutes=meta.official_duration_minutes,
+        instructions=meta.instructions,
+        marking_scheme=meta.marking_scheme,
+        file_path=str(dest),
+        uploaded_by=current_user.id,
+        is_personal=False,
+    )
+    await _store_upload(db, doc, dest)
+
     # Trigger ingestion (async worker in prod, threaded in dev)
     _trigger_ingestion(str(doc.id), str(dest))
-    logger.info("Admin document uploaded: %s for level %s", doc.id, level)
+    logger.info("Admin document uploaded: %s for level %s", doc.id, meta.level)
 
     return doc
 
 
-@router.post("/student", response_model=DocumentRead, status_code=status.HTTP_201_CREATED)
-def upload_personal_document(
-    file: UploadFile = File(...),
-    subject: str = Form(...),
-    level: EducationLevel = Form(...),
-    year: str = Form(...),
-    document_category: DocumentCategory = Form(DocumentCategory.EXAM_PAPER),
-    official_duration_minutes: int | None = Form(None),
+@router.post(
+    "/student",
+    response_model=DocumentRead,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=multipart_openapi(DocumentUploadRequest),
+)
+async def upload_personal_document(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -161,37 +301,22 @@ def upload_personal_document(
             detail="Only students can upload personal documents",
         )
 
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-    dest = UPLOAD_DIR / f"{uuid.uuid4()}_{file.filename}"
-    with open(dest, "wb") as f:
-        content = file.file.read()
-        f.write(content)
-
-    page_count = _count_pdf_pages(dest)
+    upload, meta = await _receive_upload(request, DocumentUploadRequest)
+    dest = upload.path
 
     doc = Document(
-        filename=file.filename or "unknown.pdf",
-        subject=subject,
-        level=EducationLevelEnum(level.value),
-        year=year,
-        document_category=DocumentCategoryEnum(document_category.value),
-        official_duration_minutes=official_duration_minutes,
+        filename=upload.filename or "unknown.pdf",
+        subject=meta.subject,
+        level=_LEVEL_MAP[meta.level],
+        year=meta.year,
+        document_category=_CATEGORY_MAP[meta.document_category],
+        official_duration_minutes=meta.official_duration_minutes,
+        instructions=meta.instructions,
         file_path=str(dest),
         uploaded_by=current_user.id,
         is_personal=True,
-        page_count=page_count,
     )
-    # Auto-link to subject if one matches
-    matched_subject = (
-        db.query(Subject)
-        .filter(Subject.name == subject, Subject.level == EducationLevelEnum(level.value))
-        .first()
-    )
-    if matched_subject:
-        doc.subject_id = matched_subject.id
-    db.add(doc)
-    db.commit()
-    db.refresh(doc)
+    await _store_upload(db, doc, dest)
 
     # Trigger ingestion (async worker in prod, threaded in dev)
     _trigger_ingestion(str(doc.id), str(dest))
@@ -227,55 +352,72 @@ def list_documents(
     - only_shared: show only shared personal documents
     - include_archived: include archived documents
     """
-    query = db.query(Document)
-    
+    stmt = select(Document, _COMMENT_COUNT)
+    params: dict = {"viewer_id": current_user.id}
+
     if not include_archived:
-        query = query.filter(Document.is_archived == False)  # noqa: E712
+        stmt = stmt.where(_NOT_ARCHIVED)
 
     # Role-based visibility filtering
-    if current_user.role == RoleEnum.ADMIN:
-        # Admins see all documents
-        pass
-    else:
+    if current_user.role != RoleEnum.ADMIN:
         # Students see: admin-designated + own + shared
         # Admin-designated documents: if student has no education_level yet,
         # show ALL admin docs as a fallback so they're never left with nothing.
-        admin_doc_filter = Document.is_personal == False  # noqa: E712
+        admin_doc_filter = _ADMIN_DOC
         if current_user.education_level is not None:
-            admin_doc_filter = (
-                (Document.is_personal == False) &  # noqa: E712
-                (Document.level == current_user.education_level)
-            )
-
-        query = query.filter(
-            or_(
-                admin_doc_filter,
-                # Own personal documents
-                Document.uploaded_by == current_user.id,
-                # Documents shared with them
-                Document.shared_with.any(DocumentShare.shared_with_user_id == current_user.id),
-            )
+            admin_doc_filter = _ADMIN_DOC_FOR_LEVEL
+            params["viewer_level"] = current_user.education_level
+
+        stmt = stmt.where(
+            or_(admin_doc_filter, _OWNED_BY_VIEWER, _SHARED_WITH_VIEWER)
         )
 
     # Apply optional filters
     if subject:
-        query = query.filter(Document.subject == subject)
+        stmt = stmt.where(Document.subject == subject)
     if level:
-        query = query.filter(Document.level == EducationLevelEnum(level.value))
+        stmt = stmt.where(Document.level == _LEVEL_MAP[level])
 
     if only_shared:
         # Show only shared personal documents (excluding own)
-        query = query.filter(
-            (Document.is_personal == True) &  # noqa: E712
-            (Document.uploaded_by != current_user.id) &
-            Document.shared_with.any(DocumentShare.shared_with_user_id == current_user.id)
-        )
+        stmt = stmt.where(_SHARED_WITH_VIEWER_ONLY)
 
-    return [_doc_to_read(d) for d in query.options(
-        joinedload(Document.uploader),
-        joinedload(Document.archiver),
-        selectinload(Document.comments),
-    ).offset(skip).limit(limit).all()]
+    # raiseload: any relationship _doc_to_read touches without an eager
+    # option fails loudly instead of silently issuing one SELECT per row.
+    stmt = stmt.options(
+        _DOC_READ_COLUMNS,
+        joinedload(Document.uploader).load_only(User.full_name),
+        joinedload(Document.archiver).load_only(User.full_name),
+        raiseload("*"),
+    ).offset(skip).limit(limit)
+    return [_doc_to_read(doc, count) for doc, count in db.execute(stmt, params).all()]
+
+
+def _get_document_for_viewer(
+    db: Session, document_id: uuid.UUID, viewer: User, *options, with_comment_count: bool = False
+):
+    """Load a document plus whether *viewer* may access it, in one query.
+
+    The access rule (including the share lookup) is evaluated by the
+    database as the ``can_access`` column instead of in Python after a
+    second round-trip to ``document_shares``. Returns the result row
+    (``.Document``, ``.can_access`` and, if requested, ``.comment_count``)
+    or ``None``.
+    """
+    columns = [_VIEWER_CAN_ACCESS]
+    if with_comment_count:
+        columns.append(_COMMENT_COUNT)
+    return (
+        db.query(Document, *columns)
+        .options(*options)
+        .filter(Document.id == document_id)
+        .params(
+            viewer_id=viewer.id,
+            viewer_level=viewer.education_level,
+            viewer_is_admin=viewer.role == RoleEnum.ADMIN,
+        )
+        .first()
+    )
 
 
 @router.get("/{document_id}", response_model=DocumentRead)
@@ -285,45 +427,27 @@ def get_document(
     current_user: User = Depends(get_current_user),
 ):
     """Get a single document by ID if user has access."""
-    doc = (
-        db.query(Document)
-        .options(
-            joinedload(Document.uploader),
-            joinedload(Document.archiver),
-            selectinload(Document.comments),
-        )
-        .filter(Document.id == document_id)
-        .first()
+    row = _get_document_for_viewer(
+        db,
+        document_id,
+        current_user,
+        joinedload(Document.uploader),
+        joinedload(Document.archiver),
+        raiseload("*"),
+        with_comment_count=True,
     )
-    if not doc:
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
         )
 
-    # Check access permissions
-    is_owner = doc.uploaded_by == current_user.id
-    is_shared = (
-        db.query(DocumentShare)
-        .filter(
-            DocumentShare.document_id == document_id,
-            DocumentShare.shared_with_user_id == current_user.id,
-        )
-        .first()
-        is not None
-    )
-    is_level_designated = (
-        not doc.is_personal
-        and doc.level == current_user.education_level
-    )
-    is_admin = current_user.role == RoleEnum.ADMIN
-
-    if not (is_owner or is_shared or is_level_designated or is_admin):
+    if not row.can_access:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have access to this document",
         )
 
-    return _doc_to_read(doc)
+    return _doc_to_read(row.Document, row.comment_count)
 
 
 @router.post("/{document_id}/share", response_model=DocumentShareResponse)
@@ -334,7 +458,7 @@ def share_personal_document(
     current_user: User = Depends(get_current_user),
 ):
     """Share a personal document with other students."""
-    doc = db.query(Document).filter(Document.id == document_id).first()
+    doc = db.get(Document, document_id)
     if not doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
@@ -353,35 +477,35 @@ def share_personal_document(
             detail="Cannot share admin-designated documents",
         )
 
-    # Verify all students exist
-    students = db.query(User).filter(User.id.in_(request.student_ids)).all()
-    if len(students) != len(request.student_ids):
+    # Verify all students exist (ids only — no User rows hydrated)
+    requested_ids = set(request.student_ids)
+    found_ids = set(
+        db.execute(select(User.id).where(User.id.in_(requested_ids))).scalars()
+    )
+    if found_ids != requested_ids:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Some student IDs do not exist",
         )
 
-    shared_count = 0
-    for student_id in request.student_ids:
-        if student_id == current_user.id:
-            continue  # Don't share with self
-        
-        # Check if already shared
-        existing = (
-            db.query(DocumentShare)
-            .filter(
-                DocumentShare.document_id == document_id,
-                DocumentShare.shared_with_user_id == student_id,
-            )
-            .first()
+    # One INSERT ... ON CONFLICT DO NOTHING RETURNING: the returned rows are
+    # exactly the new shares, and concurrent sharers cannot race on the
+    # (document_id, shared_with_user_id) unique constraint.
+    rows = [
+        {"document_id": document_id, "shared_with_user_id": student_id}
+        for student_id in dict.fromkeys(request.student_ids)
+        if student_id != current_user.id  # Don't share with self
+    ]
+    new_share_ids: list[uuid.UUID] = []
+    if rows:
+        stmt = (
+            dialect_insert(db)(DocumentShare)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["document_id", "shared_with_user_id"])
+            .returning(DocumentShare.shared_with_user_id)
         )
-        if not existing:
-            share = DocumentShare(
-                document_id=document_id,
-                shared_with_user_id=student_id,
-            )
-            db.add(share)
-            shared_count += 1
+        new_share_ids = list(db.execute(stmt).scalars())
+    shared_count = len(new_share_ids)
 
     if shared_count > 0:
         doc.is_shared = True
@@ -409,7 +533,7 @@ def unshare_personal_document(
     current_user: User = Depends(get_current_user),
 ):
     """Unshare a personal document from a student."""
-    doc = db.query(Document).filter(Document.id == document_id).first()
+    doc = db.get(Document, document_id)
     if not doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
@@ -437,14 +561,14 @@ def unshare_personal_document(
         )
 
     db.delete(share)
-    
-    # Check if document is still shared with anyone
-    remaining_shares = (
-        db.query(DocumentShare)
-        .filter(DocumentShare.document_id == document_id)
-        .count()
-    )
-    if remaining_shares == 0:
+    db.flush()  # session has autoflush off; the EXISTS below must not see it
+
+    # Check if document is still shared with anyone (EXISTS stops at the
+    # first matching row; COUNT would scan them all)
+    still_shared = db.query(
+        exists().where(DocumentShare.document_id == document_id)
+    ).scalar()
+    if not still_shared:
         doc.is_shared = False
 
     db.commit()
@@ -458,6 +582,36 @@ def unshare_personal_document(
     return {"message": "Document unshared successfully"}
 
 
+def _set_archived(
+    db: Session, document_id: uuid.UUID, archived: bool, **values
+) -> DocumentRead:
+    """Flip ``is_archived`` with a guarded UPDATE, raising 404/400 on no-op.
+
+    The UPDATE only matches rows in the opposite state and RETURNs the
+    document plus its comment count, so the response is built without a
+    reload.  The uploader/archiver are many-to-one lookups that resolve from
+    the identity map when they are the acting admin.  The ``exists`` probe
+    runs only when nothing matched, to tell "missing" apart from "already
+    in that state".
+    """
+    row = db.execute(
+        update(Document)
+        .where(Document.id == document_id, Document.is_archived == (not archived))
+        .values(is_archived=archived, **values)
+        .returning(Document, _COMMENT_COUNT),
+        execution_options={"populate_existing": True},
+    ).first()
+    if row is None:
+        if not db.query(exists().where(Document.id == document_id)).scalar():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+        detail = "Document is already archived" if archived else "Document is not archived"
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+    result = _doc_to_read(row.Document, row.comment_count)
+    db.commit()
+    invalidate_subject_caches()
+    return result
+
+
 @router.patch("/{document_id}/archive", response_model=DocumentRead)
 def archive_document(
     document_id: uuid.UUID,
@@ -469,22 +623,17 @@ def archive_document(
 
     Especially useful when archiving a student-uploaded document.
     """
-    doc = db.query(Document).options(
-        joinedload(Document.uploader),
-        selectinload(Document.comments),
-    ).filter(Document.id == document_id).first()
-    if not doc:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
-    if doc.is_archived:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Document is already archived")
-    doc.is_archived = True
-    doc.archived_at = datetime.now(timezone.utc)
-    doc.archived_by = _current_user.id
-    doc.archive_reason = body.reason if body else None
-    db.commit()
-    db.refresh(doc)
-    logger.info("Document %s archived by admin %s (reason: %s)", document_id, _current_user.id, doc.archive_reason or "none")
-    return _doc_to_read(doc)
+    reason = body.reason if body else None
+    result = _set_archived(
+        db,
+        document_id,
+        True,
+        archived_at=datetime.now(timezone.utc),
+        archived_by=_current_user.id,
+        archive_reason=reason,
+    )
+    logger.info("Document %s archived by admin %s (reason: %s)", document_id, _current_user.id, reason or "none")
+    return result
 
 
 @router.patch("/{document_id}/restore", response_model=DocumentRead)
@@ -494,26 +643,43 @@ def restore_document(
     _current_user: User = Depends(require_admin),
 ):
     """Restore a soft-archived document (admin only)."""
-    doc = db.query(Document).options(
-        joinedload(Document.uploader),
-        selectinload(Document.comments),
-    ).filter(Document.id == document_id).first()
-    if not doc:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
-    if not doc.is_archived:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Document is not archived")
-    doc.is_archived = False
-    doc.archived_at = None
-    doc.archived_by = None
-    doc.archive_reason = None
-    db.commit()
-    db.refresh(doc)
+    result = _set_archived(
+        db,
+        document_id,
+        False,
+        archived_at=None,
+        archived_by=None,
+        archive_reason=None,
+    )
     logger.info("Document %s restored by admin %s", document_id, _current_user.id)
-    return _doc_to_read(doc)
+    return result
 
 
 # ── PDF serving ───────────────────────────────────────────────────────────────
 
+_PDF_EXPOSED_HEADERS = "Content-Disposition, Accept-Ranges, Content-Range, Content-Length"
+_SEED_PDF_ROOT = Path("/app/rag_storage/raw")
+
+
+def _stat_pdf(stored_path: str) -> tuple[str, os.stat_result | None]:
+    """Resolve a document's file with one ``stat`` per candidate path.
+
+    Seed documents (``seed/...``) live in the rag_storage volume rather than
+    uploads, so they get a second candidate. Returns the path and its stat
+    result, or ``(stored_path, None)`` if neither exists.
+    """
+    try:
+        return stored_path, os.stat(stored_path)
+    except FileNotFoundError:
+        pass
+    if stored_path.startswith("seed/"):
+        seed_path = str(_SEED_PDF_ROOT / Path(stored_path).relative_to("seed"))
+        try:
+            return seed_path, os.stat(seed_path)
+        except FileNotFoundError:
+            pass
+    return stored_path, None
+
 
 @router.get("/{document_id}/pdf")
 def serve_document_pdf(
@@ -526,45 +692,30 @@ def serve_document_pdf(
     Returns the raw PDF with proper Content-Type headers for embedding
     in a PDF viewer (react-pdf, pdf.js, or browser built-in).
     """
-    doc = db.query(Document).filter(Document.id == document_id).first()
-    if not doc:
+    row = _get_document_for_viewer(db, document_id, current_user, raiseload("*"))
+    if row is None:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # Check access permissions (same logic as get_document)
-    is_owner = doc.uploaded_by == current_user.id
-    is_shared = (
-        db.query(DocumentShare)
-        .filter(
-            DocumentShare.document_id == document_id,
-            DocumentShare.shared_with_user_id == current_user.id,
-        )
-        .first()
-        is not None
-    )
-    is_level_designated = (
-        not doc.is_personal and doc.level == current_user.education_level
-    )
-    is_admin = current_user.role == RoleEnum.ADMIN
-
-    if not (is_owner or is_shared or is_level_designated or is_admin):
+    doc = row.Document
+    if not row.can_access:
         raise HTTPException(status_code=403, detail="No access to this document")
 
-    file_path = Path(doc.file_path)
-    if not file_path.exists():
-        # Seed documents live in the rag_storage volume, not uploads
-        rag_path = Path("/app/rag_storage/raw") / Path(doc.file_path).relative_to("seed") if doc.file_path.startswith("seed/") else None
-        if rag_path and rag_path.exists():
-            file_path = rag_path
-        else:
-            raise HTTPException(status_code=404, detail="PDF file not found on server")
+    file_path, st = _stat_pdf(doc.file_path)
+    if st is None:
+        raise HTTPException(status_code=404, detail="PDF file not found on server")
 
+    # Passing stat_result skips Starlette's own stat() and sets
+    # Content-Length/ETag up front; FileResponse then answers ``Range``
+    # requests with 206 partial content. PDF.js fetches large files in
+    # ranges, but only if it can read the range headers cross-origin.
     return FileResponse(
         path=str(file_path),
         media_type="application/pdf",
         filename=doc.filename,
+        stat_result=st,
         headers={
             "Content-Disposition": f'inline; filename="{doc.filename}"',
-            "Access-Control-Expose-Headers": "Content-Disposition",
+            "Access-Control-Expose-Headers": _PDF_EXPOSED_HEADERS,
         },
     )
 
@@ -595,12 +746,12 @@ def list_document_comments(
     _current_user: User = Depends(require_admin),
 ):
     """List all comments/highlights on a document (admin only)."""
-    doc = db.query(Document).filter(Document.id == document_id).first()
+    doc = db.get(Document, document_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     comments = (
         db.query(DocumentComment)
-        .options(joinedload(DocumentComment.author))
+        .options(joinedload(DocumentComment.author), raiseload("*"))
         .filter(DocumentComment.document_id == document_id)
         .order_by(DocumentComment.created_at.desc())
         .all()
@@ -616,7 +767,7 @@ def create_document_comment(
     current_user: User = Depends(require_admin),
 ):
     """Add a comment or highlight to a document (admin only)."""
-    doc = db.query(Document).filter(Document.id == document_id).first()
+    doc = db.get(Document, document_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     comment = DocumentComment(
@@ -643,16 +794,10 @@ def update_document_comment(
     current_user: User = Depends(require_admin),
 ):
     """Update a comment on a document (admin only)."""
-    comment = (
-        db.query(DocumentComment)
-        .options(joinedload(DocumentComment.author))
-        .filter(
-            DocumentComment.id == comment_id,
-            DocumentComment.document_id == document_id,
-        )
-        .first()
+    comment = db.get(
+        DocumentComment, comment_id, options=[joinedload(DocumentComment.author), raiseload("*")]
     )
-    if not comment:
+    if comment is None or comment.document_id != document_id:
         raise HTTPException(status_code=404, detail="Comment not found")
     if body.content is not None:
         comment.content = body.content
@@ -671,43 +816,8 @@ def delete_document_comment(
     _current_user: User = Depends(require_admin),
 ):
     """Delete a comment from a document (admin only)."""
-    comment = (
-        db.query(DocumentComment)
-        .filter(
-            DocumentComment.id == comment_id,
-            DocumentComment.document_id == document_id,
-        )
-        .first()
-    )
-    if not comment:
+    comment = db.get(DocumentComment, comment_id)
+    if comment is None or comment.document_id != document_id:
         raise HTTPException(status_code=404, detail="Comment not found")
     db.delete(comment)
     db.commit()
-
-
-# ── Helpers ───────────────────────────────────────────────────────────────────
-
-
-def _count_pdf_pages(file_path: Path) -> int | None:
-    """Count PDF pages using PyPDF2 or pypdf."""
-    try:
-        from pypdf import PdfReader
-
-        reader = PdfReader(str(file_path))
-        return len(reader.pages)
-    except ImportError:
-        pass
-    except Exception:
-        pass  # Corrupt or invalid PDF — fall through
-    try:
-        import fitz  # PyMuPDF
-
-        doc = fitz.open(str(file_path))
-        count = doc.page_count
-        doc.close()
-        return count
-    except ImportError:
-        pass
-    except Exception:
-        pass  # Corrupt or invalid PDF
-    return None
@@ -3,30 +3,37 @@
 Flow:
   1. POST /api/practice/start     → generate questions, return first one
   2. POST /api/practice/{id}/answer → submit answer (text or image), get feedback
+     POST /api/practice/{id}/answers/batch → submit several answers, graded concurrently
   3. GET  /api/practice/{id}/next  → get next question
   4. POST /api/practice/{id}/complete → mark session complete
   5. GET  /api/practice/{id}       → get full session results
   6. GET  /api/practice/           → list student's practice sessions
 """
 
-import json
+import asyncio
+import functools
 import logging
 import random
+import string
 import uuid
+from dataclasses import dataclass
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy.sql.expression import func
+from pydantic import TypeAdapter
+from pydantic_core import from_json, to_json
+from sqlalchemy import and_, case, func, literal, or_, select, update
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
+from starlette.concurrency import run_in_threadpool
 
 from app.api.deps import get_current_user
+from app.config import settings
 from app.db.models import (
     Document,
     IngestionStatusEnum,
     PracticeAnswer,
     PracticeSession,
     PracticeStatusEnum,
-    Progress,
     Question,
     Subject,
     Topic,
@@ -34,6 +41,7 @@ from app.db.models import (
 )
 from app.db.session import get_db
 from app.schemas.practice import (
+    PracticeAnswerBatchSubmit,
     PracticeAnswerResult,
     PracticeAnswerSubmit,
     PracticeQuestionRead,
@@ -44,6 +52,14 @@ from app.schemas.practice import (
     PracticeStatus,
     SourceReference,
 )
+from app.services.doc_lookup import (
+    get_subject_doc_ids,
+    invalidate_document_caches,
+    resolve_document_ids,
+)
+from app.services.grading import answers_match
+from app.services.progress_cache import invalidate_progress
+from app.services.progress_updates import apply_topic_tallies
 from app.services.rag_client import get_rag_client
 from app.services.rate_limiter import require_rag_rate_limit
 
@@ -53,49 +69,77 @@ router = APIRouter()
 
 # ── Grading prompt templates ──────────────────────────────────────────────────
 
-_GRADE_PROMPT = """\
-You are an expert exam grader. Grade the student's answer to this question.
+# Grading is split into two focused calls that run concurrently: a short
+# correctness judgement and a longer feedback write-up. ``string.Template``
+# keeps the literal JSON braces readable (no ``{{``/``}}`` escaping).
+
+_CORRECTNESS_PROMPT = string.Template("""\
+You are an expert exam grader. Decide whether the student's answer is correct.
 
-Question: {question}
-{options_text}
-Expected/Correct Answer: {correct_answer}
-Student's Answer: {student_answer}
+Question: $question
+Expected/Correct Answer: $correct_answer
+Student's Answer: $student_answer
 
 Context from exam materials:
-{context}
+$context
 
-Provide your assessment as JSON:
-{{
+First reason in one sentence, then decide. Return ONLY valid JSON:
+{
+  "reasoning": "One sentence comparing the student's answer with the expected answer",
   "is_correct": true/false,
-  "score": 0.0 to 1.0 (0=wrong, 0.5=partial, 1.0=fully correct),
-  "feedback": "Detailed explanation of why the answer is correct/incorrect. Explain the correct answer. Be encouraging and educational.",
-  "correct_answer_explanation": "Brief explanation of the correct answer"
-}}
+  "score": 0.0 to 1.0 (0=wrong, 0.5=partial, 1.0=fully correct)
+}
 
-Important:
-- For MCQ: check if the student picked the right option
+Rules:
 - For short answers: accept different phrasings, spelling variants, partial credit
 - For essays: evaluate key concepts, give partial credit
-- Always explain WHY the correct answer is correct
-- Return ONLY valid JSON, no other text
-"""
+""")
+
+_FEEDBACK_PROMPT = string.Template("""\
+You are an encouraging exam tutor. Give the student feedback on their answer.
+
+Question: $question
+Expected/Correct Answer: $correct_answer
+Student's Answer: $student_answer
+
+Context from exam materials:
+$context
 
-_OCR_PROMPT = """\
+Return ONLY valid JSON:
+{
+  "feedback": "Explain what is right or wrong in the student's answer and why the correct answer is correct. Be encouraging and educational.",
+  "correct_answer_explanation": "Brief explanation of the correct answer"
+}
+""")
+
+_OCR_PROMPT = string.Template("""\
 This is a photograph/scan of a student's handwritten answer to an exam question.
 Please transcribe the handwritten text as accurately as possible.
 Preserve mathematical notation where possible (use standard notation).
 If parts are unclear, indicate with [unclear].
 
-The question was: {question}
+The question was: $question
 
 Transcribe the student's handwritten response:
-"""
+""")
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
+# Shared RNG for question/chunk picks (seeded from os.urandom); nothing here
+# needs to be unpredictable, so ``secrets`` would be overkill.
+_rng = random.Random()
+
+# Stored answer sources are parsed and validated in one pass.
+_SOURCE_REFERENCES = TypeAdapter(list[SourceReference])
+
+
 def _parse_grade_json(raw: str) -> dict:
-    """Extract grading JSON from LLM response."""
+    """Extract grading JSON from LLM response.
+
+    Parsed with pydantic-core's ``from_json`` (jiter) rather than
+    ``json.loads``.
+    """
     text = raw.strip()
     if "```" in text:
         parts = text.split("```")
@@ -111,18 +155,59 @@ def _parse_grade_json(raw: str) -> dict:
     if start == -1 or end == -1:
         return {"is_correct": False, "score": 0.0, "feedback": text}
     try:
-        return json.loads(text[start : end + 1])
-    except json.JSONDecodeError:
+        return from_json(text[start : end + 1])
+    except ValueError:
         return {"is_correct": False, "score": 0.0, "feedback": text}
 
 
+# Prompt size drives LLM latency; cap what retrieval adds to the grading prompt.
+_MAX_CHUNK_CHARS = 800
+_MAX_CONTEXT_CHARS = 3000
+
+
+def _bounded_context(results: list[dict]) -> str:
+    """Join retrieved chunks, truncating each and stopping at the total cap."""
+    parts: list[str] = []
+    total = 0
+    for r in results:
+        content = r.get("content", "")[:_MAX_CHUNK_CHARS]
+        if not content:
+            continue
+        if total + len(content) > _MAX_CONTEXT_CHARS:
+            content = content[: _MAX_CONTEXT_CHARS - total]
+            if content:
+                parts.append(content)
+            break
+        parts.append(content)
+        total += len(content) + 2  # the "\n\n" separator
+    return "\n\n".join(parts)
+
+
+def _pick_random(q: Query) -> list:
+    """Return one random row of *q* (or none) without ``ORDER BY random()``.
+
+    Sorting every candidate by a random key is O(N log N); counting and
+    then skipping to a random offset only walks the index.
+    """
+    total = q.order_by(None).count()
+    if not total:
+        return []
+    return q.offset(_rng.randrange(total)).limit(1).all()
+
+
+@functools.lru_cache(maxsize=2048)
+def _collection_name(level: str, subject: str) -> str:
+    """RAG collection name for a level/subject pair, e.g. ``S6_Physics``."""
+    return f"{level}_{subject}".replace(" ", "_")
+
+
 def _get_collection_for_document(doc: Document) -> str | None:
     """Get the RAG collection name for a document."""
     if doc.level.value == "DRIVING":
         return "DRIVING"
     if doc.collection_name:
         return doc.collection_name
-    return f"{doc.level.value}_{doc.subject}".replace(" ", "_")
+    return _collection_name(doc.level.value, doc.subject)
 
 
 # ── Endpoints ─────────────────────────────────────────────────────────────────
@@ -150,28 +235,25 @@ async def start_practice_session(
     if subject.level.value == "DRIVING":
         collection = "DRIVING"
     else:
-        collection = f"{subject.level.value}_{subject.name}".replace(" ", "_")
+        collection = _collection_name(subject.level.value, subject.name)
     document_id = None
 
-    # Helper: find docs in this subject (by FK or text matching)
-    def _find_subject_docs(extra_filters=None):
-        """Find documents for this subject — tries subject_id FK first, falls
-        back to text-based subject + level matching."""
+    # Helper: pick one random doc in this subject (by FK or text matching)
+    def _pick_subject_doc() -> Document | None:
+        """Pick a random ingested document for this subject — tries the
+        subject_id FK first, falls back to text-based subject + level
+        matching. The random pick happens in SQL, so only one row is loaded."""
         q = db.query(Document).filter(
             Document.ingestion_status == IngestionStatusEnum.COMPLETED,
         )
-        if extra_filters:
-            for flt in extra_filters:
-                q = q.filter(flt)
-        # Try FK match first
-        fk_docs = q.filter(Document.subject_id == body.subject_id).all()
-        if fk_docs:
-            return fk_docs
-        # Fall back to text matching
-        return q.filter(
-            Document.subject == subject.name,
-            Document.level == subject.level,
-        ).all()
+        for match in (
+            (Document.subject_id == body.subject_id,),
+            (Document.subject == subject.name, Document.level == subject.level),
+        ):
+            doc = q.filter(*match).order_by(func.random()).limit(1).first()
+            if doc:
+                return doc
+        return None
 
     if body.document_id:
         # Single-paper mode (real-exam)
@@ -189,13 +271,12 @@ async def start_practice_session(
         document_id = doc.id
     elif body.mode == "real_exam":
         # Randomly pick an exam paper from the subject
-        docs = _find_subject_docs()
-        if not docs:
+        doc = _pick_subject_doc()
+        if not doc:
             raise HTTPException(
                 status_code=404,
                 detail="No ingested exam papers found for this subject",
             )
-        doc = random.choice(docs)
         # Auto-link subject_id if missing
         if not doc.subject_id:
             doc.subject_id = body.subject_id
@@ -204,17 +285,19 @@ async def start_practice_session(
         document_id = doc.id
     else:
         # Subject practice mode: auto-link all matching docs that lack subject_id
-        unlinked_docs = db.query(Document).filter(
-            Document.subject == subject.name,
-            Document.level == subject.level,
-            Document.subject_id.is_(None),
-            Document.ingestion_status == IngestionStatusEnum.COMPLETED,
-        ).all()
-        for d in unlinked_docs:
-            d.subject_id = body.subject_id
-        if unlinked_docs:
-            db.flush()
-            logger.info("Auto-linked %d docs to subject %s", len(unlinked_docs), subject.name)
+        linked = db.execute(
+            update(Document)
+            .where(
+                Document.subject == subject.name,
+                Document.level == subject.level,
+                Document.subject_id.is_(None),
+                Document.ingestion_status == IngestionStatusEnum.COMPLETED,
+            )
+            .values(subject_id=body.subject_id)
+        ).rowcount
+        if linked:
+            invalidate_document_caches(body.subject_id)
+            logger.info("Auto-linked %d docs to subject %s", linked, subject.name)
 
     session = PracticeSession(
         student_id=current_user.id,
@@ -231,6 +314,13 @@ async def start_practice_session(
     return _session_to_read(session)
 
 
+# The served question's document and topic come back in the same query.
+_NEXT_QUESTION_LOADS = (
+    joinedload(Question.source_document).load_only(Document.id, Document.filename),
+    joinedload(Question.topic),
+)
+
+
 @router.get("/{session_id}/next", response_model=PracticeQuestionRead | None)
 async def get_next_question(
     session_id: uuid.UUID,
@@ -252,8 +342,14 @@ async def get_next_question(
             detail="All questions answered — session complete",
         )
 
-    answered_ids = [a.question_id for a in session.answers if a.question_id]
-    answered_texts = [a.question_text for a in session.answers if a.question_text]
+    # Only the two columns needed, not full answer rows
+    answered = db.execute(
+        select(PracticeAnswer.question_id, PracticeAnswer.question_text)
+        .where(PracticeAnswer.session_id == session.id)
+        .order_by(PracticeAnswer.created_at)
+    ).all()
+    answered_ids = [a.question_id for a in answered if a.question_id]
+    answered_texts = [a.question_text for a in answered if a.question_text]
     question_number = session.answered_count + 1
 
     # ── Try DB questions first ─────────────────────────────────────────
@@ -264,43 +360,30 @@ async def get_next_question(
 
     if session.document_id:
         # Real-exam mode: single paper
-        q = db.query(Question).filter(
+        q = db.query(Question).options(*_NEXT_QUESTION_LOADS).filter(
             Question.document_id == session.document_id,
         )
         if answered_ids:
             q = q.filter(~Question.id.in_(answered_ids))
-        existing_questions = q.order_by(func.random()).limit(1).all()
+        existing_questions = _pick_random(q)
     elif session.subject_id:
         # Subject-wide practice: query from all docs in this subject
-        # Try FK first, then text matching
-        subject_doc_ids = [
-            d.id for d in db.query(Document.id).filter(
-                Document.subject_id == session.subject_id,
-                Document.ingestion_status == IngestionStatusEnum.COMPLETED,
-            ).all()
-        ]
-        if not subject_doc_ids and subject:
-            subject_doc_ids = [
-                d.id for d in db.query(Document.id).filter(
-                    Document.subject == subject.name,
-                    Document.level == subject.level,
-                    Document.ingestion_status == IngestionStatusEnum.COMPLETED,
-                ).all()
-            ]
+        # (FK first, then text matching; cached briefly per subject)
+        subject_doc_ids = get_subject_doc_ids(db, session.subject_id, subject)
         if subject_doc_ids:
-            q = db.query(Question).filter(
+            q = db.query(Question).options(*_NEXT_QUESTION_LOADS).filter(
                 Question.document_id.in_(subject_doc_ids),
             )
             if answered_ids:
                 q = q.filter(~Question.id.in_(answered_ids))
-            existing_questions = q.order_by(func.random()).limit(1).all()
+            existing_questions = _pick_random(q)
 
     if existing_questions:
         question = existing_questions[0]
         # Build source references so student can view the relevant document page
         q_sources: list[QuestionSourceReference] = []
         if question.document_id:
-            doc = db.query(Document).filter(Document.id == question.document_id).first()
+            doc = question.source_document
             if doc:
                 q_sources.append(QuestionSourceReference(
                     document_name=doc.filename,
@@ -312,7 +395,7 @@ async def get_next_question(
             question_number=question_number,
             text=question.text,
             question_type=question.question_type.value,
-            options=question.options.split("|") if question.options else None,
+            options=question.options or None,
             topic=question.topic.name if question.topic else None,
             difficulty=question.difficulty,
             total_questions=session.total_questions,
@@ -368,95 +451,47 @@ async def submit_practice_answer(
     if session.status != PracticeStatusEnum.IN_PROGRESS:
         raise HTTPException(status_code=400, detail="Practice session is not active")
 
-    # Get question details
-    question_text = body.question_text or ""
-    correct_answer = None
-    question_type = "short-answer"
-    db_question_id = None  # Only set to a real DB question_id
-
-    if body.question_id:
-        question = db.query(Question).filter(Question.id == body.question_id).first()
-        if question:
-            db_question_id = question.id  # Exists in DB → safe for FK
-            question_text = question.text
-            correct_answer = question.correct_answer
-            question_type = question.question_type.value
-        # else: RAG-generated question with random UUID → db_question_id stays None
+    question = _resolve_question(body, db)
+    graded = await _grade_submission(body, question, session.collection_name, db)
+    result = _record_answer(session, question, graded, db)
+    db.commit()
+    return result
 
-    # Handle handwritten answer via OCR
-    student_answer = body.answer_text or ""
-    is_handwritten = False
-    ocr_text = None
 
-    if body.answer_image_base64:
-        is_handwritten = True
-        ocr_text = _ocr_handwritten_answer(
-            body.answer_image_base64, question_text
-        )
-        student_answer = ocr_text or student_answer
-        if not student_answer:
-            student_answer = "[Could not read handwritten answer]"
+@router.post("/{session_id}/answers/batch", response_model=list[PracticeAnswerResult])
+async def submit_practice_answers_batch(
+    session_id: uuid.UUID,
+    body: PracticeAnswerBatchSubmit,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    _rl=Depends(require_rag_rate_limit),
+):
+    """Submit several answers at once; they are graded concurrently.
 
-    if not student_answer:
-        raise HTTPException(status_code=400, detail="No answer provided")
+    At most ``RAG_CONCURRENCY_LIMIT`` answers are in flight against the RAG
+    service at a time. Results come back in submission order.
+    """
+    session = _get_session(session_id, current_user.id, db)
 
-    # Grade using RAG
-    grade_result = _grade_answer_with_rag(
-        question_text=question_text,
-        student_answer=student_answer,
-        correct_answer=correct_answer,
-        question_type=question_type,
-        collection=session.collection_name,
-        db=db,
-    )
+    if session.status != PracticeStatusEnum.IN_PROGRESS:
+        raise HTTPException(status_code=400, detail="Practice session is not active")
+    if len(body.answers) > session.total_questions - session.answered_count:
+        raise HTTPException(
+            status_code=400,
+            detail="More answers submitted than questions remaining in this session",
+        )
 
-    # Save the answer (question_id=None for RAG-generated questions to avoid FK violation)
-    answer_record = PracticeAnswer(
-        session_id=session.id,
-        question_id=db_question_id,
-        question_text=question_text,
-        question_type=question_type,
-        student_answer=student_answer,
-        is_handwritten=is_handwritten,
-        ocr_text=ocr_text,
-        is_correct=grade_result["is_correct"],
-        score=grade_result["score"],
-        feedback=grade_result["feedback"],
-        correct_answer=correct_answer or grade_result.get("correct_answer"),
-        source_references=json.dumps(grade_result.get("sources", [])),
-    )
-    db.add(answer_record)
+    questions = [_resolve_question(a, db) for a in body.answers]
+    limiter = asyncio.Semaphore(settings.RAG_CONCURRENCY_LIMIT)
 
-    # Update session counters
-    session.answered_count += 1
-    if grade_result["is_correct"]:
-        session.correct_count += 1
-    if session.answered_count >= session.total_questions:
-        session.status = PracticeStatusEnum.COMPLETED
-        session.completed_at = datetime.now(timezone.utc)
+    async def grade(answer: PracticeAnswerSubmit, question: _ResolvedQuestion) -> _GradedAnswer:
+        async with limiter:
+            return await _grade_submission(answer, question, session.collection_name, db)
 
+    graded = await asyncio.gather(*(grade(a, q) for a, q in zip(body.answers, questions)))
+    results = [_record_answer(session, q, g, db) for q, g in zip(questions, graded)]
     db.commit()
-
-    return PracticeAnswerResult(
-        question_text=question_text,
-        student_answer=student_answer,
-        is_correct=grade_result["is_correct"],
-        score=grade_result["score"],
-        feedback=grade_result["feedback"],
-        correct_answer=correct_answer or grade_result.get("correct_answer"),
-        source_references=[
-            SourceReference(
-                page_number=s.get("page_number"),
-                content=s.get("content", ""),
-                score=s.get("score", 0.0),
-                document_name=s.get("document_name"),
-                document_id=s.get("document_id"),
-            )
-            for s in grade_result.get("sources", [])
-        ],
-        was_handwritten=is_handwritten,
-        ocr_text=ocr_text,
-    )
+    return results
 
 
 @router.post("/{session_id}/complete", response_model=PracticeSessionRead)
@@ -466,7 +501,17 @@ def complete_practice_session(
     db: Session = Depends(get_db),
 ):
     """Mark a practice session as completed and update progress tracking."""
-    session = _get_session(session_id, current_user.id, db)
+    # Progress tallies walk answer → question → topic; load them up front.
+    # The row lock serialises duplicate completes so progress is applied once.
+    session = _get_session(
+        session_id,
+        current_user.id,
+        db,
+        selectinload(PracticeSession.answers)
+        .joinedload(PracticeAnswer.question)
+        .joinedload(Question.topic),
+        for_update=True,
+    )
     session.status = PracticeStatusEnum.COMPLETED
     session.completed_at = datetime.now(timezone.utc)
 
@@ -474,6 +519,7 @@ def complete_practice_session(
     _update_progress_from_session(session, current_user.id, db)
 
     db.commit()
+    invalidate_progress(current_user.id)
     db.refresh(session)
     return _session_to_read(session)
 
@@ -485,7 +531,9 @@ def get_practice_session(
     db: Session = Depends(get_db),
 ):
     """Get full practice session with all graded answers."""
-    session = _get_session(session_id, current_user.id, db)
+    session = _get_session(
+        session_id, current_user.id, db, selectinload(PracticeSession.answers)
+    )
 
     answers = [
         PracticeAnswerResult(
@@ -495,10 +543,11 @@ def get_practice_session(
             score=a.score,
             feedback=a.feedback or "",
             correct_answer=a.correct_answer,
-            source_references=[
-                SourceReference(**s)
-                for s in (json.loads(a.source_references) if a.source_references else [])
-            ],
+            source_references=(
+                _SOURCE_REFERENCES.validate_json(a.source_references)
+                if a.source_references
+                else []
+            ),
             was_handwritten=a.is_handwritten,
             ocr_text=a.ocr_text,
         )
@@ -514,19 +563,34 @@ def list_practice_sessions(
     skip: int = 0,
     limit: int = 20,
     subject_id: uuid.UUID | None = None,
+    before: datetime | None = None,
+    before_id: uuid.UUID | None = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """List the current student's practice sessions, optionally filtered by subject."""
+    """List the current student's practice sessions, optionally filtered by subject.
+
+    For the next page, pass the last session's ``created_at`` as ``before``
+    (and its ``id`` as ``before_id`` to break ties) instead of ``skip``;
+    the keyset seek stays fast however many sessions a student has.
+    """
     q = db.query(PracticeSession).filter(PracticeSession.student_id == current_user.id)
     if subject_id:
         q = q.filter(PracticeSession.subject_id == subject_id)
-    sessions = (
-        q.order_by(PracticeSession.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    if before is not None:
+        if before_id is None:
+            q = q.filter(PracticeSession.created_at < before)
+        else:
+            q = q.filter(
+                or_(
+                    PracticeSession.created_at < before,
+                    and_(PracticeSession.created_at == before, PracticeSession.id < before_id),
+                )
+            )
+    q = q.order_by(PracticeSession.created_at.desc(), PracticeSession.id.desc())
+    if before is None and skip:
+        q = q.offset(skip)
+    sessions = q.limit(limit).all()
     return [_session_to_read(s) for s in sessions]
 
 
@@ -534,16 +598,23 @@ def list_practice_sessions(
 
 
 def _get_session(
-    session_id: uuid.UUID, student_id: uuid.UUID, db: Session
+    session_id: uuid.UUID,
+    student_id: uuid.UUID,
+    db: Session,
+    *options,
+    for_update: bool = False,
 ) -> PracticeSession:
-    session = (
+    query = (
         db.query(PracticeSession)
+        .options(*options)
         .filter(
             PracticeSession.id == session_id,
             PracticeSession.student_id == student_id,
         )
-        .first()
     )
+    if for_update:
+        query = query.with_for_update(of=PracticeSession)
+    session = query.first()
     if not session:
         raise HTTPException(status_code=404, detail="Practice session not found")
     return session
@@ -568,17 +639,227 @@ def _session_to_read(session: PracticeSession) -> PracticeSessionRead:
     )
 
 
-def _grade_answer_with_rag(
+@dataclass
+class _ResolvedQuestion:
+    """The question an answer refers to, as far as grading is concerned."""
+
+    text: str
+    correct_answer: str | None = None
+    question_type: str = "short-answer"
+    db_id: uuid.UUID | None = None  # only set for questions that exist in the DB
+
+
+@dataclass
+class _GradedAnswer:
+    student_answer: str
+    is_handwritten: bool
+    ocr_text: str | None
+    grade: dict
+
+
+def _resolve_question(body: PracticeAnswerSubmit, db: Session) -> _ResolvedQuestion:
+    """Look up the submitted question; RAG-generated ones only have text."""
+    resolved = _ResolvedQuestion(text=body.question_text or "")
+    if body.question_id:
+        question = db.query(Question).filter(Question.id == body.question_id).first()
+        if question:
+            resolved.db_id = question.id  # Exists in DB → safe for FK
+            resolved.text = question.text
+            resolved.correct_answer = question.correct_answer
+            resolved.question_type = question.question_type.value
+        # else: RAG-generated question with random UUID → db_id stays None
+    return resolved
+
+
+async def _grade_submission(
+    body: PracticeAnswerSubmit,
+    question: _ResolvedQuestion,
+    collection: str | None,
+    db: Session,
+) -> _GradedAnswer:
+    """OCR (if handwritten) and grade one answer.
+
+    Typed text wins over an attached image, so OCR only runs when there is
+    no text. The RAG retrieval for the grading context only depends on the
+    question, so it runs concurrently with the OCR call instead of after it.
+    """
+    student_answer = body.answer_text or ""
+    is_handwritten = False
+    ocr_text = None
+    context = None
+
+    if body.answer_image_base64 and not student_answer:
+        is_handwritten = True
+        ocr_call = run_in_threadpool(
+            _ocr_handwritten_answer, body.answer_image_base64, question.text
+        )
+        if _needs_rag_context(question.question_type, question.correct_answer):
+            ocr_text, context = await asyncio.gather(
+                ocr_call,
+                _retrieve_grading_context(question.text, question.correct_answer, collection, db),
+            )
+        else:
+            ocr_text = await ocr_call
+        student_answer = ocr_text or student_answer
+        if not student_answer:
+            student_answer = "[Could not read handwritten answer]"
+
+    if not student_answer:
+        raise HTTPException(status_code=400, detail="No answer provided")
+
+    grade = await _grade_answer_with_rag(
+        question_text=question.text,
+        student_answer=student_answer,
+        correct_answer=question.correct_answer,
+        question_type=question.question_type,
+        collection=collection,
+        db=db,
+        context=context,
+    )
+    return _GradedAnswer(student_answer, is_handwritten, ocr_text, grade)
+
+
+def _record_answer(
+    session: PracticeSession,
+    question: _ResolvedQuestion,
+    graded: _GradedAnswer,
+    db: Session,
+) -> PracticeAnswerResult:
+    """Store a graded answer, bump the session counters and build the result."""
+    grade_result = graded.grade
+    correct_answer = question.correct_answer or grade_result.get("correct_answer")
+
+    # question_id=None for RAG-generated questions to avoid FK violation
+    db.add(PracticeAnswer(
+        session_id=session.id,
+        question_id=question.db_id,
+        question_text=question.text,
+        question_type=question.question_type,
+        student_answer=graded.student_answer,
+        is_handwritten=graded.is_handwritten,
+        ocr_text=graded.ocr_text,
+        is_correct=grade_result["is_correct"],
+        score=grade_result["score"],
+        feedback=grade_result["feedback"],
+        correct_answer=correct_answer,
+        source_references=to_json(grade_result.get("sources", [])).decode(),
+    ))
+
+    # One atomic UPDATE so concurrent answers to a session can't lose a
+    # count; RETURNING refreshes ``session`` in place.
+    answered = PracticeSession.answered_count + 1
+    finished = answered >= PracticeSession.total_questions
+    db.execute(
+        update(PracticeSession)
+        .where(PracticeSession.id == session.id)
+        .values(
+            answered_count=answered,
+            correct_count=PracticeSession.correct_count + (1 if grade_result["is_correct"] else 0),
+            status=case(
+                (finished, literal(PracticeStatusEnum.COMPLETED, PracticeSession.status.type)),
+                else_=PracticeSession.status,
+            ),
+            completed_at=case(
+                (finished, literal(datetime.now(timezone.utc), PracticeSession.completed_at.type)),
+                else_=PracticeSession.completed_at,
+            ),
+        )
+        .returning(PracticeSession),
+        execution_options={"populate_existing": True},
+    )
+
+    return PracticeAnswerResult(
+        question_text=question.text,
+        student_answer=graded.student_answer,
+        is_correct=grade_result["is_correct"],
+        score=grade_result["score"],
+        feedback=grade_result["feedback"],
+        correct_answer=correct_answer,
+        source_references=[
+            SourceReference(
+                page_number=s.get("page_number"),
+                content=s.get("content", ""),
+                score=s.get("score", 0.0),
+                document_name=s.get("document_name"),
+                document_id=s.get("document_id"),
+            )
+            for s in grade_result.get("sources", [])
+        ],
+        was_handwritten=graded.is_handwritten,
+        ocr_text=graded.ocr_text,
+    )
+
+
+def _needs_rag_context(question_type: str, correct_answer: str | None) -> bool:
+    """MCQs with a known answer are graded by direct comparison."""
+    return not (question_type == "mcq" and correct_answer)
+
+
+async def _retrieve_grading_context(
+    question_text: str,
+    correct_answer: str | None,
+    collection: str | None,
+    db: Session | None = None,
+) -> tuple[str, list[dict]]:
+    """Fetch exam-material context and source references for grading."""
+    context = ""
+    sources: list[dict] = []
+    if not collection:
+        return context, sources
+
+    try:
+        client = get_rag_client()
+        retrieve_result = await run_in_threadpool(
+            client.retrieve,
+            query=f"{question_text} {correct_answer or ''}",
+            collection=collection,
+            top_k=5,
+        )
+        raw_results = retrieve_result.get("results", [])
+        context = _bounded_context(raw_results)
+
+        # Build a filename → document_id lookup from the DB
+        doc_id_cache: dict[str, str] = {}
+        if db:
+            doc_id_cache = resolve_document_ids(db, {
+                r.get("metadata", {}).get("file_name")
+                for r in raw_results
+                if r.get("metadata", {}).get("file_name")
+            })
+
+        sources = [
+            {
+                "page_number": r.get("metadata", {}).get("page_number"),
+                "content": r.get("content", "")[:200],
+                "score": r.get("score", 0.0),
+                "document_name": r.get("metadata", {}).get("file_name"),
+                "document_id": doc_id_cache.get(
+                    r.get("metadata", {}).get("file_name", "")
+                ),
+            }
+            for r in raw_results
+        ]
+    except Exception as e:
+        logger.warning("RAG retrieval for grading failed: %s", e)
+    return context, sources
+
+
+async def _grade_answer_with_rag(
     question_text: str,
     student_answer: str,
     correct_answer: str | None,
     question_type: str,
     collection: str | None,
     db: Session | None = None,
+    context: tuple[str, list[dict]] | None = None,
 ) -> dict:
-    """Grade an answer using RAG context + LLM."""
+    """Grade an answer using RAG context + LLM.
+
+    ``context`` is the ``(text, sources)`` pair from
+    ``_retrieve_grading_context`` when the caller already fetched it.
+    """
     # Quick MCQ grading
-    if question_type == "mcq" and correct_answer:
+    if not _needs_rag_context(question_type, correct_answer):
         is_correct = student_answer.strip().upper() == correct_answer.strip().upper()
         return {
             "is_correct": is_correct,
@@ -591,73 +872,56 @@ def _grade_answer_with_rag(
             "sources": [],
         }
 
-    # For non-MCQ: use RAG for context + LLM for grading
-    context = ""
-    sources = []
-
-    if collection:
-        try:
-            client = get_rag_client()
-            retrieve_result = client.retrieve(
-                query=f"{question_text} {correct_answer or ''}",
-                collection=collection,
-                top_k=5,
-            )
-            raw_results = retrieve_result.get("results", [])
-            context = "\n\n".join(r.get("content", "") for r in raw_results)
-
-            # Build a filename → document_id lookup from the DB
-            doc_id_cache: dict[str, str] = {}
-            if db:
-                filenames = list({
-                    r.get("metadata", {}).get("file_name", "")
-                    for r in raw_results
-                    if r.get("metadata", {}).get("file_name")
-                })
-                if filenames:
-                    # Try exact filename match first
-                    docs = db.query(Document.id, Document.filename, Document.file_path).filter(
-                        Document.filename.in_(filenames)
-                    ).all()
-                    doc_id_cache = {d.filename: str(d.id) for d in docs}
-
-                    # Also match by file_path basename for UUID-prefixed filenames
-                    if len(doc_id_cache) < len(filenames):
-                        all_docs = db.query(Document.id, Document.file_path).all()
-                        for adoc in all_docs:
-                            if adoc.file_path:
-                                basename = adoc.file_path.rsplit("/", 1)[-1]
-                                if basename in filenames and basename not in doc_id_cache:
-                                    doc_id_cache[basename] = str(adoc.id)
-
-            sources = [
-                {
-                    "page_number": r.get("metadata", {}).get("page_number"),
-                    "content": r.get("content", "")[:200],
-                    "score": r.get("score", 0.0),
-                    "document_name": r.get("metadata", {}).get("file_name"),
-                    "document_id": doc_id_cache.get(
-                        r.get("metadata", {}).get("file_name", "")
-                    ),
-                }
-                for r in raw_results
-            ]
-        except Exception as e:
-            logger.warning("RAG retrieval for grading failed: %s", e)
+    # An exact match with the known answer (after normalisation) needs no
+    # retrieval or LLM; anything short of that, typos included, is judged
+    # by the LLM since one changed letter can flip the meaning.
+    if correct_answer and answers_match(student_answer, correct_answer):
+        return {
+            "is_correct": True,
+            "score": 1.0,
+            "feedback": f"✅ Correct! The answer is {correct_answer}.",
+            "sources": context[1] if context else [],
+        }
 
-    options_text = ""
-    prompt = _GRADE_PROMPT.format(
-        question=question_text,
-        options_text=options_text,
-        correct_answer=correct_answer or "Not provided — grade based on context",
-        student_answer=student_answer,
-        context=context or "No additional context available",
-    )
+    # For non-MCQ: use RAG for context + LLM for grading
+    if context is None:
+        context = await _retrieve_grading_context(question_text, correct_answer, collection, db)
+    context_text, sources = context
+
+    prompt_args = {
+        "question": question_text,
+        "correct_answer": correct_answer or "Not provided — grade based on context",
+        "student_answer": student_answer,
+        "context": context_text or "No additional context available",
+    }
 
     try:
         client = get_rag_client()
-        result = client.query_direct(question=prompt)
-        grade = _parse_grade_json(result.get("answer", ""))
+        verdict, feedback = await asyncio.gather(
+            run_in_threadpool(
+                client.query_direct, question=_CORRECTNESS_PROMPT.substitute(prompt_args)
+            ),
+            run_in_threadpool(
+                client.query_direct, question=_FEEDBACK_PROMPT.substitute(prompt_args)
+            ),
+            return_exceptions=True,
+        )
+        if isinstance(verdict, BaseException):
+            raise verdict
+        grade = _parse_grade_json(verdict.get("answer", ""))
+        grade.pop("reasoning", None)
+        if isinstance(feedback, BaseException):
+            logger.warning("RAG feedback generation failed: %s", feedback)
+            grade["feedback"] = (
+                f"The expected answer is: {correct_answer}"
+                if correct_answer
+                else "Detailed feedback is unavailable for this answer."
+            )
+        else:
+            notes = _parse_grade_json(feedback.get("answer", ""))
+            grade["feedback"] = notes.get("feedback", "")
+            if notes.get("correct_answer_explanation"):
+                grade["correct_answer_explanation"] = notes["correct_answer_explanation"]
         grade["sources"] = sources
         return grade
     except Exception as e:
@@ -692,7 +956,7 @@ def _ocr_handwritten_answer(image_base64: str, question_text: str) -> str | None
     """OCR a handwritten answer image using Groq Vision (VLM)."""
     try:
         client = get_rag_client()
-        prompt = _OCR_PROMPT.format(question=question_text)
+        prompt = _OCR_PROMPT.substitute(question=question_text)
 
         # Call the RAG service's OCR endpoint
         result = client._http.post(
@@ -714,16 +978,47 @@ def _ocr_handwritten_answer(image_base64: str, question_text: str) -> str | None
 # ── RAG question generation with variety ──────────────────────────────────────
 
 # Question type templates for diverse generation
-_QUESTION_TYPES = [
+_QUESTION_TYPES = (
     "short-answer",
     "multiple-choice",
     "fill-in-the-blank",
     "true-or-false",
     "explain",
-]
+)
+
+# Generation prompt, sent via query_direct (no index, no cache)
+_GENERATION_PROMPT = string.Template("""\
+You are creating exam practice questions for $subject_label.
+This is question $question_number of $total_questions in a practice session.
+
+Based on the following exam content, generate ONE practice question.
+$type_instruction
+$avoid_block
+EXAM CONTENT:
+$context
+
+Return ONLY a JSON object with these fields:
+{
+  "text": "The question text",
+  "question_type": "$question_type",
+  "correct_answer": "The correct answer",
+  "topic": "The topic this question covers",
+  "difficulty": "easy" or "medium" or "hard"$options_field
+}
+
+IMPORTANT:
+- The question MUST be directly based on the exam content above
+- The question must be appropriate for the $subject_label subject
+- If the exam content references a diagram, figure, table, map, or image:
+  * Do NOT say "in the diagram" or "refer to the figure" without describing it
+  * Instead, DESCRIBE the visual element in words (e.g. "Given a circuit with a 5Ω resistor connected to a 12V battery...")
+  * Or ask about the concept the visual illustrates without requiring the student to see it
+  * The student can view the source document page, but the question should still be answerable with the text description
+- Return ONLY valid JSON, no other text
+""")
 
 # Seed phrases to vary the RAG retrieval (different chunks each time)
-_RETRIEVAL_SEEDS = [
+_RETRIEVAL_SEEDS = (
     "important concepts and definitions",
     "key facts and figures",
     "practical applications",
@@ -737,7 +1032,7 @@ _RETRIEVAL_SEEDS = [
     "experiments and observations",
     "historical events and dates",
     "formulas and calculations",
-]
+)
 
 
 def _generate_rag_question(
@@ -762,7 +1057,7 @@ def _generate_rag_question(
     subject_label = subject_name or collection.replace("_", " ")
 
     # 1) Retrieve diverse content from the collection using a random seed
-    seed = random.choice(_RETRIEVAL_SEEDS)
+    seed = _rng.choice(_RETRIEVAL_SEEDS)
     retrieval_query = f"{subject_label}: {seed}"
 
     try:
@@ -779,13 +1074,12 @@ def _generate_rag_question(
     if not chunks:
         return None
 
-    # Shuffle and pick a subset of chunks for variety
-    random.shuffle(chunks)
-    selected_chunks = chunks[: min(4, len(chunks))]
+    # Pick a random subset of chunks for variety
+    selected_chunks = _rng.sample(chunks, min(4, len(chunks)))
     context = "\n\n---\n\n".join(c.get("content", "") for c in selected_chunks)
 
     # 2) Pick a question type
-    q_type = random.choice(_QUESTION_TYPES)
+    q_type = _rng.choice(_QUESTION_TYPES)
 
     # 3) Build the "already asked" block so the LLM avoids repeats
     avoid_block = ""
@@ -796,7 +1090,7 @@ def _generate_rag_question(
             "Generate a COMPLETELY DIFFERENT question about a different topic/concept.\n"
         )
 
-    # 4) Build generation prompt — sent via query_direct (no index, no cache)
+    # 4) Build generation prompt
     type_instructions = {
         "multiple-choice": (
             'The question should be multiple-choice with 4 options (A, B, C, D). '
@@ -820,74 +1114,39 @@ def _generate_rag_question(
         ),
     }
 
-    gen_prompt = f"""\
-You are creating exam practice questions for {subject_label}.
-This is question {question_number} of {total_questions} in a practice session.
-
-Based on the following exam content, generate ONE practice question.
-{type_instructions.get(q_type, type_instructions["short-answer"])}
-{avoid_block}
-EXAM CONTENT:
-{context}
-
-Return ONLY a JSON object with these fields:
-{{
-  "text": "The question text",
-  "question_type": "{q_type if q_type != 'explain' else 'short-answer'}",
-  "correct_answer": "The correct answer",
-  "topic": "The topic this question covers",
-  "difficulty": "easy" or "medium" or "hard"{', "options": ["A. ...", "B. ...", "C. ...", "D. ..."]' if q_type == 'multiple-choice' else ''}
-}}
-
-IMPORTANT:
-- The question MUST be directly based on the exam content above
-- The question must be appropriate for the {subject_label} subject
-- If the exam content references a diagram, figure, table, map, or image:
-  * Do NOT say "in the diagram" or "refer to the figure" without describing it
-  * Instead, DESCRIBE the visual element in words (e.g. "Given a circuit with a 5Ω resistor connected to a 12V battery...")
-  * Or ask about the concept the visual illustrates without requiring the student to see it
-  * The student can view the source document page, but the question should still be answerable with the text description
-- Return ONLY valid JSON, no other text
-"""
+    gen_prompt = _GENERATION_PROMPT.substitute(
+        subject_label=subject_label,
+        question_number=question_number,
+        total_questions=total_questions,
+        type_instruction=type_instructions.get(q_type, type_instructions["short-answer"]),
+        avoid_block=avoid_block,
+        context=context,
+        question_type="short-answer" if q_type == "explain" else q_type,
+        options_field=(
+            ', "options": ["A. ...", "B. ...", "C. ...", "D. ..."]'
+            if q_type == "multiple-choice"
+            else ""
+        ),
+    )
 
-    # Build source references from the chunks for the frontend (page links)
-    source_refs: list[dict] = []
-    doc_id_cache: dict[str, str] = {}
-    if db:
-        filenames = list({
-            c.get("metadata", {}).get("file_name", "")
-            for c in selected_chunks
-            if c.get("metadata", {}).get("file_name")
-        })
-        if filenames:
-            docs = db.query(Document.id, Document.filename, Document.file_path).filter(
-                Document.filename.in_(filenames)
-            ).all()
-            doc_id_cache = {d.filename: str(d.id) for d in docs}
-            # Also match by file_path basename
-            if len(doc_id_cache) < len(filenames):
-                all_docs = db.query(Document.id, Document.file_path).all()
-                for adoc in all_docs:
-                    if adoc.file_path:
-                        basename = adoc.file_path.rsplit("/", 1)[-1]
-                        if basename in filenames and basename not in doc_id_cache:
-                            doc_id_cache[basename] = str(adoc.id)
-
-    seen_pages: set[tuple[str | None, int | None]] = set()
+    # Build source references from the chunks for the frontend (page links):
+    # one pass keeps the first chunk per (file, page).
+    page_chunks: dict[tuple[str | None, int | None], dict] = {}
     for chunk in selected_chunks:
-        meta = chunk.get("metadata", {})
-        fname = meta.get("file_name")
-        page = meta.get("page_number")
-        key = (fname, page)
-        if key in seen_pages:
-            continue
-        seen_pages.add(key)
-        source_refs.append({
+        meta = chunk.get("metadata") or {}
+        page_chunks.setdefault((meta.get("file_name"), meta.get("page_number")), chunk)
+    doc_id_cache = (
+        resolve_document_ids(db, {fname for fname, _ in page_chunks if fname}) if db else {}
+    )
+    source_refs = [
+        {
             "page_number": page,
             "document_name": fname,
             "document_id": doc_id_cache.get(fname or ""),
-            "content_snippet": chunk.get("content", "")[:120],
-        })
+            "content_snippet": (chunk.get("content") or "")[:120],
+        }
+        for (fname, page), chunk in page_chunks.items()
+    ]
 
     try:
         result = client.query_direct(question=gen_prompt)
@@ -925,8 +1184,11 @@ def _update_progress_from_session(
 
     For RAG-generated questions (no topic_id), we create/find a topic
     based on the subject name. This mirrors what attempts.py does.
+
+    Applied at most once per session: ``progress_applied_at`` is stamped
+    here, so a retried ``/complete`` does not count the answers again.
     """
-    if not session.answers:
+    if session.progress_applied_at is not None or not session.answers:
         return
 
     # Collect subject context for topic creation
@@ -960,51 +1222,29 @@ def _update_progress_from_session(
         if answer.is_correct:
             bucket["correct"] += 1
 
-    # Update/create Progress rows
-    for topic_name, tally in topic_tallies.items():
-        topic_id = tally["topic_id"]
-
-        # If no topic_id, find or create a topic
-        if topic_id is None:
-            existing_topic = (
-                db.query(Topic)
-                .filter(
-                    Topic.subject == (subject_name or "General"),
-                    Topic.name == topic_name,
-                )
-                .first()
-            )
-            if existing_topic:
-                topic_id = existing_topic.id
-            else:
-                new_topic = Topic(
-                    subject=subject_name or "General",
-                    name=topic_name,
-                )
-                db.add(new_topic)
-                db.flush()
-                topic_id = new_topic.id
-
-        # Upsert progress
-        prog = (
-            db.query(Progress)
-            .filter(
-                Progress.student_id == student_id,
-                Progress.topic_id == topic_id,
+    # Resolve topics for RAG-generated buckets with one IN query; missing
+    # ones are added and flushed together for their ids.
+    topic_subject = subject_name or "General"
+    unresolved = [name for name, tally in topic_tallies.items() if tally["topic_id"] is None]
+    topics: dict[str, Topic] = {}
+    if unresolved:
+        topics = {
+            t.name: t
+            for t in db.query(Topic).filter(
+                Topic.subject == topic_subject, Topic.name.in_(unresolved)
             )
-            .first()
-        )
-        if prog is None:
-            prog = Progress(student_id=student_id, topic_id=topic_id)
-            db.add(prog)
+        }
+        missing = [Topic(subject=topic_subject, name=n) for n in unresolved if n not in topics]
+        if missing:
+            db.add_all(missing)
             db.flush()
+            topics.update((t.name, t) for t in missing)
 
-        prog.total_correct += tally["correct"]
-        prog.total_questions += tally["total"]
-        prog.attempt_count += 1
-        prog.accuracy = (
-            round(prog.total_correct / prog.total_questions, 4)
-            if prog.total_questions
-            else 0.0
-        )
-        prog.last_attempted_at = datetime.now(timezone.utc)
\ No newline at end of file
+    by_topic: dict[uuid.UUID, tuple[int, int]] = {}
+    for topic_name, tally in topic_tallies.items():
+        topic_id = tally["topic_id"] or topics[topic_name].id
+        correct, total = by_topic.get(topic_id, (0, 0))
+        by_topic[topic_id] = (correct + tally["correct"], total + tally["total"])
+    apply_topic_tallies(db, student_id, by_topic)
+
+    session.progress_applied_at = datetime.now(timezone.utc)
@@ -1,13 +1,15 @@
 """Progress & analytics routes."""
 
 from fastapi import APIRouter, Depends
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
 from app.config import settings
-from app.db.models import Progress, User
+from app.db.models import Progress, Topic, User
 from app.db.session import get_db
 from app.schemas.progress import ProgressRead, TopicMetric
+from app.services.progress_cache import cache_progress, get_cached_progress
 
 router = APIRouter()
 
@@ -18,17 +20,36 @@ def get_progress(
     db: Session = Depends(get_db),
 ):
     """Return the current student's per‑topic progress and recommendations."""
-    rows = db.query(Progress).filter(Progress.student_id == current_user.id).all()
+    cached = get_cached_progress(current_user.id)
+    if cached is not None:
+        return cached
+
+    student_filter = Progress.student_id == current_user.id
+    totals = (
+        db.query(
+            func.coalesce(func.sum(Progress.total_correct), 0).label("correct"),
+            func.coalesce(func.sum(Progress.total_questions), 0).label("questions"),
+            func.coalesce(func.sum(Progress.attempt_count), 0).label("attempts"),
+            func.max(Progress.last_attempted_at).label("last_attempt_at"),
+        )
+        .filter(student_filter)
+        .one()
+    )
+
+    # Per-topic detail reads only the columns the response needs
+    rows = (
+        db.query(
+            Topic.name, Progress.accuracy, Progress.attempt_count, Progress.last_attempted_at
+        )
+        .outerjoin(Topic, Progress.topic_id == Topic.id)
+        .filter(student_filter)
+        .all()
+    )
 
     topic_metrics: list[TopicMetric] = []
     weak_topics: list[str] = []
-    total_correct = 0
-    total_questions = 0
-    total_attempts = 0
-    last_attempt_at = None
-
     for r in rows:
-        topic_name = r.topic.name if r.topic else "Unknown"
+        topic_name = r.name or "Unknown"
         topic_metrics.append(
             TopicMetric(
                 topic=topic_name,
@@ -40,16 +61,8 @@ def get_progress(
         if r.accuracy < settings.WEAK_TOPIC_THRESHOLD:
             weak_topics.append(topic_name)
 
-        total_correct += r.total_correct
-        total_questions += r.total_questions
-        total_attempts += r.attempt_count
-        if r.last_attempted_at and (
-            last_attempt_at is None or r.last_attempted_at > last_attempt_at
-        ):
-            last_attempt_at = r.last_attempted_at
-
     overall_accuracy = (
-        round(total_correct / total_questions, 4) if total_questions else 0.0
+        round(totals.correct / totals.questions, 4) if totals.questions else 0.0
     )
 
     # Simple recommendation engine
@@ -58,17 +71,19 @@ def get_progress(
         recommendations.append(
             f"Practice more {wt} questions — your accuracy is below {settings.WEAK_TOPIC_THRESHOLD:.0%}."
         )
-    if not weak_topics and total_attempts > 0:
+    if not weak_topics and totals.attempts > 0:
         recommendations.append(
             "Great job! All topics are above the threshold. Try a real exam simulation!"
         )
 
-    return ProgressRead(
+    progress = ProgressRead(
         student_id=current_user.id,
         overall_accuracy=overall_accuracy,
-        total_attempts=total_attempts,
+        total_attempts=totals.attempts,
         topic_metrics=topic_metrics,
         weak_topics=weak_topics,
         recommendations=recommendations,
-        last_attempt_at=last_attempt_at,
+        last_attempt_at=totals.last_attempt_at,
     )
+    cache_progress(progress)
+    return progress
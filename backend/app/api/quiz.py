@@ -6,18 +6,22 @@ Supports three modes (see copilot-instructions.md):
   - real-exam     → full exam with official timing
 """
 
-import json
 import logging
+import random
+import re
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy.sql.expression import func
+from pydantic_core import from_json
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, joinedload
 
 from app.api.deps import get_current_user
 from app.config import settings
 from app.db.models import (
     Document,
+    DocumentCategoryEnum,
     DocumentShare,
     EducationLevelEnum,
     IngestionStatusEnum,
@@ -34,6 +38,7 @@ from app.db.models import (
 )
 from app.db.session import get_db
 from app.schemas.quiz import QuestionRead, QuizGenerateRequest, QuizRead
+from app.services.doc_lookup import get_latest_collection
 from app.services.rag_client import get_rag_client
 
 logger = logging.getLogger(__name__)
@@ -63,15 +68,8 @@ Return ONLY valid JSON array like: [{{"text":"...","question_type":"mcq","option
 
 def _get_best_collection(db: Session) -> str | None:
     """Find a RAG collection from an ingested document."""
-    doc = (
-        db.query(Document)
-        .filter(Document.ingestion_status == IngestionStatusEnum.COMPLETED)
-        .order_by(Document.created_at.desc())
-        .first()
-    )
-    if doc:
-        return f"{doc.level.value}_{doc.subject}".replace(" ", "_")
-    return None
+    latest = get_latest_collection(db)
+    return latest[0] if latest else None
 
 
 def _get_collection_name(doc: Document) -> str | None:
@@ -81,17 +79,45 @@ def _get_collection_name(doc: Document) -> str | None:
     return f"{doc.level.value}_{doc.subject}".replace(" ", "_")
 
 
-def _get_or_create_topic(db: Session, name: str, subject: str = "General") -> Topic:
-    """Get existing topic or create a new one."""
-    topic = db.query(Topic).filter(Topic.name == name, Topic.subject == subject).first()
-    if not topic:
+def _get_or_create_topics(
+    db: Session, names: set[str], subject: str = "General"
+) -> dict[str, Topic]:
+    """Get existing topics or create new ones, for a whole batch of names."""
+    if not names:
+        return {}
+    topics = {
+        t.name: t
+        for t in db.query(Topic).filter(Topic.subject == subject, Topic.name.in_(names))
+    }
+    missing = names - topics.keys()
+    if missing:
         # Also check by name alone (less strict)
-        topic = db.query(Topic).filter(Topic.name == name).first()
-    if not topic:
-        topic = Topic(name=name, subject=subject)
-        db.add(topic)
+        for t in db.query(Topic).filter(Topic.name.in_(missing)):
+            topics.setdefault(t.name, t)
+    created = [Topic(name=n, subject=subject) for n in names - topics.keys()]
+    if created:
+        db.add_all(created)
         db.flush()
-    return topic
+        topics.update((t.name, t) for t in created)
+    return topics
+
+
+def _existing_questions_by_text(db: Session, items: list[dict]) -> dict[str, Question]:
+    """Map the texts of parsed RAG items to questions already stored, in one query."""
+    texts = {item.get("text", "").strip() for item in items} - {""}
+    if not texts:
+        return {}
+    return {q.text: q for q in db.query(Question).filter(Question.text.in_(texts))}
+
+
+def _new_topic_names(items: list[dict], existing: dict[str, Question], default: str) -> set[str]:
+    """Topics of parsed RAG items that will become new questions."""
+    names = set()
+    for item in items:
+        text = item.get("text", "").strip()
+        if len(text) >= 10 and text not in existing:
+            names.add(item.get("topic", default))
+    return names
 
 
 def _get_or_create_rag_document(db: Session, uploader_id: uuid.UUID) -> Document:
@@ -112,29 +138,73 @@ def _get_or_create_rag_document(db: Session, uploader_id: uuid.UUID) -> Document
     return doc
 
 
+_JSON_FENCE = re.compile(r"```(?:json)?\s*(\[.*?\])\s*```", re.DOTALL)
+
+
 def _parse_questions_json(raw: str) -> list[dict]:
     """Extract a JSON array from the LLM response, even if wrapped in markdown."""
-    text = raw.strip()
-    # Strip markdown code fences if present
-    if "```" in text:
-        parts = text.split("```")
-        for part in parts:
-            stripped = part.strip()
-            if stripped.startswith("json"):
-                stripped = stripped[4:].strip()
-            if stripped.startswith("["):
-                text = stripped
-                break
-    # Find the JSON array
-    start = text.find("[")
-    end = text.rfind("]")
-    if start == -1 or end == -1:
-        return []
+    fenced = _JSON_FENCE.search(raw)
+    if fenced:
+        text = fenced.group(1)
+    else:
+        # Find the JSON array
+        start = raw.find("[")
+        end = raw.rfind("]")
+        if start == -1 or end == -1:
+            return []
+        text = raw[start : end + 1]
     try:
-        return json.loads(text[start : end + 1])
-    except json.JSONDecodeError:
+        parsed = from_json(text)
+    except ValueError:
         logger.warning("Failed to parse questions JSON from LLM response")
         return []
+    return parsed if isinstance(parsed, list) else []
+
+
+# Large requests are split into small prompts that run concurrently, so the
+# LLM time tracks the slowest batch rather than the total question count.
+_GEN_BATCH_SIZE = 3
+
+
+def _generate_question_items(collection: str, count: int, topic_hint: str) -> list[dict]:
+    """Ask the RAG service for *count* questions in concurrent small batches.
+
+    Returns the parsed items de-duplicated on text and trimmed to *count*.
+    Re-raises the first error only if every batch failed.
+    """
+    if count <= 0:
+        return []
+    client = get_rag_client()
+    sizes = [min(_GEN_BATCH_SIZE, count - i) for i in range(0, count, _GEN_BATCH_SIZE)]
+
+    def run(index: int, size: int) -> dict:
+        hint = topic_hint
+        if len(sizes) > 1:
+            # Distinct prompts also keep the batches from sharing a cache entry
+            hint += f"\nThis is set {index + 1} of {len(sizes)}; cover different content from the other sets."
+        prompt = _QUESTION_GEN_PROMPT.format(count=size, topic_hint=hint)
+        return client.query(question=prompt, collection=collection, top_k=15)
+
+    with ThreadPoolExecutor(max_workers=min(len(sizes), settings.RAG_CONCURRENCY_LIMIT)) as pool:
+        futures = [pool.submit(run, i, size) for i, size in enumerate(sizes)]
+
+    items: list[dict] = []
+    seen: set[str] = set()
+    errors: list[Exception] = []
+    for future in futures:
+        try:
+            result = future.result()
+        except Exception as e:
+            errors.append(e)
+            continue
+        for item in _parse_questions_json(result.get("answer", "")):
+            text = item.get("text", "").strip()
+            if text not in seen:
+                seen.add(text)
+                items.append(item)
+    if errors and not items:
+        raise errors[0]
+    return items[:count]
 
 
 def _generate_questions_via_rag(
@@ -148,20 +218,12 @@ def _generate_questions_via_rag(
     Use the RAG service to generate structured exam questions from ingested content.
     Returns a list of Question ORM objects (already added to session).
     """
-    client = get_rag_client()
-
     # Determine collection and subject
     subject = "General"
     if not collection:
-        doc = (
-            db.query(Document)
-            .filter(Document.ingestion_status == IngestionStatusEnum.COMPLETED)
-            .order_by(Document.created_at.desc())
-            .first()
-        )
-        if doc:
-            collection = f"{doc.level.value}_{doc.subject}".replace(" ", "_")
-            subject = doc.subject
+        latest = get_latest_collection(db)
+        if latest:
+            collection, subject = latest
     if not collection:
         logger.warning("No ingested collections found for question generation")
         return []
@@ -170,32 +232,30 @@ def _generate_questions_via_rag(
     if topic_names:
         topic_hint = f"Focus on these topics: {', '.join(topic_names)}."
 
-    prompt = _QUESTION_GEN_PROMPT.format(count=count, topic_hint=topic_hint)
-
     try:
-        result = client.query(question=prompt, collection=collection, top_k=15)
+        parsed = _generate_question_items(collection, count, topic_hint)
     except Exception as e:
         logger.error("RAG query failed: %s", e)
         return []
 
-    answer_text = result.get("answer", "")
-    parsed = _parse_questions_json(answer_text)
-
     if not parsed:
-        logger.warning("RAG returned no parseable questions. Raw: %s", answer_text[:200])
+        logger.warning("RAG returned no parseable questions (collection=%s)", collection)
         return []
 
     # Persist questions
     rag_doc = _get_or_create_rag_document(db, uploader_id)
     new_questions: list[Question] = []
 
+    existing = _existing_questions_by_text(db, parsed[:count])
+    topics = _get_or_create_topics(db, _new_topic_names(parsed[:count], existing, "General"), subject)
+
     for item in parsed[:count]:
         text = item.get("text", "").strip()
         if not text or len(text) < 10:
             continue
 
         # Check duplicate
-        exists = db.query(Question).filter(Question.text == text).first()
+        exists = existing.get(text)
         if exists:
             new_questions.append(exists)
             continue
@@ -204,15 +264,14 @@ def _generate_questions_via_rag(
         q_type = QuestionTypeEnum.MCQ if "mcq" in q_type_str else QuestionTypeEnum.SHORT_ANSWER
 
         options_list = item.get("options")
-        options_str = "|".join(options_list) if options_list and isinstance(options_list, list) else None
+        options = options_list if options_list and isinstance(options_list, list) else None
 
-        topic_name = item.get("topic", "General")
-        topic = _get_or_create_topic(db, topic_name, subject=subject)
+        topic = topics[item.get("topic", "General")]
 
         q = Question(
             text=text,
             question_type=q_type,
-            options=options_str,
+            options=options,
             correct_answer=item.get("correct_answer"),
             difficulty=item.get("difficulty", "medium"),
             topic_id=topic.id,
@@ -220,6 +279,7 @@ def _generate_questions_via_rag(
         )
         db.add(q)
         new_questions.append(q)
+        existing[text] = q
 
     db.flush()
     logger.info("Generated %d questions via RAG (collection=%s)", len(new_questions), collection)
@@ -267,14 +327,12 @@ def generate_quiz(
     mode = QuizModeEnum(body.mode.value)
 
     # ── Real-exam: pick or validate a single paper ────────────────────────
+    # subject_docs already holds every candidate paper, so pick from it
+    # rather than querying documents again.
     exam_doc: Document | None = None
     if mode == QuizModeEnum.REAL_EXAM:
         if body.document_id:
-            exam_doc = db.query(Document).filter(
-                Document.id == body.document_id,
-                Document.subject_id == body.subject_id,
-                Document.ingestion_status == IngestionStatusEnum.COMPLETED,
-            ).first()
+            exam_doc = next((d for d in subject_docs if d.id == body.document_id), None)
             if not exam_doc:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -282,18 +340,11 @@ def generate_quiz(
                 )
         else:
             # Randomly pick a paper from the subject
-            exam_doc = (
-                db.query(Document)
-                .filter(
-                    Document.subject_id == body.subject_id,
-                    Document.ingestion_status == IngestionStatusEnum.COMPLETED,
-                    Document.document_category == "exam_paper",
-                )
-                .order_by(func.random())
-                .first()
-            )
-            if not exam_doc:
-                exam_doc = subject_docs[0]  # fallback to any doc
+            papers = [
+                d for d in subject_docs
+                if d.document_category == DocumentCategoryEnum.EXAM_PAPER
+            ]
+            exam_doc = random.choice(papers) if papers else subject_docs[0]  # fallback to any doc
 
     # ── Build question pool ───────────────────────────────────────────────
     subject_doc_ids = [d.id for d in subject_docs]
@@ -335,7 +386,22 @@ def generate_quiz(
             else:
                 topic_names_for_rag = [body.subject]
 
-    questions = question_query.order_by(func.random()).limit(body.count).all()
+    # Sample ids in Python rather than ORDER BY random(), which sorts every
+    # matching row; the id list comes straight from the indexes.
+    pool_ids = [qid for (qid,) in question_query.with_entities(Question.id)]
+    picked_ids = random.sample(pool_ids, min(body.count, len(pool_ids)))
+    questions = []
+    if picked_ids:
+        by_id = {
+            q.id: q
+            for q in db.query(Question)
+            .options(
+                joinedload(Question.topic),
+                joinedload(Question.source_document).load_only(Document.filename),
+            )
+            .filter(Question.id.in_(picked_ids))
+        }
+        questions = [by_id[qid] for qid in picked_ids]
 
     # ── Generate via RAG if not enough local questions ────────────────────
     if len(questions) < body.count:
@@ -354,20 +420,20 @@ def generate_quiz(
                 topic_hint = f"Focus on {body.subject}"
                 if topic_names_for_rag:
                     topic_hint += f" and topics: {', '.join(topic_names_for_rag)}"
-                prompt = _QUESTION_GEN_PROMPT.format(count=needed, topic_hint=topic_hint)
-                client = get_rag_client()
-                result = client.query(question=prompt, collection=coll, top_k=15)
-                answer_text = result.get("answer", "")
-                parsed = _parse_questions_json(answer_text)
+                parsed = _generate_question_items(coll, needed, topic_hint)
 
                 # Find a source doc for linking the generated questions
                 source_doc = exam_doc if exam_doc else subject_docs[0]
 
+                existing = _existing_questions_by_text(db, parsed[:needed])
+                topics = _get_or_create_topics(
+                    db, _new_topic_names(parsed[:needed], existing, body.subject), body.subject
+                )
                 for item in parsed[:needed]:
                     text = item.get("text", "").strip()
                     if not text or len(text) < 10:
                         continue
-                    exists = db.query(Question).filter(Question.text == text).first()
+                    exists = existing.get(text)
                     if exists:
                         questions.append(exists)
                         needed -= 1
@@ -376,14 +442,13 @@ def generate_quiz(
                     q_type_str = item.get("question_type", "mcq").lower()
                     q_type = QuestionTypeEnum.MCQ if "mcq" in q_type_str else QuestionTypeEnum.SHORT_ANSWER
                     options_list = item.get("options")
-                    options_str = "|".join(options_list) if options_list and isinstance(options_list, list) else None
-                    topic_name = item.get("topic", body.subject)
-                    topic = _get_or_create_topic(db, topic_name, subject=body.subject)
+                    options = options_list if options_list and isinstance(options_list, list) else None
+                    topic = topics[item.get("topic", body.subject)]
 
                     q = Question(
                         text=text,
                         question_type=q_type,
-                        options=options_str,
+                        options=options,
                         correct_answer=item.get("correct_answer"),
                         difficulty=item.get("difficulty", "medium"),
                         topic_id=topic.id,
@@ -391,6 +456,7 @@ def generate_quiz(
                     )
                     db.add(q)
                     questions.append(q)
+                    existing[text] = q
                     needed -= 1
 
                 db.flush()
@@ -420,27 +486,31 @@ def generate_quiz(
     db.add(quiz)
     db.flush()
 
-    for idx, q in enumerate(questions):
-        db.add(QuizQuestion(quiz_id=quiz.id, question_id=q.id, position=idx))
-
-    db.commit()
-    db.refresh(quiz)
+    db.execute(
+        insert(QuizQuestion),
+        [
+            {"quiz_id": quiz.id, "question_id": q.id, "position": idx}
+            for idx, q in enumerate(questions)
+        ],
+    )
 
     # ── Build response ────────────────────────────────────────────────────
+    # Built before the commit expires the loaded questions, so topics and
+    # source documents come from the eager loads / identity map.
     question_reads = [
         QuestionRead(
             id=q.id,
             text=q.text,
             topic=q.topic.name if q.topic else None,
             difficulty=q.difficulty,
-            options=q.options.split("|") if q.options else None,
+            options=q.options or None,
             question_type=q.question_type.value,
             source_document=q.source_document.filename if q.source_document else None,
         )
         for q in questions
     ]
 
-    return QuizRead(
+    result = QuizRead(
         id=quiz.id,
         mode=body.mode,
         duration_minutes=quiz.duration_minutes,
@@ -450,6 +520,8 @@ def generate_quiz(
         document_id=exam_doc.id if exam_doc else None,
         created_at=quiz.created_at,
     )
+    db.commit()
+    return result
 
 
 @router.get("/{quiz_id}", response_model=QuizRead)
@@ -467,24 +539,34 @@ def get_quiz(
             status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found"
         )
 
-    qq_list = (
-        db.query(QuizQuestion)
+    # Plain column rows, in quiz order: no Question/Topic instances to build.
+    rows = (
+        db.query(
+            Question.id,
+            Question.text,
+            Topic.name.label("topic_name"),
+            Question.difficulty,
+            Question.options,
+            Question.question_type,
+            Question.document_id,
+        )
+        .join(QuizQuestion, QuizQuestion.question_id == Question.id)
+        .outerjoin(Topic, Question.topic_id == Topic.id)
         .filter(QuizQuestion.quiz_id == quiz.id)
         .order_by(QuizQuestion.position)
         .all()
     )
-    questions = [qq.question for qq in qq_list]
     question_reads = [
         QuestionRead(
-            id=q.id,
-            text=q.text,
-            topic=q.topic.name if q.topic else None,
-            difficulty=q.difficulty,
-            options=q.options.split("|") if q.options else None,
-            question_type=q.question_type.value,
-            source_document=str(q.document_id),
+            id=r.id,
+            text=r.text,
+            topic=r.topic_name,
+            difficulty=r.difficulty,
+            options=r.options or None,
+            question_type=r.question_type.value,
+            source_document=str(r.document_id),
         )
-        for q in questions
+        for r in rows
     ]
 
     from app.schemas.quiz import QuizMode
@@ -1,15 +1,22 @@
 """RAG proxy endpoints — forwards requests from frontend → RAG micro-service.
 
-Exposes two routes:
-  POST /api/rag/query    → full LLM answer + sources (for "Ask AI" / show solution)
-  POST /api/rag/retrieve → ranked chunks only (for document search preview)
+Exposes three routes:
+  POST /api/rag/query        → full LLM answer + sources (for "Ask AI" / show solution)
+  POST /api/rag/query/stream → same answer, relayed to the client as it arrives
+  POST /api/rag/retrieve     → ranked chunks only (for document search preview)
+
+The RAG client is synchronous, so every upstream call runs in the
+threadpool to keep the event loop free while the LLM works.
 """
 
 import logging
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 
 from app.api.deps import get_current_user, require_admin
 from app.db.models import User
@@ -67,7 +74,36 @@ async def rag_query(
             if body.chat_history
             else None
         )
-        return get_rag_client().query(
+        return await run_in_threadpool(
+            get_rag_client().query,
+            question=body.question,
+            collection=body.collection,
+            top_k=body.top_k,
+            chat_history=history,
+        )
+    except Exception as exc:
+        raise _proxy_error(exc, "query")
+
+
+@router.post("/query/stream")
+async def rag_query_stream(
+    body: RAGQueryRequest,
+    current_user: User = Depends(get_current_user),
+    _rl=Depends(require_rag_rate_limit),
+):
+    """Like ``/query``, but relays the upstream body chunk by chunk.
+
+    Nothing is buffered here, so the first bytes reach the client as soon as
+    the RAG service sends them. Answers are not cached on this route.
+    """
+    history = (
+        [msg.model_dump() for msg in body.chat_history]
+        if body.chat_history
+        else None
+    )
+    try:
+        upstream = await run_in_threadpool(
+            get_rag_client().query_stream,
             question=body.question,
             collection=body.collection,
             top_k=body.top_k,
@@ -75,6 +111,12 @@ async def rag_query(
         )
     except Exception as exc:
         raise _proxy_error(exc, "query")
+    # A sync iterator, so Starlette reads it in the threadpool.
+    return StreamingResponse(
+        upstream.iter_bytes(),
+        media_type=upstream.headers.get("content-type", "application/json"),
+        background=BackgroundTask(upstream.close),
+    )
 
 
 @router.post("/retrieve")
@@ -85,7 +127,8 @@ async def rag_retrieve(
 ):
     """Retrieve top-k ranked chunks for a query (no LLM synthesis)."""
     try:
-        return get_rag_client().retrieve(
+        return await run_in_threadpool(
+            get_rag_client().retrieve,
             query=body.query,
             collection=body.collection,
             top_k=body.top_k,
@@ -115,8 +158,8 @@ async def web_search(
 ):
     """Search the web for supplementary information (DuckDuckGo, free)."""
     try:
-        return get_rag_client().web_search(
-            body.query, max_results=body.max_results
+        return await run_in_threadpool(
+            get_rag_client().web_search, body.query, max_results=body.max_results
         )
     except Exception as exc:
         raise _proxy_error(exc, "web_search")
@@ -130,8 +173,8 @@ async def web_image_search(
 ):
     """Search for images on the web (DuckDuckGo, free)."""
     try:
-        return get_rag_client().web_image_search(
-            body.query, max_results=body.max_results
+        return await run_in_threadpool(
+            get_rag_client().web_image_search, body.query, max_results=body.max_results
         )
     except Exception as exc:
         raise _proxy_error(exc, "web_image_search")
@@ -147,7 +190,7 @@ async def list_collection_images(
 ):
     """List all extracted images in a collection."""
     try:
-        return get_rag_client().get_collection_images(collection)
+        return await run_in_threadpool(get_rag_client().get_collection_images, collection)
     except Exception as exc:
         raise _proxy_error(exc, "list_images")
 
@@ -167,7 +210,9 @@ async def seed_ingest(
 ):
     """Ingest curated documents from the RAG storage/raw/ folder (admin only)."""
     try:
-        return get_rag_client().seed_ingest(body.folder, overwrite=body.overwrite)
+        return await run_in_threadpool(
+            get_rag_client().seed_ingest, body.folder, overwrite=body.overwrite
+        )
     except Exception as exc:
         raise _proxy_error(exc, "seed_ingest")
 
@@ -178,6 +223,6 @@ async def list_seed_folders(
 ):
     """List available seed folders and their PDFs (admin only)."""
     try:
-        return get_rag_client().list_seed_folders()
+        return await run_in_threadpool(get_rag_client().list_seed_folders)
     except Exception as exc:
         raise _proxy_error(exc, "list_seed_folders")
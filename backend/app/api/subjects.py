@@ -3,7 +3,9 @@
 import logging
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic_core import to_json
+from sqlalchemy import delete, exists, func, insert, select, tuple_, update
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user, require_admin
@@ -16,7 +18,7 @@ from app.db.models import (
     StudentSubject,
     User,
 )
-from app.db.session import get_db
+from app.db.session import dialect_insert, get_db
 from app.schemas.subject import (
     EnrollRequest,
     EnrollResponse,
@@ -24,6 +26,14 @@ from app.schemas.subject import (
     SubjectDetailRead,
     SubjectRead,
 )
+from app.services.doc_lookup import invalidate_document_caches
+from app.services.subject_cache import (
+    cache_subject_documents,
+    cache_subjects,
+    get_cached_subject_documents,
+    get_cached_subjects,
+    invalidate_subject_caches,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -82,6 +92,15 @@ _DEFAULT_SUBJECTS: dict[str, list[dict[str, str]]] = {
     ],
 }
 
+# Flattened once at import: (level, name, icon) per default subject, and
+# the (name, level) keys the seed lookup matches on.
+_DEFAULTS_FLAT: tuple[tuple[EducationLevelEnum, str, str | None], ...] = tuple(
+    (EducationLevelEnum(level_str), subj["name"], subj.get("icon"))
+    for level_str, subjects in _DEFAULT_SUBJECTS.items()
+    for subj in subjects
+)
+_DEFAULT_KEYS = [(name, level) for level, name, _ in _DEFAULTS_FLAT]
+
 
 def ensure_default_subjects(db: Session) -> int:
     """Seed default subjects for all education levels.
@@ -89,54 +108,53 @@ def ensure_default_subjects(db: Session) -> int:
     Callable at startup (no auth) or via the admin endpoint.
     Returns the number of new subjects created.
     """
-    created = 0
-    for level_str, subjects in _DEFAULT_SUBJECTS.items():
-        level = EducationLevelEnum(level_str)
-        for subj in subjects:
-            existing = (
-                db.query(Subject)
-                .filter(Subject.name == subj["name"], Subject.level == level)
-                .first()
-            )
-            if not existing:
-                db.add(
-                    Subject(
-                        name=subj["name"],
-                        level=level,
-                        icon=subj.get("icon"),
-                    )
-                )
-                created += 1
-    if created:
+    existing = set(
+        db.query(Subject.name, Subject.level)
+        .filter(tuple_(Subject.name, Subject.level).in_(_DEFAULT_KEYS))
+        .all()
+    )
+    missing = [
+        {"name": name, "level": level, "icon": icon}
+        for level, name, icon in _DEFAULTS_FLAT
+        if (name, level) not in existing
+    ]
+    if missing:
+        db.execute(insert(Subject), missing)
+        _link_unlinked_documents(db)
         db.commit()
-    return created
+        invalidate_subject_caches()
+    return len(missing)
 
 
-def auto_enroll_user_in_level(db: Session, user_id: uuid.UUID, level: EducationLevelEnum) -> int:
+def auto_enroll_user_in_level(
+    db: Session, user_id: uuid.UUID, level: EducationLevelEnum, commit: bool = True
+) -> int:
     """Enroll a user in ALL subjects for a given education level.
 
     Used to auto-enroll practice users (e.g. DRIVING) on registration.
-    Returns the number of new enrollments.
+    Returns the number of new enrollments. With ``commit=False`` the
+    enrollments are left in the caller's transaction.
     """
-    subjects = db.query(Subject).filter(Subject.level == level).all()
-    enrolled = 0
-    for subj in subjects:
-        existing = (
-            db.query(StudentSubject)
-            .filter(
-                StudentSubject.student_id == user_id,
-                StudentSubject.subject_id == subj.id,
-            )
-            .first()
-        )
-        if not existing:
-            db.add(StudentSubject(student_id=user_id, subject_id=subj.id))
-            enrolled += 1
-    if enrolled:
+    subject_ids = [sid for (sid,) in db.query(Subject.id).filter(Subject.level == level)]
+    enrolled = _enroll(db, user_id, subject_ids)
+    if enrolled and commit:
         db.commit()
     return enrolled
 
 
+def _enroll(db: Session, student_id: uuid.UUID, subject_ids: list[uuid.UUID]) -> int:
+    """Insert missing enrollments in one statement; returns how many were new."""
+    if not subject_ids:
+        return 0
+    stmt = (
+        dialect_insert(db)(StudentSubject)
+        .values([{"student_id": student_id, "subject_id": sid} for sid in subject_ids])
+        .on_conflict_do_nothing(index_elements=["student_id", "subject_id"])
+        .returning(StudentSubject.subject_id)
+    )
+    return len(db.execute(stmt).all())
+
+
 @router.post("/seed-defaults", status_code=status.HTTP_201_CREATED)
 def seed_default_subjects(
     _current_user: User = Depends(require_admin),
@@ -175,7 +193,10 @@ def create_subject(
         icon=body.icon,
     )
     db.add(subject)
+    db.flush()
+    _link_unlinked_documents(db)
     db.commit()
+    invalidate_subject_caches()
     db.refresh(subject)
     return _subject_to_read(subject, db, None)
 
@@ -191,18 +212,62 @@ def list_subjects(
     For students: shows subjects for their education level with enrollment status.
     For admins: shows all subjects.
     """
-    query = db.query(Subject)
-
     if level:
-        query = query.filter(Subject.level == EducationLevelEnum(level))
+        level_filter: EducationLevelEnum | None = EducationLevelEnum(level)
     elif (
         current_user.role == RoleEnum.STUDENT
         and current_user.education_level is not None
     ):
-        query = query.filter(Subject.level == current_user.education_level)
+        level_filter = current_user.education_level
+    else:
+        level_filter = None
+    cache_level = level_filter.value if level_filter else None
+
+    reads = get_cached_subjects(cache_level)
+    if reads is None:
+        reads = _list_subject_reads(db, level_filter)
+        cache_subjects(cache_level, reads)
+
+    # The cached listing is shared, so enrollment is overlaid per student
+    if current_user.role == RoleEnum.STUDENT and reads:
+        enrolled_ids = {
+            sid
+            for (sid,) in db.query(StudentSubject.subject_id).filter(
+                StudentSubject.student_id == current_user.id
+            )
+        }
+        reads = [
+            r.model_copy(update={"enrolled": True}) if r.id in enrolled_ids else r
+            for r in reads
+        ]
+    return reads
 
+
+def _list_subject_reads(
+    db: Session, level: EducationLevelEnum | None
+) -> list[SubjectRead]:
+    """Subjects at *level* (or all) with document counts, ``enrolled=False``."""
+    query = db.query(Subject)
+    if level is not None:
+        query = query.filter(Subject.level == level)
     subjects = query.order_by(Subject.name).all()
-    return [_subject_to_read(s, db, current_user) for s in subjects]
+    if not subjects:
+        return []
+
+    # Document counts for every listed subject in one grouped query
+    doc_counts = dict(
+        db.query(Document.subject_id, func.count(Document.id))
+        .filter(
+            Document.subject_id.in_([s.id for s in subjects]),
+            Document.is_archived == False,  # noqa: E712
+        )
+        .group_by(Document.subject_id)
+        .all()
+    )
+    return [
+        _subject_to_read(s, db, None, doc_count=doc_counts.get(s.id, 0), enrolled=False)
+        for s in subjects
+    ]
 
 
 @router.get("/{subject_id}", response_model=SubjectDetailRead)
@@ -238,22 +303,11 @@ def enroll_in_subjects(
             detail="Only students can enroll in subjects",
         )
 
-    enrolled = 0
-    for sid in body.subject_ids:
-        subject = db.query(Subject).filter(Subject.id == sid).first()
-        if not subject:
-            continue
-        existing = (
-            db.query(StudentSubject)
-            .filter(
-                StudentSubject.student_id == current_user.id,
-                StudentSubject.subject_id == sid,
-            )
-            .first()
-        )
-        if not existing:
-            db.add(StudentSubject(student_id=current_user.id, subject_id=sid))
-            enrolled += 1
+    # Unknown ids are skipped, as before.
+    valid_ids = [
+        sid for (sid,) in db.query(Subject.id).filter(Subject.id.in_(set(body.subject_ids)))
+    ]
+    enrolled = _enroll(db, current_user.id, valid_ids)
 
     db.commit()
     return EnrollResponse(
@@ -270,17 +324,13 @@ def unenroll_from_subject(
     db: Session = Depends(get_db),
 ):
     """Unenroll from a subject."""
-    enrollment = (
-        db.query(StudentSubject)
-        .filter(
+    db.execute(
+        delete(StudentSubject).where(
             StudentSubject.student_id == current_user.id,
             StudentSubject.subject_id == subject_id,
         )
-        .first()
     )
-    if enrollment:
-        db.delete(enrollment)
-        db.commit()
+    db.commit()
     return None
 
 
@@ -290,79 +340,121 @@ def get_subject_documents(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """List all documents associated with a subject."""
-    subject = db.query(Subject).filter(Subject.id == subject_id).first()
-    if not subject:
+    """List all documents associated with a subject.
+
+    The list is serialised once and cached as JSON, so cache hits are
+    returned as-is without being parsed and re-encoded.
+    """
+    cached = get_cached_subject_documents(subject_id)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    if not db.query(exists().where(Subject.id == subject_id)).scalar():
         raise HTTPException(status_code=404, detail="Subject not found")
 
-    # Find documents matching this subject name + level
-    docs = (
-        db.query(Document)
+    rows = (
+        db.query(
+            Document.id,
+            Document.filename,
+            Document.subject,
+            Document.level,
+            Document.year,
+            Document.document_category,
+            Document.ingestion_status,
+            Document.page_count,
+            Document.is_personal,
+            Document.official_duration_minutes,
+            Document.uploaded_by,
+            Document.created_at,
+        )
         .filter(
-            Document.subject == subject.name,
-            Document.level == subject.level,
+            Document.subject_id == subject_id,
             Document.is_archived == False,  # noqa: E712
         )
         .order_by(Document.created_at.desc())
         .all()
     )
 
-    return [
+    # UUIDs and datetimes are encoded by to_json directly
+    content = to_json([
         {
-            "id": str(doc.id),
-            "filename": doc.filename,
-            "subject": doc.subject,
-            "level": doc.level.value if hasattr(doc.level, "value") else doc.level,
-            "year": doc.year,
-            "document_category": (
-                doc.document_category.value
-                if hasattr(doc.document_category, "value")
-                else str(doc.document_category)
-            ),
-            "ingestion_status": (
-                doc.ingestion_status.value
-                if hasattr(doc.ingestion_status, "value")
-                else doc.ingestion_status
-            ),
-            "page_count": doc.page_count,
-            "is_personal": doc.is_personal,
-            "official_duration_minutes": doc.official_duration_minutes,
-            "uploaded_by": str(doc.uploaded_by),
-            "created_at": doc.created_at.isoformat(),
+            "id": row.id,
+            "filename": row.filename,
+            "subject": row.subject,
+            "level": row.level.value,
+            "year": row.year,
+            "document_category": row.document_category.value,
+            "ingestion_status": row.ingestion_status.value,
+            "page_count": row.page_count,
+            "is_personal": row.is_personal,
+            "official_duration_minutes": row.official_duration_minutes,
+            "uploaded_by": row.uploaded_by,
+            "created_at": row.created_at,
         }
-        for doc in docs
-    ]
+        for row in rows
+    ])
+    cache_subject_documents(subject_id, content)
+    return Response(content=content, media_type="application/json")
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
 
-def _subject_to_read(
-    subject: Subject, db: Session, current_user: User | None
-) -> SubjectRead:
-    """Convert a Subject model to SubjectRead with computed fields."""
-    doc_count = (
-        db.query(Document)
-        .filter(
-            Document.subject == subject.name,
-            Document.level == subject.level,
-            Document.is_archived == False,  # noqa: E712
+def _link_unlinked_documents(db: Session) -> None:
+    """Point documents uploaded before their subject existed at it.
+
+    Subject pages count and list documents by ``subject_id``; uploads are
+    linked when a matching subject exists, so this only catches the rest.
+    """
+    result = db.execute(
+        update(Document)
+        .where(Document.subject_id.is_(None))
+        .values(
+            subject_id=select(Subject.id)
+            .where(Subject.name == Document.subject, Subject.level == Document.level)
+            .scalar_subquery()
         )
-        .count()
     )
+    if result.rowcount:
+        invalidate_document_caches()
 
-    enrolled = False
-    if current_user and current_user.role == RoleEnum.STUDENT:
-        enrolled = (
-            db.query(StudentSubject)
+
+def _subject_to_read(
+    subject: Subject,
+    db: Session,
+    current_user: User | None,
+    *,
+    doc_count: int | None = None,
+    enrolled: bool | None = None,
+) -> SubjectRead:
+    """Convert a Subject model to SubjectRead with computed fields.
+
+    ``doc_count`` and ``enrolled`` are queried unless precomputed by the
+    caller (as ``list_subjects`` does for the whole page).
+    """
+    if doc_count is None:
+        doc_count = (
+            db.query(Document)
             .filter(
-                StudentSubject.student_id == current_user.id,
-                StudentSubject.subject_id == subject.id,
+                Document.subject_id == subject.id,
+                Document.is_archived == False,  # noqa: E712
             )
-            .first()
-            is not None
+            .count()
         )
 
+    if enrolled is None:
+        enrolled = False
+        if current_user and current_user.role == RoleEnum.STUDENT:
+            enrolled = (
+                db.query(StudentSubject)
+                .filter(
+                    StudentSubject.student_id == current_user.id,
+                    StudentSubject.subject_id == subject.id,
+                )
+                .first()
+                is not None
+            )
+
     return SubjectRead(
         id=subject.id,
         name=subject.name,
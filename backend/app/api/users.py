@@ -36,15 +36,16 @@ def register(body: UserCreate, db: Session = Depends(get_db)):
         ),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    db.flush()  # assigns user.id; committed together with any enrollments
 
     # Auto-enroll practice users (e.g. DRIVING) into all subjects for their level
     if (
         user.account_type == AccountTypeEnum.PRACTICE
         and user.education_level is not None
     ):
-        auto_enroll_user_in_level(db, user.id, user.education_level)
+        auto_enroll_user_in_level(db, user.id, user.education_level, commit=False)
+    db.commit()
+    db.refresh(user)
 
     token = create_access_token(data={"sub": str(user.id), "role": user.role.value})
     return AuthResponse(access_token=token, user=UserRead.model_validate(user))
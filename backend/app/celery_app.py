@@ -17,6 +17,9 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
+    # Ingestion tasks are long and uneven (PDF parsing + OCR); reserve one
+    # task at a time and ack after completion so idle workers pick up new
+    # work. Pair with ``celery worker -Ofair`` (see docker-compose).
     task_acks_late=True,
     worker_prefetch_multiplier=1,
     # Run tasks synchronously in-process when True (dev default, no Redis needed).
@@ -0,0 +1,42 @@
+"""Small in-process caches shared by the API and services."""
+
+import threading
+import time
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """Minimal thread-safe dict with per-entry expiry and a size cap."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: dict[Hashable, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Store *value*; ``ttl`` overrides the cache-wide expiry for this entry."""
+        with self._lock:
+            if len(self._data) >= self.maxsize and key not in self._data:
+                self._data.pop(next(iter(self._data)))  # evict the oldest insert
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
@@ -1,17 +1,21 @@
 """Password hashing and JWT token utilities."""
 
+import time
 from datetime import datetime, timedelta, timezone
 
 from jose import JWTError, jwt
 import bcrypt
 
 from app.config import settings
+from app.core.cache import TTLCache
 
 # ── Password hashing ──────────────────────────────────────────────────────────
 
+_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
 
 def hash_password(plain: str) -> str:
-    """Return bcrypt hash of *plain* password.
+    """Return bcrypt hash of *plain* password, at ``BCRYPT_ROUNDS`` cost.
     
     Args:
         plain: Plain text password
@@ -27,7 +31,7 @@ def hash_password(plain: str) -> str:
             f"Password is {len(plain.encode('utf-8'))} bytes, but bcrypt has a "
             f"72-byte limit. Please use a shorter password."
         )
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(plain.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -42,8 +46,12 @@ def verify_password(plain: str, hashed: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
+    plain_bytes = plain.encode('utf-8')
+    # Inputs bcrypt could never accept are rejected without running the KDF
+    if len(plain_bytes) > 72 or not hashed.startswith(_BCRYPT_PREFIXES):
+        return False
     try:
-        return bcrypt.checkpw(plain.encode('utf-8'), hashed.encode('utf-8'))
+        return bcrypt.checkpw(plain_bytes, hashed.encode('utf-8'))
     except Exception:
         return False
 
@@ -64,9 +72,25 @@ def create_access_token(
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+# Verified payloads by token: clients send the same token on every request,
+# so only the first one pays for the signature check and JSON parse.
+_decoded_tokens = TTLCache(maxsize=10_000, ttl=60)
+
+
 def decode_access_token(token: str) -> dict | None:
-    """Decode and validate a JWT. Returns payload dict or None on failure."""
+    """Decode and validate a JWT. Returns payload dict or None on failure.
+
+    Valid payloads are cached for up to a minute, never past their ``exp``.
+    """
+    payload = _decoded_tokens.get(token)
+    if payload is not None:
+        return payload
     try:
-        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     except JWTError:
         return None
+    exp = payload.get("exp")
+    ttl = _decoded_tokens.ttl if exp is None else min(_decoded_tokens.ttl, exp - time.time())
+    if ttl > 0:
+        _decoded_tokens.set(token, payload, ttl=ttl)
+    return payload
@@ -15,6 +15,8 @@ Tables
 """
 
 import enum
+import os
+import time
 import uuid
 from datetime import datetime, timezone
 
@@ -24,12 +26,15 @@ from sqlalchemy import (
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
+    JSON,
     String,
     Text,
     UniqueConstraint,
+    text,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.session import Base
@@ -46,6 +51,23 @@ def _uuid() -> uuid.UUID:
     return uuid.uuid4()
 
 
+def uuid7() -> uuid.UUID:
+    """Return a time-ordered UUIDv7 (RFC 9562).
+
+    48-bit Unix-millisecond timestamp followed by random bits, so ids
+    generated later sort later. Used where inserts should land on the
+    right-most B-tree leaf instead of a random page.
+    """
+    ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76  # version
+    value |= ((rand >> 62) & 0xFFF) << 64  # rand_a
+    value |= 0b10 << 62  # variant
+    value |= rand & ((1 << 62) - 1)  # rand_b
+    return uuid.UUID(int=value)
+
+
 # ── Enums (stored as VARCHAR via SQLAlchemy Enum) ─────────────────────────────
 
 
@@ -255,7 +277,7 @@ class Document(Base):
     __tablename__ = "documents"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=_uuid
+        UUID(as_uuid=True), primary_key=True, default=uuid7
     )
     filename: Mapped[str] = mapped_column(String(500))
     subject: Mapped[str] = mapped_column(String(100), index=True)
@@ -319,6 +341,43 @@ class Document(Base):
         "User", foreign_keys=[archived_by],
     )
 
+    __table_args__ = (
+        Index(
+            "ix_documents_list",
+            "is_archived",
+            "is_personal",
+            "level",
+            "uploaded_by",
+            postgresql_include=["subject_id", "created_at"],
+        ),
+        # Practice lookups only consider ingested documents.
+        Index(
+            "ix_documents_subject_completed",
+            "subject_id",
+            postgresql_where=text("ingestion_status = 'COMPLETED'"),
+        ),
+        Index(
+            "ix_documents_subject_level_completed",
+            "subject",
+            "level",
+            postgresql_where=text("ingestion_status = 'COMPLETED'"),
+        ),
+        # Subject document counts and listings skip archived documents.
+        Index(
+            "ix_documents_subject_active",
+            "subject_id",
+            postgresql_where=text("is_archived = false"),
+        ),
+        # Latest ingested document (fallback RAG collection).
+        Index(
+            "ix_documents_completed_created",
+            "created_at",
+            postgresql_where=text("ingestion_status = 'COMPLETED'"),
+        ),
+        # Resolving RAG source file names to documents.
+        Index("ix_documents_filename", "filename"),
+    )
+
 
 # ── Document Comments / Highlights (admin annotations) ────────────────────────
 
@@ -381,6 +440,7 @@ class DocumentShare(Base):
 
     __table_args__ = (
         UniqueConstraint("document_id", "shared_with_user_id", name="uq_document_share"),
+        Index("ix_document_shares_user_document", "shared_with_user_id", "document_id"),
     )
 
 
@@ -397,9 +457,9 @@ class Question(Base):
     question_type: Mapped[QuestionTypeEnum] = mapped_column(
         Enum(QuestionTypeEnum, name="question_type_enum"), default=QuestionTypeEnum.MCQ
     )
-    options: Mapped[str | None] = mapped_column(
-        Text, nullable=True
-    )  # JSON string for MCQ
+    options: Mapped[list[str] | None] = mapped_column(
+        JSON().with_variant(JSONB(), "postgresql"), nullable=True
+    )  # MCQ option texts, in A/B/C/D order
     correct_answer: Mapped[str | None] = mapped_column(Text, nullable=True)
     difficulty: Mapped[str | None] = mapped_column(String(20), nullable=True)
     source_page: Mapped[int | None] = mapped_column(Integer, nullable=True)
@@ -413,12 +473,22 @@ class Question(Base):
         DateTime(timezone=True), default=_utcnow
     )
 
-    topic: Mapped["Topic | None"] = relationship(back_populates="questions")
+    # Topic names are shown wherever questions are; topics is a small table.
+    topic: Mapped["Topic | None"] = relationship(back_populates="questions", lazy="joined")
     source_document: Mapped["Document"] = relationship(back_populates="questions")
     solution: Mapped["Solution | None"] = relationship(
         back_populates="question", uselist=False, cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index("ix_questions_document_id", "document_id"),
+        # Topic-focused and adaptive quizzes filter on topic_id IN (...).
+        Index("ix_questions_topic_id", "topic_id"),
+        # Duplicate checks for RAG-generated questions match on the full
+        # text; a hash index has no btree key-size limit for long texts.
+        Index("ix_questions_text_hash", "text", postgresql_using="hash"),
+    )
+
 
 # ── Solutions ─────────────────────────────────────────────────────────────────
 
@@ -572,7 +642,7 @@ class AttemptAnswer(Base):
     is_correct: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
 
     attempt: Mapped["Attempt"] = relationship(back_populates="answers")
-    question: Mapped["Question"] = relationship("Question")
+    question: Mapped["Question"] = relationship("Question", lazy="joined")
 
 
 # ── Progress (per‑student, per‑topic running metrics) ─────────────────────────
@@ -599,10 +669,12 @@ class Progress(Base):
     )
 
     student: Mapped["User"] = relationship(back_populates="progress_records")
-    topic: Mapped["Topic"] = relationship("Topic")
+    topic: Mapped["Topic"] = relationship("Topic", lazy="joined")
 
     __table_args__ = (
         UniqueConstraint("student_id", "topic_id", name="uq_student_topic_progress"),
+        # Weak-topic lookups: student_id = ? AND accuracy < threshold.
+        Index("ix_progress_student_accuracy", "student_id", "accuracy"),
     )
 
 
@@ -640,6 +712,10 @@ class PracticeSession(Base):
     completed_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # Set once the session's answers have been added to Progress.
+    progress_applied_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
     student: Mapped["User"] = relationship("User")
     subject: Mapped["Subject | None"] = relationship("Subject")
@@ -648,6 +724,11 @@ class PracticeSession(Base):
         back_populates="session", cascade="all, delete-orphan"
     )
 
+    # Keyset pagination of a student's sessions, newest first.
+    __table_args__ = (
+        Index("ix_practice_sessions_student_created", "student_id", "created_at", "id"),
+    )
+
 
 class PracticeAnswer(Base):
     """A student's answer to a single practice question, graded by RAG."""
@@ -718,6 +799,10 @@ class ChatMessage(Base):
     """A single message in a chat session."""
 
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Session transcripts and per-session message counts.
+        Index("ix_chat_messages_session_created", "session_id", "created_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=_uuid
@@ -2,7 +2,9 @@
 
 from typing import Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from app.config import settings
@@ -16,11 +18,20 @@ def get_engine():
     """Get or create SQLAlchemy engine."""
     global _engine
     if _engine is None:
+        is_psycopg = make_url(settings.DATABASE_URL).get_driver_name() == "psycopg"
         _engine = create_engine(
             settings.DATABASE_URL,
             echo=settings.DATABASE_ECHO,
             pool_pre_ping=True,
+            connect_args=(
+                {"prepare_threshold": settings.DB_PREPARE_THRESHOLD} if is_psycopg else {}
+            ),
         )
+        if is_psycopg:
+            # prepared_max is a connection attribute, not a connect() option
+            @event.listens_for(_engine, "connect")
+            def _set_prepared_max(dbapi_conn, _record) -> None:
+                dbapi_conn.prepared_max = settings.DB_PREPARED_MAX
     return _engine
 
 
@@ -41,6 +52,13 @@ def engine():  # type: ignore[misc]
     return get_engine()
 
 
+def dialect_insert(db: Session):
+    """Return the dialect-specific ``insert`` that supports ON CONFLICT."""
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert
+    return pg_insert
+
+
 class Base(DeclarativeBase):
     """Shared declarative base for all ORM models."""
 
@@ -3,6 +3,7 @@
 import logging
 from contextlib import asynccontextmanager
 
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -21,6 +22,7 @@ from app.api import (
     subjects_router,
     practice_router,
 )
+from app.services.rag_client import close_rag_client
 
 logging.basicConfig(
     level=logging.DEBUG if settings.DEBUG else logging.INFO,
@@ -32,7 +34,9 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("🚀 E-exam-prepare backend starting…")
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
     yield
+    close_rag_client()
     logger.info("✅ E-exam-prepare backend shut down")
 
 
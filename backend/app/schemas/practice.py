@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from enum import Enum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class PracticeStatus(str, Enum):
@@ -70,6 +70,12 @@ class PracticeAnswerSubmit(BaseModel):
     answer_image_base64: str | None = None
 
 
+class PracticeAnswerBatchSubmit(BaseModel):
+    """Submit several practice answers in one request."""
+
+    answers: list[PracticeAnswerSubmit] = Field(min_length=1)
+
+
 class SourceReference(BaseModel):
     """A reference to where in the document the answer was found."""
 
@@ -0,0 +1,112 @@
+"""Short-lived, in-process caches for document lookups on hot paths.
+
+The set of ingested documents only changes when an ingestion finishes, yet
+practice endpoints look it up on every request. Entries expire after
+``ttl`` seconds so other workers' ingestions show up without coordination;
+``invalidate_document_caches`` clears them immediately in this process.
+"""
+
+import uuid
+from collections.abc import Iterable
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.db.models import Document, IngestionStatusEnum, Subject
+
+
+_subject_doc_ids = TTLCache(maxsize=1024, ttl=60)
+
+
+def get_subject_doc_ids(
+    db: Session, subject_id: uuid.UUID, subject: Subject | None = None
+) -> list[uuid.UUID]:
+    """Ids of COMPLETED documents in a subject, cached per subject.
+
+    Matches on the ``subject_id`` FK first and falls back to the text
+    ``subject`` + ``level`` columns for documents that were never linked.
+    """
+    cached = _subject_doc_ids.get(subject_id)
+    if cached is not None:
+        return cached
+
+    doc_ids = [
+        d.id for d in db.query(Document.id).filter(
+            Document.subject_id == subject_id,
+            Document.ingestion_status == IngestionStatusEnum.COMPLETED,
+        ).all()
+    ]
+    if not doc_ids and subject:
+        doc_ids = [
+            d.id for d in db.query(Document.id).filter(
+                Document.subject == subject.name,
+                Document.level == subject.level,
+                Document.ingestion_status == IngestionStatusEnum.COMPLETED,
+            ).all()
+        ]
+    _subject_doc_ids.set(subject_id, doc_ids)
+    return doc_ids
+
+
+def resolve_document_ids(db: Session, filenames: Iterable[str]) -> dict[str, str]:
+    """Look up document ids for RAG-reported file names.
+
+    Stored files are named ``"<prefix>_<filename>"``, which is what the RAG
+    service may report as file_name. Both forms are resolved with a single
+    ``filename IN (...)`` query (the prefix is stripped to get candidate
+    filenames) and stored basenames are confirmed against ``file_path``;
+    exact filename matches take priority.
+    """
+    names = set(filenames)
+    if not names:
+        return {}
+    candidates = names | {n.split("_", 1)[1] for n in names if "_" in n}
+    rows = (
+        db.query(Document.id, Document.filename, Document.file_path)
+        .filter(Document.filename.in_(candidates))
+        .all()
+    )
+    resolved: dict[str, str] = {}
+    for row in rows:
+        basename = (row.file_path or "").rsplit("/", 1)[-1]
+        if basename in names:
+            resolved.setdefault(basename, str(row.id))
+    for row in rows:
+        if row.filename in names:
+            resolved[row.filename] = str(row.id)
+    return resolved
+
+
+_latest_collection = TTLCache(maxsize=1, ttl=30)
+
+
+def get_latest_collection(db: Session) -> tuple[str, str] | None:
+    """``(collection, subject)`` of the most recently uploaded ingested document.
+
+    Used as the fallback RAG collection when a request names none; cached
+    because quiz generation and AI reviews may each look it up repeatedly.
+    """
+    latest = _latest_collection.get("latest")
+    if latest is None:
+        row = (
+            db.query(Document.level, Document.subject)
+            .filter(Document.ingestion_status == IngestionStatusEnum.COMPLETED)
+            .order_by(Document.created_at.desc())
+            .first()
+        )
+        # Cache "nothing ingested" too, as an empty tuple
+        latest = (f"{row.level.value}_{row.subject}".replace(" ", "_"), row.subject) if row else ()
+        _latest_collection.set("latest", latest)
+    return latest or None
+
+
+def invalidate_document_caches(subject_id: uuid.UUID | None = None) -> None:
+    """Drop cached lookups for one subject, or everything if ``None``.
+
+    The latest collection covers all documents, so it is always rebuilt.
+    """
+    _latest_collection.clear()
+    if subject_id is None:
+        _subject_doc_ids.clear()
+    else:
+        _subject_doc_ids.pop(subject_id)
@@ -12,6 +12,7 @@ from __future__ import annotations
 import logging
 import re
 import json
+import unicodedata
 from typing import Any
 
 logger = logging.getLogger(__name__)
@@ -26,11 +27,12 @@ _MULTI_SPACE = re.compile(r"\s+")
 def _normalise(text: str) -> str:
     """Aggressively normalise text for comparison.
 
-    Lowercases, strips articles, punctuation, and collapses whitespace.
+    Applies NFKC (full-width and ligature forms), lowercases, strips
+    articles, punctuation, and collapses whitespace.
     'World Health Organisation' → 'world health organisation'
     'Food, Shelter' → 'food shelter'
     """
-    t = text.lower().strip()
+    t = unicodedata.normalize("NFKC", text).lower().strip()
     t = _STRIP_ARTICLES.sub(" ", t)
     t = _STRIP_PUNCT.sub(" ", t)
     t = _MULTI_SPACE.sub(" ", t).strip()
@@ -83,6 +85,11 @@ def _tier1_normalised_match(student: str, correct: str) -> bool:
     return s == c
 
 
+def answers_match(student: str, correct: str) -> bool:
+    """Public Tier 1 check: equal after normalisation and spelling unification."""
+    return _tier1_normalised_match(student, correct)
+
+
 # ── Tier 2: Token-set match ──────────────────────────────────────────────────
 
 def _tier2_token_match(student: str, correct: str) -> bool:
@@ -0,0 +1,37 @@
+"""PDF helpers shared by the API and the ingestion worker."""
+
+from pathlib import Path
+
+
+def count_pdf_pages(file_path: Path | str) -> int | None:
+    """Count PDF pages, preferring PyMuPDF and falling back to pypdf.
+
+    PyMuPDF reads the page count from the trailer/catalog without walking
+    the page tree, so it is much faster than pypdf on large papers. pypdf
+    is only used when PyMuPDF is not installed.
+    """
+    try:
+        import pymupdf
+    except ImportError:
+        try:
+            import fitz as pymupdf  # PyMuPDF < 1.24.3
+        except ImportError:
+            pymupdf = None
+
+    if pymupdf is not None:
+        try:
+            with pymupdf.open(str(file_path), filetype="pdf") as doc:
+                return doc.page_count
+        except Exception:
+            return None  # Corrupt or invalid PDF
+
+    try:
+        from pypdf import PdfReader
+
+        reader = PdfReader(str(file_path))
+        return len(reader.pages)
+    except ImportError:
+        pass
+    except Exception:
+        pass  # Corrupt or invalid PDF
+    return None
@@ -0,0 +1,71 @@
+"""Redis cache for the per-student ``GET /api/progress`` payload.
+
+Dashboards poll progress far more often than it changes, so the built
+``ProgressRead`` is stored as JSON until the next write to the student's
+Progress rows, which calls :func:`invalidate_progress`.  Like the RAG
+cache, Redis errors are logged and treated as a miss.
+"""
+
+import logging
+import uuid
+
+import redis
+
+from app.config import settings
+from app.schemas.progress import ProgressRead
+
+logger = logging.getLogger(__name__)
+
+_pool: redis.ConnectionPool | None = None
+
+
+def _get_redis() -> redis.Redis:
+    """Return a Redis client backed by a shared connection pool."""
+    global _pool
+    if _pool is None:
+        _pool = redis.ConnectionPool.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            max_connections=10,
+        )
+    return redis.Redis(connection_pool=_pool)
+
+
+def _key(student_id: uuid.UUID) -> str:
+    return f"progress:{student_id}:v1"
+
+
+def get_cached_progress(student_id: uuid.UUID) -> ProgressRead | None:
+    """Return the cached progress payload (or None on miss/disabled)."""
+    if settings.PROGRESS_CACHE_TTL_SECONDS <= 0:
+        return None
+    try:
+        raw = _get_redis().get(_key(student_id))
+        return ProgressRead.model_validate_json(raw) if raw else None
+    except Exception as e:
+        logger.warning("Progress cache read failed (non-fatal): %s", e)
+        return None
+
+
+def cache_progress(progress: ProgressRead) -> None:
+    """Store a freshly built progress payload."""
+    if settings.PROGRESS_CACHE_TTL_SECONDS <= 0:
+        return
+    try:
+        _get_redis().setex(
+            _key(progress.student_id),
+            settings.PROGRESS_CACHE_TTL_SECONDS,
+            progress.model_dump_json(),
+        )
+    except Exception as e:
+        logger.warning("Progress cache write failed (non-fatal): %s", e)
+
+
+def invalidate_progress(student_id: uuid.UUID) -> None:
+    """Drop a student's cached payload after their Progress rows change."""
+    if settings.PROGRESS_CACHE_TTL_SECONDS <= 0:
+        return
+    try:
+        _get_redis().delete(_key(student_id))
+    except Exception as e:
+        logger.warning("Progress cache invalidation failed (non-fatal): %s", e)
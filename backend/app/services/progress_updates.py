@@ -0,0 +1,64 @@
+"""Fold graded answers into a student's per-topic ``Progress`` rows.
+
+All topics are written with one multi-row ``INSERT ... ON CONFLICT
+(student_id, topic_id) DO UPDATE``, so the counters are incremented in
+the database instead of read, modified and written back per topic, and
+concurrent submissions for the same topic cannot race on the insert.
+"""
+
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Float, Numeric, cast, func
+from sqlalchemy.orm import Session
+
+from app.db.models import Progress
+from app.db.session import dialect_insert
+
+
+def apply_topic_tallies(
+    db: Session,
+    student_id: uuid.UUID,
+    tallies: dict[uuid.UUID, tuple[int, int]],
+) -> None:
+    """Add ``{topic_id: (correct, total)}`` to the student's Progress rows.
+
+    Each topic counts as one attempt. Runs in the caller's transaction.
+    """
+    if not tallies:
+        return
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "student_id": student_id,
+            "topic_id": topic_id,
+            "total_correct": correct,
+            "total_questions": total,
+            "accuracy": round(correct / total, 4) if total else 0.0,
+            "attempt_count": 1,
+            "last_attempted_at": now,
+        }
+        for topic_id, (correct, total) in tallies.items()
+    ]
+    stmt = dialect_insert(db)(Progress).values(rows)
+    cols = Progress.__table__.c
+    total_correct = cols.total_correct + stmt.excluded.total_correct
+    total_questions = cols.total_questions + stmt.excluded.total_questions
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["student_id", "topic_id"],
+        set_={
+            "total_correct": total_correct,
+            "total_questions": total_questions,
+            "accuracy": func.coalesce(
+                func.round(
+                    cast(cast(total_correct, Float) / func.nullif(total_questions, 0), Numeric),
+                    4,
+                ),
+                0.0,
+            ),
+            "attempt_count": cols.attempt_count + 1,
+            "last_attempted_at": stmt.excluded.last_attempted_at,
+        },
+    )
+    db.execute(stmt)
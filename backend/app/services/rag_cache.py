@@ -2,12 +2,15 @@
 
 Avoids redundant LLM calls when the same question + collection + params
 have already been answered. Uses content-addressable keys (SHA-256 hash
-of the serialised request).
+of the serialised request); question text is canonicalised first so that
+trivially different phrasings share an entry.
 """
 
 import hashlib
 import json
 import logging
+import re
+import unicodedata
 from typing import Any
 
 import redis
@@ -31,6 +34,19 @@ def _get_redis() -> redis.Redis:
     return redis.Redis(connection_pool=_pool)
 
 
+_WHITESPACE = re.compile(r"\s+")
+
+
+def canonical_question(text: str) -> str:
+    """Fold case, Unicode forms, whitespace and trailing punctuation.
+
+    'What is  Photosynthesis?' and 'what is photosynthesis' map to the same
+    cache key.
+    """
+    t = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE.sub(" ", t).strip().rstrip("?.!").rstrip()
+
+
 def _make_key(prefix: str, params: dict[str, Any]) -> str:
     """Create a deterministic cache key from prefix + sorted param hash."""
     serialised = json.dumps(params, sort_keys=True, default=str)
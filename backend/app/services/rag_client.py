@@ -1,22 +1,31 @@
 """HTTP client for the RAG micro‑service (singleton)."""
 
 import logging
+import threading
 from typing import Any
 
 import httpx
 
 from app.config import settings
-from app.services.rag_cache import cache_get, cache_set
+from app.services.rag_cache import cache_get, cache_set, canonical_question
 
 logger = logging.getLogger(__name__)
 
+# Practice grading fans out several calls per request from threadpool
+# workers; keep enough idle connections around that they reuse them instead
+# of reconnecting (httpx keeps 20 for 5s by default).
+_POOL_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=50, keepalive_expiry=30.0
+)
+_TIMEOUT = httpx.Timeout(60.0, connect=2.0)
+
 
 class RAGClient:
     """Thin wrapper around the RAG service HTTP API."""
 
     def __init__(self, base_url: str = settings.RAG_SERVICE_URL) -> None:
         self._base = base_url.rstrip("/")
-        self._http = httpx.Client(base_url=self._base, timeout=60.0)
+        self._http = httpx.Client(base_url=self._base, timeout=_TIMEOUT, limits=_POOL_LIMITS)
 
     # ── health ────────────────────────────────────────────────────────────
 
@@ -52,7 +61,7 @@ class RAGClient:
         top_k: int = 10,
         filters: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
-        params = {"query": query, "collection": collection, "top_k": top_k}
+        params = {"query": canonical_question(query), "collection": collection, "top_k": top_k}
         cached = cache_get("retrieve", params)
         if cached is not None:
             return cached
@@ -85,7 +94,11 @@ class RAGClient:
         # Skip cache for contextual follow-up questions (contain chat history)
         use_cache = not chat_history
         if use_cache:
-            params = {"question": question, "collection": collection, "top_k": top_k}
+            params = {
+                "question": canonical_question(question),
+                "collection": collection,
+                "top_k": top_k,
+            }
             cached = cache_get("query", params)
             if cached is not None:
                 return cached
@@ -106,6 +119,34 @@ class RAGClient:
             cache_set("query", params, result)
         return result
 
+    def query_stream(
+        self,
+        question: str,
+        collection: str,
+        *,
+        top_k: int = 10,
+        chat_history: list[dict[str, str]] | None = None,
+    ) -> httpx.Response:
+        """Send a query and return the upstream response with its body unread.
+
+        Bypasses the answer cache. Raises ``httpx.HTTPStatusError`` for error
+        responses; otherwise the caller iterates the body and must close it.
+        """
+        payload: dict[str, Any] = {
+            "question": question,
+            "collection": collection,
+            "top_k": top_k,
+            "filters": {},
+        }
+        if chat_history:
+            payload["chat_history"] = chat_history
+        r = self._http.send(self._http.build_request("POST", "/query/", json=payload), stream=True)
+        if r.is_error:
+            r.read()  # so the error detail is available to the caller
+            r.close()
+            r.raise_for_status()
+        return r
+
     # ── direct LLM (no index required) ─────────────────────────────────────
 
     def query_direct(
@@ -212,11 +253,24 @@ class RAGClient:
 # ── singleton accessor ────────────────────────────────────────────────────────
 
 _instance: RAGClient | None = None
+_instance_lock = threading.Lock()
 
 
 def get_rag_client() -> RAGClient:
     global _instance
     if _instance is None:
-        _instance = RAGClient()
-        logger.info("RAG client initialised → %s", _instance._base)
+        # Called from threadpool workers; don't build (and leak) two pools.
+        with _instance_lock:
+            if _instance is None:
+                _instance = RAGClient()
+                logger.info("RAG client initialised → %s", _instance._base)
     return _instance
+
+
+def close_rag_client() -> None:
+    """Close the shared client's connection pool (app shutdown)."""
+    global _instance
+    with _instance_lock:
+        if _instance is not None:
+            _instance.close()
+            _instance = None
@@ -0,0 +1,94 @@
+"""Redis cache for the subject catalogue routes.
+
+``GET /api/subjects`` and ``GET /api/subjects/{id}/documents`` only change
+when an admin adds a subject or a document is uploaded, archived or
+ingested, yet every student dashboard load runs them.  Each is stored as
+one Redis hash (field = level / subject id) that expires
+``SUBJECT_CACHE_TTL_SECONDS`` after its first entry, and the writers call
+:func:`invalidate_subject_caches`.  Listings are cached without the
+per-student ``enrolled`` flag, which the route overlays.  Like the other
+caches, Redis errors are logged and treated as a miss.
+"""
+
+import logging
+import uuid
+
+import redis
+from pydantic import TypeAdapter
+
+from app.config import settings
+from app.schemas.subject import SubjectRead
+
+logger = logging.getLogger(__name__)
+
+_LISTINGS_KEY = "subjects:listings:v1"
+_DOCUMENTS_KEY = "subjects:documents:v1"
+_SUBJECT_LIST = TypeAdapter(list[SubjectRead])
+
+_pool: redis.ConnectionPool | None = None
+
+
+def _get_redis() -> redis.Redis:
+    """Return a Redis client backed by a shared connection pool."""
+    global _pool
+    if _pool is None:
+        _pool = redis.ConnectionPool.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            max_connections=10,
+        )
+    return redis.Redis(connection_pool=_pool)
+
+
+def _get(key: str, field: str) -> str | None:
+    if settings.SUBJECT_CACHE_TTL_SECONDS <= 0:
+        return None
+    try:
+        return _get_redis().hget(key, field)
+    except Exception as e:
+        logger.warning("Subject cache read failed (non-fatal): %s", e)
+        return None
+
+
+def _set(key: str, field: str, raw: bytes) -> None:
+    if settings.SUBJECT_CACHE_TTL_SECONDS <= 0:
+        return
+    try:
+        pipe = _get_redis().pipeline()
+        pipe.hset(key, field, raw)
+        # Expiry runs from the first entry so no field outlives the TTL
+        pipe.expire(key, settings.SUBJECT_CACHE_TTL_SECONDS, nx=True)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Subject cache write failed (non-fatal): %s", e)
+
+
+def get_cached_subjects(level: str | None) -> list[SubjectRead] | None:
+    """Return the cached listing for *level* (``None`` = all levels)."""
+    raw = _get(_LISTINGS_KEY, level or "*")
+    return _SUBJECT_LIST.validate_json(raw) if raw else None
+
+
+def cache_subjects(level: str | None, subjects: list[SubjectRead]) -> None:
+    """Store a listing built with ``enrolled=False`` for every subject."""
+    _set(_LISTINGS_KEY, level or "*", _SUBJECT_LIST.dump_json(subjects))
+
+
+def get_cached_subject_documents(subject_id: uuid.UUID) -> str | None:
+    """Return a subject's cached document list as a JSON string."""
+    return _get(_DOCUMENTS_KEY, str(subject_id))
+
+
+def cache_subject_documents(subject_id: uuid.UUID, content: bytes) -> None:
+    """Store a subject's document list, already encoded as JSON."""
+    _set(_DOCUMENTS_KEY, str(subject_id), content)
+
+
+def invalidate_subject_caches() -> None:
+    """Drop every cached listing after a subject or document write."""
+    if settings.SUBJECT_CACHE_TTL_SECONDS <= 0:
+        return
+    try:
+        _get_redis().delete(_LISTINGS_KEY, _DOCUMENTS_KEY)
+    except Exception as e:
+        logger.warning("Subject cache invalidation failed (non-fatal): %s", e)
@@ -0,0 +1,222 @@
+"""Stream multipart uploads straight from the request body to disk.
+
+Starlette's ``request.form()`` (and therefore FastAPI's ``UploadFile``)
+spools the whole body to a ``SpooledTemporaryFile`` before the route
+handler runs, so a large PDF is written twice and read once before it
+reaches its final location.  ``stream_upload`` instead feeds
+``request.stream()`` chunks into python-multipart's push parser and
+appends the file part to its destination as the bytes arrive; the other
+parts are collected as plain text form fields, with the same limits
+Starlette applies (1 MiB per field, 1000 fields).
+
+Usage
+-----
+```python
+upload = await stream_upload(request, lambda name: UPLOAD_DIR / name)
+meta = validate_form(DocumentCreate, upload.fields)
+```
+"""
+
+import os
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+# Limits on the non-file parts, matching Starlette's form parser defaults.
+MAX_FIELD_SIZE = 1024 * 1024
+MAX_FIELDS = 1000
+
+
+@dataclass
+class StreamedUpload:
+    """Result of :func:`stream_upload`."""
+
+    filename: str | None = None
+    path: Path | None = None
+    fields: dict[str, str] = field(default_factory=dict)
+
+
+async def stream_upload(
+    request: Request,
+    make_dest: Callable[[str], Path],
+    file_field: str = "file",
+) -> StreamedUpload:
+    """Parse a ``multipart/form-data`` body, writing *file_field* to disk.
+
+    ``make_dest`` receives the client filename (once the part headers have
+    been parsed) and returns the path to write to.  Raises 422 when the
+    body is not multipart or the file part is missing, 400 for a malformed
+    body, too many fields or a second file part, and 413 when a text field
+    exceeds ``MAX_FIELD_SIZE``; a partially written file is removed on any
+    error.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=422, detail="Expected a multipart/form-data body")
+
+    result = StreamedUpload()
+    out: BinaryIO | None = None
+    pending: list[bytes] = []  # file bytes parsed from the current chunk
+    headers: dict[bytes, bytes] = {}
+    header_field = bytearray()
+    header_value = bytearray()
+    part_name = ""
+    part_is_file = False
+    part_value = bytearray()
+
+    def on_part_begin() -> None:
+        nonlocal part_name, part_is_file
+        headers.clear()
+        part_value.clear()
+        part_name, part_is_file = "", False
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header_value.extend(data[start:end])
+
+    def on_header_end() -> None:
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished() -> None:
+        nonlocal out, part_name, part_is_file
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        part_name = options.get(b"name", b"").decode("latin-1")
+        if part_name == file_field and b"filename" in options:
+            if out is not None:
+                raise HTTPException(status_code=400, detail="Only one file may be uploaded")
+            part_is_file = True
+            result.filename = options[b"filename"].decode("utf-8", "replace")
+            result.path = make_dest(result.filename)
+            out = open(result.path, "wb")
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if part_is_file:
+            pending.append(data[start:end])
+            return
+        if len(part_value) + end - start > MAX_FIELD_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Field exceeded maximum size of {MAX_FIELD_SIZE // 1024}KB",
+            )
+        part_value.extend(data[start:end])
+
+    def on_part_end() -> None:
+        if not part_is_file and part_name:
+            if part_name not in result.fields and len(result.fields) >= MAX_FIELDS:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Too many fields. Maximum number of fields is {MAX_FIELDS}",
+                )
+            result.fields[part_name] = part_value.decode("utf-8", "replace")
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+        },
+    )
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if pending and out is not None:
+                await run_in_threadpool(out.writelines, pending)
+                pending.clear()
+        parser.finalize()
+        if out is not None:
+            await run_in_threadpool(_drop_from_page_cache, out)
+    except BaseException as exc:
+        if out is not None:
+            out.close()
+            result.path.unlink(missing_ok=True)  # type: ignore[union-attr]
+        if isinstance(exc, MultipartParseError):
+            raise HTTPException(status_code=400, detail="Malformed multipart body") from exc
+        raise
+    finally:
+        if out is not None and not out.closed:
+            out.close()
+
+    if result.path is None:
+        raise RequestValidationError(
+            [{"type": "missing", "loc": ("body", file_field), "msg": "Field required", "input": None}]
+        )
+    return result
+
+
+def _drop_from_page_cache(out: BinaryIO) -> None:
+    """Hint to the kernel that *out*'s pages aren't needed.
+
+    The upload is only read again by the ingestion task, so keeping it in
+    the page cache just evicts hotter pages. Best effort only: pages still
+    dirty are kept until writeback, since syncing here would make the
+    request wait on the disk. No-op where ``posix_fadvise`` is unavailable
+    (macOS, Windows).
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    out.flush()
+    os.posix_fadvise(out.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def validate_form(model: type[BaseModel], fields: dict[str, str]) -> Any:
+    """Validate streamed text fields against *model*, FastAPI-style.
+
+    Empty strings are treated as "not sent" (as FastAPI does for ``Form``
+    parameters) and validation errors surface as the usual 422 response.
+    """
+    data = {k: v for k, v in fields.items() if v != ""}
+    try:
+        return model.model_validate(data)
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in exc.errors()]
+        ) from exc
+
+
+def multipart_openapi(model: type[BaseModel], file_field: str = "file") -> dict[str, Any]:
+    """Build an ``openapi_extra`` request body for a streamed upload route.
+
+    Handlers that read ``request.stream()`` have no ``Form``/``File``
+    parameters for FastAPI to document, so describe the form explicitly.
+    """
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+    properties: dict[str, Any] = {file_field: {"type": "string", "format": "binary"}}
+    for name, prop in schema.get("properties", {}).items():
+        ref = prop.pop("$ref", None)
+        if ref:
+            prop = {**defs[ref.rsplit("/", 1)[-1]], **prop}
+        properties[name] = prop
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": [file_field, *schema.get("required", [])],
+                        "properties": properties,
+                    }
+                }
+            },
+        }
+    }
@@ -1,74 +1,143 @@
 """Background tasks executed by Celery workers."""
 
 import logging
+import uuid
+
+from sqlalchemy.orm import Session
 
 from app.celery_app import celery_app
 from app.db.session import get_session_factory
 from app.db.models import Document, IngestionStatusEnum
+from app.services.doc_lookup import invalidate_document_caches
+from app.services.pdf import count_pdf_pages
 from app.services.rag_client import get_rag_client
+from app.services.subject_cache import invalidate_subject_caches
 
 logger = logging.getLogger(__name__)
 
 
+def _mark_failed(db: Session, document_id: str) -> None:
+    """Best-effort: flag a document as FAILED after an ingestion error."""
+    try:
+        doc = db.query(Document).filter(Document.id == uuid.UUID(document_id)).first()
+        if doc:
+            doc.ingestion_status = IngestionStatusEnum.FAILED
+            db.commit()
+            invalidate_subject_caches()
+    except Exception:
+        db.rollback()
+
+
+def _ingest_one(db: Session, document_id: str, file_path: str) -> dict:
+    """Run the ingestion steps for a single document on an open session.
+
+    Raises on RAG / DB failure so the caller can decide how to retry.
+    """
+    doc = db.query(Document).filter(Document.id == uuid.UUID(document_id)).first()
+    if doc is None:
+        logger.error("Document %s not found — skipping ingestion", document_id)
+        return {"success": False, "error": "document_not_found"}
+
+    # Skip if already completed (idempotency guard)
+    if doc.ingestion_status == IngestionStatusEnum.COMPLETED:
+        logger.info(
+            "Document %s already ingested (status=COMPLETED) — skipping",
+            document_id,
+        )
+        return {"success": True, "skipped": True, "document_id": document_id}
+
+    # 1. Mark as ingesting (and count pages here rather than in the upload
+    #    request, so the 201 response doesn't wait on PDF parsing)
+    doc.ingestion_status = IngestionStatusEnum.INGESTING
+    if doc.page_count is None:
+        doc.page_count = count_pdf_pages(file_path)
+    db.commit()
+    invalidate_subject_caches()
+
+    # 2. Call RAG micro-service
+    rag = get_rag_client()
+    collection = f"{doc.level.value}_{doc.subject}".replace(" ", "_")
+    result = rag.ingest(
+        source_path=file_path,
+        collection=collection,
+        overwrite=False,
+    )
+    logger.info("RAG ingestion complete for %s → %s", document_id, result)
+
+    # 3. Success — persist the collection name so quiz generation can find it
+    doc.collection_name = collection
+    doc.ingestion_status = IngestionStatusEnum.COMPLETED
+    db.commit()
+    invalidate_document_caches(doc.subject_id)
+    invalidate_subject_caches()
+
+    return {"success": True, "document_id": document_id, "rag_result": result}
+
+
 @celery_app.task(bind=True, name="ingest_document", max_retries=3)
 def ingest_document(self, document_id: str, file_path: str) -> dict:
     """Ingest a document into the RAG vector store.
 
     Steps:
-        1. Mark document status → INGESTING
+        1. Mark document status → INGESTING, fill in ``page_count``
         2. Call RAG service ``/ingest``
         3. Mark document status → COMPLETED (or FAILED on error)
     """
     factory = get_session_factory()
     db = factory()
     try:
-        doc = db.query(Document).filter(Document.id == document_id).first()
-        if doc is None:
-            logger.error("Document %s not found — skipping ingestion", document_id)
-            return {"success": False, "error": "document_not_found"}
-
-        # Skip if already completed (idempotency guard)
-        if doc.ingestion_status == IngestionStatusEnum.COMPLETED:
-            logger.info(
-                "Document %s already ingested (status=COMPLETED) — skipping",
-                document_id,
-            )
-            return {"success": True, "skipped": True, "document_id": document_id}
-
-        # 1. Mark as ingesting
-        doc.ingestion_status = IngestionStatusEnum.INGESTING
-        db.commit()
-
-        # 2. Call RAG micro-service
-        rag = get_rag_client()
-        collection = f"{doc.level.value}_{doc.subject}".replace(" ", "_")
-        result = rag.ingest(
-            source_path=file_path,
-            collection=collection,
-            overwrite=False,
-        )
-        logger.info("RAG ingestion complete for %s → %s", document_id, result)
-
-        # 3. Success — persist the collection name so quiz generation can find it
-        doc.collection_name = collection
-        doc.ingestion_status = IngestionStatusEnum.COMPLETED
-        db.commit()
-
-        return {"success": True, "document_id": document_id, "rag_result": result}
+        return _ingest_one(db, document_id, file_path)
 
     except Exception as exc:
         logger.exception("Ingestion failed for document %s", document_id)
-        # Mark as failed in DB
-        try:
-            doc = db.query(Document).filter(Document.id == document_id).first()
-            if doc:
-                doc.ingestion_status = IngestionStatusEnum.FAILED
-                db.commit()
-        except Exception:
-            db.rollback()
+        _mark_failed(db, document_id)
 
         # Retry with exponential back-off (10s, 30s, 90s)
         raise self.retry(exc=exc, countdown=10 * (3**self.request.retries))
 
     finally:
         db.close()
+
+
+# Documents per ingest_document_batch task: enough to amortise per-task
+# overhead while keeping each task well inside the broker visibility timeout.
+INGEST_BATCH_SIZE = 10
+
+
+@celery_app.task(name="ingest_document_batch")
+def ingest_document_batch(items: list[tuple[str, str]]) -> dict:
+    """Ingest many ``(document_id, file_path)`` pairs in a single task.
+
+    Avoids paying per-task broker/worker overhead when a whole set of
+    documents is queued at once (bulk uploads, re-ingestion scripts).
+    Items that fail are marked FAILED and re-queued individually through
+    :func:`ingest_document` so they keep its retry/back-off policy.
+
+    Documents are ingested one after another, so callers should queue
+    small slices (see ``INGEST_BATCH_SIZE``). A long batch would keep
+    other workers idle and, with late acks, could outlive the broker's
+    visibility timeout and be redelivered while still running.
+    """
+    factory = get_session_factory()
+    db = factory()
+    results: list[dict] = []
+    requeued: list[str] = []
+    try:
+        for document_id, file_path in items:
+            try:
+                results.append(_ingest_one(db, document_id, file_path))
+            except Exception:
+                logger.exception("Batch ingestion failed for document %s", document_id)
+                db.rollback()
+                _mark_failed(db, document_id)
+                try:
+                    ingest_document.apply_async(args=(document_id, file_path), countdown=10)
+                    requeued.append(document_id)
+                except Exception:
+                    logger.exception("Could not re-queue document %s", document_id)
+    finally:
+        db.close()
+
+    # Re-queued items (and any that could not be re-queued) have no result
+    success = len(results) == len(items) and all(r.get("success") for r in results)
+    return {"success": success, "results": results, "requeued": requeued}
@@ -7,8 +7,10 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
+from app.config import settings
 from app.db.session import Base, get_db
 from app.main import app
+from app.services.doc_lookup import invalidate_document_caches
 
 
 # Use an in-memory SQLite database for testing with static pool
@@ -24,6 +26,9 @@ TestSession = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 # Create all tables once at startup
 Base.metadata.create_all(bind=engine)
 
+# Minimum bcrypt cost: nearly every test registers and logs in users.
+settings.BCRYPT_ROUNDS = 4
+
 
 @pytest.fixture(autouse=True)
 def mock_celery_tasks():
@@ -36,6 +41,13 @@ def mock_celery_tasks():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_document_caches():
+    """Each test builds its own documents; don't serve ids cached by another."""
+    invalidate_document_caches()
+    yield
+
+
 @pytest.fixture(scope="function")
 def db():
     """Get a fresh DB session for each test."""
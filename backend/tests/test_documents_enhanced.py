@@ -135,8 +135,9 @@ class TestDocumentCategory:
 
 
 class TestPageCount:
-    @patch("app.api.documents._count_pdf_pages", return_value=5)
-    def test_page_count_returned_on_upload(self, mock_count, client: TestClient):
+    @patch("app.tasks.count_pdf_pages", return_value=5)
+    def test_page_count_deferred_to_ingestion(self, mock_count, client: TestClient):
+        """Upload returns immediately; pages are counted by the ingestion task."""
         admin_token = _register_and_login(client, role="admin")
 
         resp = client.post(
@@ -146,34 +147,59 @@ class TestPageCount:
             headers=_auth(admin_token),
         )
         assert resp.status_code == 201
-        assert resp.json()["page_count"] == 5
-        mock_count.assert_called_once()
+        assert resp.json()["page_count"] is None
+        mock_count.assert_not_called()
+
+    @patch("app.tasks.get_rag_client")
+    @patch("app.tasks.count_pdf_pages", return_value=5)
+    def test_ingestion_fills_page_count(self, mock_count, mock_rag, client: TestClient, db: Session, tmp_path):
+        from app.tasks import _ingest_one
 
-    @patch("app.api.documents._count_pdf_pages", return_value=None)
-    def test_page_count_none_when_unavailable(self, mock_count, client: TestClient):
         admin_token = _register_and_login(client, role="admin")
+        admin_id = _get_user_id(client, admin_token)
+        pdf_path = tmp_path / "chem.pdf"
+        pdf_path.write_bytes(_minimal_pdf_bytes())
 
-        resp = client.post(
-            "/api/documents/admin",
-            data={"subject": "Chemistry", "level": "S6", "year": "2023"},
-            files={"file": ("chem.pdf", io.BytesIO(_minimal_pdf_bytes()), "application/pdf")},
-            headers=_auth(admin_token),
+        doc = Document(
+            filename="chem.pdf",
+            subject="Chemistry",
+            level=EducationLevelEnum.S6,
+            year="2023",
+            file_path=str(pdf_path),
+            uploaded_by=uuid.UUID(admin_id),
         )
-        assert resp.status_code == 201
-        assert resp.json()["page_count"] is None
+        db.add(doc)
+        db.commit()
+
+        result = _ingest_one(db, str(doc.id), str(pdf_path))
+        assert result["success"] is True
+        db.refresh(doc)
+        assert doc.page_count == 5
+        mock_count.assert_called_once_with(str(pdf_path))
+
+    def test_batch_reports_failure_for_missing_document(self):
+        from app.tasks import ingest_document_batch
+        from tests.conftest import TestSession
+
+        with patch("app.tasks.get_session_factory", return_value=TestSession):
+            result = ingest_document_batch([(str(uuid.uuid4()), "/fake/missing.pdf")])
 
+        assert result["success"] is False
+        assert result["results"][0]["error"] == "document_not_found"
+        assert result["requeued"] == []
 
-# ── _count_pdf_pages helper ────────────────────────────────────────────────────
+
+# ── count_pdf_pages helper ─────────────────────────────────────────────────────
 
 
 class TestCountPdfPagesHelper:
     def test_counts_valid_pdf(self, tmp_path):
         """Write a minimal PDF and count pages."""
-        from app.api.documents import _count_pdf_pages
+        from app.services.pdf import count_pdf_pages
 
         pdf_file = tmp_path / "test.pdf"
         pdf_file.write_bytes(_minimal_pdf_bytes())
-        count = _count_pdf_pages(pdf_file)
+        count = count_pdf_pages(pdf_file)
         # Our minimal PDF has 1 page object — the result depends on
         # whether pypdf / PyMuPDF is installed.
         if count is not None:
@@ -181,13 +207,13 @@ class TestCountPdfPagesHelper:
 
     def test_returns_none_for_nonpdf(self, tmp_path):
         """A non-PDF file should not crash, just return None or a number."""
-        from app.api.documents import _count_pdf_pages
+        from app.services.pdf import count_pdf_pages
 
         bad = tmp_path / "bad.pdf"
         bad.write_bytes(b"this is not a pdf")
         # Should not raise — graceful fallback
         try:
-            _count_pdf_pages(bad)
+            count_pdf_pages(bad)
         except Exception:
             pass  # acceptable if library raises for corrupt files
 
@@ -226,6 +252,37 @@ class TestServePDF:
         assert resp.headers["content-type"] == "application/pdf"
         assert "serve_test.pdf" in resp.headers.get("content-disposition", "")
 
+    def test_serve_pdf_range_request(self, client: TestClient, db: Session, tmp_path):
+        """Range requests are answered with 206 partial content."""
+        admin_token = _register_and_login(client, role="admin")
+        user_id = _get_user_id(client, admin_token)
+
+        pdf_bytes = _minimal_pdf_bytes()
+        pdf_path = tmp_path / "range_test.pdf"
+        pdf_path.write_bytes(pdf_bytes)
+
+        doc = Document(
+            filename="range_test.pdf",
+            subject="Mathematics",
+            level=EducationLevelEnum.S3,
+            year="2023",
+            file_path=str(pdf_path),
+            uploaded_by=uuid.UUID(user_id),
+            is_personal=False,
+        )
+        db.add(doc)
+        db.commit()
+        db.refresh(doc)
+
+        resp = client.get(
+            f"/api/documents/{doc.id}/pdf",
+            headers={**_auth(admin_token), "Range": "bytes=0-7"},
+        )
+        assert resp.status_code == 206
+        assert resp.content == pdf_bytes[:8]
+        assert resp.headers["content-range"] == f"bytes 0-7/{len(pdf_bytes)}"
+        assert "Content-Range" in resp.headers["access-control-expose-headers"]
+
     def test_serve_pdf_as_level_student(self, client: TestClient, db: Session, tmp_path):
         """Student with matching education_level can view admin-designated PDF."""
         admin_token = _register_and_login(client, role="admin")
@@ -348,3 +405,313 @@ class TestStudentUpload:
             headers=_auth(admin_token),
         )
         assert resp.status_code == 403
+
+
+# ── Archive / Restore ─────────────────────────────────────────────────────────
+
+
+class TestArchiveRestore:
+    def _upload(self, client: TestClient, admin_token: str) -> str:
+        resp = client.post(
+            "/api/documents/admin",
+            data={"subject": "Biology", "level": "S3", "year": "2023"},
+            files={"file": ("bio.pdf", io.BytesIO(_minimal_pdf_bytes()), "application/pdf")},
+            headers=_auth(admin_token),
+        )
+        assert resp.status_code == 201
+        return resp.json()["id"]
+
+    def test_archive_then_restore(self, client: TestClient):
+        admin_token = _register_and_login(client, role="admin")
+        doc_id = self._upload(client, admin_token)
+
+        resp = client.patch(
+            f"/api/documents/{doc_id}/archive",
+            json={"reason": "Duplicate upload"},
+            headers=_auth(admin_token),
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["is_archived"] is True
+        assert data["archive_reason"] == "Duplicate upload"
+        assert data["archiver_name"] == "Test Admin"
+
+        resp = client.patch(f"/api/documents/{doc_id}/restore", headers=_auth(admin_token))
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["is_archived"] is False
+        assert data["archived_by"] is None
+
+    def test_archive_twice_fails(self, client: TestClient):
+        admin_token = _register_and_login(client, role="admin")
+        doc_id = self._upload(client, admin_token)
+
+        client.patch(f"/api/documents/{doc_id}/archive", headers=_auth(admin_token))
+        resp = client.patch(f"/api/documents/{doc_id}/archive", headers=_auth(admin_token))
+        assert resp.status_code == 400
+
+    def test_restore_not_archived_fails(self, client: TestClient):
+        admin_token = _register_and_login(client, role="admin")
+        doc_id = self._upload(client, admin_token)
+
+        resp = client.patch(f"/api/documents/{doc_id}/restore", headers=_auth(admin_token))
+        assert resp.status_code == 400
+
+    def test_archive_not_found(self, client: TestClient):
+        admin_token = _register_and_login(client, role="admin")
+        resp = client.patch(f"/api/documents/{uuid.uuid4()}/archive", headers=_auth(admin_token))
+        assert resp.status_code == 404
+
+
+# ── Sharing ───────────────────────────────────────────────────────────────────
+
+
+class TestShareDocument:
+    def _personal_upload(self, client: TestClient, token: str) -> str:
+        resp = client.post(
+            "/api/documents/student",
+            data={"subject": "French", "level": "S3", "year": "2023"},
+            files={"file": ("notes.pdf", io.BytesIO(_minimal_pdf_bytes()), "application/pdf")},
+            headers=_auth(token),
+        )
+        assert resp.status_code == 201
+        return resp.json()["id"]
+
+    def test_share_counts_only_new_students(self, client: TestClient):
+        owner_token = _register_and_login(client)
+        friend_token = _register_and_login(client)
+        friend_id = _get_user_id(client, friend_token)
+        doc_id = self._personal_upload(client, owner_token)
+
+        resp = client.post(
+            f"/api/documents/{doc_id}/share",
+            json={"student_ids": [friend_id]},
+            headers=_auth(owner_token),
+        )
+        assert resp.status_code == 200
+        assert resp.json()["shared_count"] == 1
+
+        # Sharing again is a no-op
+        resp = client.post(
+            f"/api/documents/{doc_id}/share",
+            json={"student_ids": [friend_id]},
+            headers=_auth(owner_token),
+        )
+        assert resp.status_code == 200
+        assert resp.json()["shared_count"] == 0
+
+        resp = client.get(f"/api/documents/{doc_id}", headers=_auth(friend_token))
+        assert resp.status_code == 200
+        assert resp.json()["is_shared"] is True
+
+    def test_share_with_self_is_skipped(self, client: TestClient):
+        owner_token = _register_and_login(client)
+        owner_id = _get_user_id(client, owner_token)
+        doc_id = self._personal_upload(client, owner_token)
+
+        resp = client.post(
+            f"/api/documents/{doc_id}/share",
+            json={"student_ids": [owner_id]},
+            headers=_auth(owner_token),
+        )
+        assert resp.status_code == 200
+        assert resp.json()["shared_count"] == 0
+
+    def test_share_with_unknown_student_fails(self, client: TestClient):
+        owner_token = _register_and_login(client)
+        doc_id = self._personal_upload(client, owner_token)
+
+        resp = client.post(
+            f"/api/documents/{doc_id}/share",
+            json={"student_ids": [str(uuid.uuid4())]},
+            headers=_auth(owner_token),
+        )
+        assert resp.status_code == 400
+
+    def test_unshare_revokes_access(self, client: TestClient):
+        owner_token = _register_and_login(client)
+        friend_token = _register_and_login(client, level="S6")
+        friend_id = _get_user_id(client, friend_token)
+        doc_id = self._personal_upload(client, owner_token)
+
+        client.post(
+            f"/api/documents/{doc_id}/share",
+            json={"student_ids": [friend_id]},
+            headers=_auth(owner_token),
+        )
+        resp = client.get(f"/api/documents/{doc_id}", headers=_auth(friend_token))
+        assert resp.status_code == 200
+
+        resp = client.delete(
+            f"/api/documents/{doc_id}/share/{friend_id}",
+            headers=_auth(owner_token),
+        )
+        assert resp.status_code == 200
+
+        resp = client.get(f"/api/documents/{doc_id}", headers=_auth(friend_token))
+        assert resp.status_code == 403
+
+        resp = client.get(f"/api/documents/{doc_id}", headers=_auth(owner_token))
+        assert resp.json()["is_shared"] is False
+
+
+# ── Streamed multipart upload ────────────────────────────────────────────────
+
+
+class TestStreamedUpload:
+    def test_large_file_written_intact(self, client: TestClient, db: Session):
+        admin_token = _register_and_login(client, role="admin")
+        payload = _minimal_pdf_bytes() + b"\n%" + b"x" * (3 * 1024 * 1024)
+
+        resp = client.post(
+            "/api/documents/admin",
+            data={"subject": "Geography", "level": "S3", "year": "2023"},
+            files={"file": ("big paper.pdf", io.BytesIO(payload), "application/pdf")},
+            headers=_auth(admin_token),
+        )
+        assert resp.status_code == 201
+        assert resp.json()["filename"] == "big paper.pdf"
+
+        doc = db.query(Document).filter(Document.id == uuid.UUID(resp.json()["id"])).one()
+        assert Path(doc.file_path).read_bytes() == payload
+
+    def test_filename_cannot_escape_upload_dir(self, client: TestClient, db: Session):
+        admin_token = _register_and_login(client, role="admin")
+
+        resp = client.post(
+            "/api/documents/admin",
+            data={"subject": "Geography", "level": "S3", "year": "2023"},
+            files={"file": ("../../escape.pdf", io.BytesIO(_minimal_pdf_bytes()), "application/pdf")},
+            headers=_auth(admin_token),
+        )
+        assert resp.status_code == 201
+
+        doc = db.query(Document).filter(Document.id == uuid.UUID(resp.json()["id"])).one()
+        stored = Path(doc.file_path)
+        assert stored.parent == Path("uploads")
+        assert stored.name.endswith("_escape.pdf")
+
+    def test_missing_form_field_returns_422(self, client: TestClient):
+        admin_token = _register_and_login(client, role="admin")
+
+        resp = client.post(
+            "/api/documents/admin",
+            data={"level": "S3", "year": "2023"},
+            files={"file": ("exam.pdf", io.BytesIO(_minimal_pdf_bytes()), "application/pdf")},
+            headers=_auth(admin_token),
+        )
+        assert resp.status_code == 422
+        assert resp.json()["detail"][0]["loc"] == ["body", "subject"]
+
+    def test_missing_file_returns_422(self, client: TestClient):
+        admin_token = _register_and_login(client, role="admin")
+
+        resp = client.post(
+            "/api/documents/admin",
+            data={"subject": "Geography", "level": "S3", "year": "2023"},
+            files={"notes": ("notes.txt", io.BytesIO(b"hello"), "text/plain")},
+            headers=_auth(admin_token),
+        )
+        assert resp.status_code == 422
+
+    def test_oversized_form_field_returns_413(self, client: TestClient):
+        from app.services.uploads import MAX_FIELD_SIZE
+
+        admin_token = _register_and_login(client, role="admin")
+
+        resp = client.post(
+            "/api/documents/admin",
+            data={"subject": "x" * (MAX_FIELD_SIZE + 1), "level": "S3", "year": "2023"},
+            files={"file": ("exam.pdf", io.BytesIO(_minimal_pdf_bytes()), "application/pdf")},
+            headers=_auth(admin_token),
+        )
+        assert resp.status_code == 413
+
+    def test_second_file_part_rejected_and_first_removed(self, client: TestClient):
+        admin_token = _register_and_login(client, role="admin")
+        before = set(Path("uploads").glob("*"))
+
+        resp = client.post(
+            "/api/documents/admin",
+            data={"subject": "Geography", "level": "S3", "year": "2023"},
+            files=[
+                ("file", ("one.pdf", io.BytesIO(_minimal_pdf_bytes()), "application/pdf")),
+                ("file", ("two.pdf", io.BytesIO(_minimal_pdf_bytes()), "application/pdf")),
+            ],
+            headers=_auth(admin_token),
+        )
+        assert resp.status_code == 400
+        assert set(Path("uploads").glob("*")) == before
+
+    def test_malformed_body_returns_400(self, client: TestClient):
+        admin_token = _register_and_login(client, role="admin")
+
+        resp = client.post(
+            "/api/documents/admin",
+            content=b"--abc\r\nbad header\r\n\r\nx\r\n--abc--\r\n",
+            headers={**_auth(admin_token), "Content-Type": "multipart/form-data; boundary=abc"},
+        )
+        assert resp.status_code == 400
+
+
+# ── Comment count ─────────────────────────────────────────────────────────────
+
+
+class TestCommentCount:
+    def test_comment_count_on_get_and_list(self, client: TestClient):
+        admin_token = _register_and_login(client, role="admin")
+        resp = client.post(
+            "/api/documents/admin",
+            data={"subject": "Kinyarwanda", "level": "TTC", "year": "2024"},
+            files={"file": ("kin.pdf", io.BytesIO(_minimal_pdf_bytes()), "application/pdf")},
+            headers=_auth(admin_token),
+        )
+        doc_id = resp.json()["id"]
+        assert resp.json()["comment_count"] == 0
+
+        for text in ("Blurry scan on page 2", "Answer key missing"):
+            resp = client.post(
+                f"/api/documents/{doc_id}/comments",
+                json={"content": text},
+                headers=_auth(admin_token),
+            )
+            assert resp.status_code == 201
+
+        resp = client.get(f"/api/documents/{doc_id}", headers=_auth(admin_token))
+        assert resp.json()["comment_count"] == 2
+
+        resp = client.get(
+            "/api/documents",
+            params={"subject": "Kinyarwanda", "level": "TTC", "limit": 500},
+            headers=_auth(admin_token),
+        )
+        counts = {d["id"]: d["comment_count"] for d in resp.json()}
+        assert counts[doc_id] == 2
+
+    def test_comment_must_belong_to_document(self, client: TestClient):
+        admin_token = _register_and_login(client, role="admin")
+        doc_ids = []
+        for name in ("a.pdf", "b.pdf"):
+            resp = client.post(
+                "/api/documents/admin",
+                data={"subject": "Kinyarwanda", "level": "TTC", "year": "2024"},
+                files={"file": (name, io.BytesIO(_minimal_pdf_bytes()), "application/pdf")},
+                headers=_auth(admin_token),
+            )
+            doc_ids.append(resp.json()["id"])
+        resp = client.post(
+            f"/api/documents/{doc_ids[0]}/comments",
+            json={"content": "Check question 4"},
+            headers=_auth(admin_token),
+        )
+        comment_id = resp.json()["id"]
+
+        wrong = f"/api/documents/{doc_ids[1]}/comments/{comment_id}"
+        assert client.patch(wrong, json={"resolved": True}, headers=_auth(admin_token)).status_code == 404
+        assert client.delete(wrong, headers=_auth(admin_token)).status_code == 404
+
+        right = f"/api/documents/{doc_ids[0]}/comments/{comment_id}"
+        resp = client.patch(right, json={"resolved": True}, headers=_auth(admin_token))
+        assert resp.status_code == 200
+        assert resp.json()["resolved"] is True
+        assert client.delete(right, headers=_auth(admin_token)).status_code == 204
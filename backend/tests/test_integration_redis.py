@@ -41,6 +41,60 @@ def test_cache():
     print("  ✅ All cache tests passed\n")
 
 
+def test_cache_key_canonicalises_question():
+    from app.services.rag_cache import canonical_question
+
+    assert canonical_question("What is  Photosynthesis?") == "what is photosynthesis"
+    assert canonical_question("ＷＨＡＴ is photosynthesis") == "what is photosynthesis"
+    assert canonical_question("What is respiration?") != "what is photosynthesis"
+
+
+def test_progress_cache():
+    import uuid
+
+    from app.schemas.progress import ProgressRead
+    from app.services.progress_cache import cache_progress, get_cached_progress, invalidate_progress
+
+    student_id = uuid.uuid4()
+    payload = ProgressRead(student_id=student_id, overall_accuracy=0.5, total_attempts=2)
+    cache_progress(payload)
+    assert get_cached_progress(student_id) == payload, "FAIL: cache miss after set"
+
+    invalidate_progress(student_id)
+    assert get_cached_progress(student_id) is None, "FAIL: still cached after invalidation"
+    print("  ✅ Progress cache round-trip + invalidation OK\n")
+
+
+def test_subject_cache():
+    import uuid
+    from datetime import datetime, timezone
+
+    from app.schemas.subject import SubjectRead
+    from app.services.subject_cache import (
+        cache_subject_documents,
+        cache_subjects,
+        get_cached_subject_documents,
+        get_cached_subjects,
+        invalidate_subject_caches,
+    )
+
+    listing = [SubjectRead(
+        id=uuid.uuid4(), name="Physics", level="S6", document_count=3,
+        created_at=datetime.now(timezone.utc),
+    )]
+    subject_id = uuid.uuid4()
+    cache_subjects("S6", listing)
+    cache_subject_documents(subject_id, b'[{"id":"doc-1"}]')
+    assert get_cached_subjects("S6") == listing, "FAIL: listing miss after set"
+    assert get_cached_subjects(None) is None, "FAIL: levels share a cache entry"
+    assert get_cached_subject_documents(subject_id) == '[{"id":"doc-1"}]', "FAIL: documents miss after set"
+
+    invalidate_subject_caches()
+    assert get_cached_subjects("S6") is None, "FAIL: listing cached after invalidation"
+    assert get_cached_subject_documents(subject_id) is None, "FAIL: documents cached after invalidation"
+    print("  ✅ Subject cache round-trip + invalidation OK\n")
+
+
 def test_rate_limiter():
     from app.services.rate_limiter import _check
 
@@ -26,6 +26,7 @@ from app.db.models import (
     IngestionStatusEnum,
     PracticeSession,
     PracticeStatusEnum,
+    Progress,
     Question,
     QuestionTypeEnum,
     Subject,
@@ -215,6 +216,46 @@ class TestStartPractice:
         assert data["document_id"] == str(doc.id)
         assert data["total_questions"] == 3
 
+    def test_start_real_exam_picks_subject_paper(self, client: TestClient, db: Session):
+        admin_token = _register_and_login(client, role="admin")
+        user_id = _get_user_id(client, admin_token)
+        subject = _create_subject(db, name="RealExam")
+        doc = _create_ingested_document(db, user_id, subject="RealExam")
+        empty_subject = _create_subject(db, name="NoPapers")
+
+        student_token = _register_and_login(client)
+        resp = client.post(
+            "/api/practice/start",
+            json={"subject_id": str(subject.id), "mode": "real_exam"},
+            headers=_auth(student_token),
+        )
+        assert resp.status_code == 201
+        assert resp.json()["document_id"] == str(doc.id)
+
+        resp = client.post(
+            "/api/practice/start",
+            json={"subject_id": str(empty_subject.id), "mode": "real_exam"},
+            headers=_auth(student_token),
+        )
+        assert resp.status_code == 404
+
+    def test_start_links_unlinked_subject_documents(self, client: TestClient, db: Session):
+        admin_token = _register_and_login(client, role="admin")
+        user_id = _get_user_id(client, admin_token)
+        subject = _create_subject(db, name="AutoLink")
+        doc = _create_ingested_document(db, user_id, subject="AutoLink")
+        assert doc.subject_id is None
+
+        student_token = _register_and_login(client)
+        resp = client.post(
+            "/api/practice/start",
+            json={"subject_id": str(subject.id)},
+            headers=_auth(student_token),
+        )
+        assert resp.status_code == 201
+        db.refresh(doc)
+        assert doc.subject_id == subject.id
+
     def test_start_with_pending_document_fails(self, client: TestClient, db: Session):
         admin_token = _register_and_login(client, role="admin")
         user_id = _get_user_id(client, admin_token)
@@ -523,6 +564,35 @@ class TestSubmitAnswer:
         assert data["was_handwritten"] is True
         assert data["ocr_text"] == "4"
 
+    @patch("app.api.practice._ocr_handwritten_answer")
+    @patch("app.api.practice.get_rag_client")
+    def test_typed_answer_skips_ocr(self, mock_get_rag, mock_ocr, client: TestClient, db: Session):
+        mock_get_rag.return_value = _mock_rag_grade_correct()
+
+        student_token = _register_and_login(client)
+        subject = _create_subject(db, name="Drama", level="P6")
+
+        start_resp = client.post(
+            "/api/practice/start",
+            json={"subject_id": str(subject.id), "question_count": 2},
+            headers=_auth(student_token),
+        )
+        session_id = start_resp.json()["id"]
+
+        resp = client.post(
+            f"/api/practice/{session_id}/answer",
+            json={
+                "question_text": "What is 2+2?",
+                "answer_text": "4",
+                "answer_image_base64": "aW1hZ2U=",
+            },
+            headers=_auth(student_token),
+        )
+        assert resp.status_code == 200
+        assert resp.json()["student_answer"] == "4"
+        assert resp.json()["was_handwritten"] is False
+        mock_ocr.assert_not_called()
+
     @patch("app.api.practice.get_rag_client")
     def test_submit_to_completed_session_fails(self, mock_get_rag, client: TestClient, db: Session):
         mock_get_rag.return_value = _mock_rag_grade_correct()
@@ -554,6 +624,59 @@ class TestSubmitAnswer:
         assert "not active" in resp.json()["detail"]
 
 
+class TestSubmitAnswerBatch:
+    @patch("app.api.practice.get_rag_client")
+    def test_batch_grades_all_answers(self, mock_get_rag, client: TestClient, db: Session):
+        mock_get_rag.return_value = _mock_rag_grade_correct()
+
+        student_token = _register_and_login(client)
+        subject = _create_subject(db, name="Batch", level="S6")
+
+        start_resp = client.post(
+            "/api/practice/start",
+            json={"subject_id": str(subject.id), "question_count": 3},
+            headers=_auth(student_token),
+        )
+        session_id = start_resp.json()["id"]
+
+        resp = client.post(
+            f"/api/practice/{session_id}/answers/batch",
+            json={"answers": [
+                {"question_text": f"Q{i}", "answer_text": f"A{i}"} for i in range(3)
+            ]},
+            headers=_auth(student_token),
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [a["question_text"] for a in data] == ["Q0", "Q1", "Q2"]
+        assert all(a["is_correct"] for a in data)
+
+        session_resp = client.get(f"/api/practice/{session_id}", headers=_auth(student_token))
+        assert session_resp.json()["answered_count"] == 3
+        assert session_resp.json()["status"] == "completed"
+
+    def test_batch_rejects_more_answers_than_remaining(self, client: TestClient, db: Session):
+        student_token = _register_and_login(client)
+        subject = _create_subject(db, name="Overflow", level="S6")
+
+        start_resp = client.post(
+            "/api/practice/start",
+            json={"subject_id": str(subject.id), "question_count": 1},
+            headers=_auth(student_token),
+        )
+        session_id = start_resp.json()["id"]
+
+        resp = client.post(
+            f"/api/practice/{session_id}/answers/batch",
+            json={"answers": [
+                {"question_text": "Q1", "answer_text": "A1"},
+                {"question_text": "Q2", "answer_text": "A2"},
+            ]},
+            headers=_auth(student_token),
+        )
+        assert resp.status_code == 400
+
+
 # ── Complete Session ───────────────────────────────────────────────────────────
 
 
@@ -578,6 +701,60 @@ class TestCompleteSession:
         assert data["status"] == "completed"
         assert data["completed_at"] is not None
 
+    @patch("app.api.practice.get_rag_client")
+    def test_complete_updates_topic_progress(self, mock_get_rag, client: TestClient, db: Session):
+        mock_get_rag.return_value = _mock_rag_grade_correct()
+        student_token = _register_and_login(client)
+        subject = _create_subject(db, name="ProgressTopic", level="S3")
+
+        for answers in (2, 1):
+            session_id = client.post(
+                "/api/practice/start",
+                json={"subject_id": str(subject.id), "question_count": 5},
+                headers=_auth(student_token),
+            ).json()["id"]
+            client.post(
+                f"/api/practice/{session_id}/answers/batch",
+                json={"answers": [
+                    {"question_text": f"Q{i}", "answer_text": f"A{i}"} for i in range(answers)
+                ]},
+                headers=_auth(student_token),
+            )
+            resp = client.post(f"/api/practice/{session_id}/complete", headers=_auth(student_token))
+            assert resp.status_code == 200
+
+        student_id = db.get(PracticeSession, uuid.UUID(session_id)).student_id
+        prog = db.query(Progress).filter(Progress.student_id == student_id).one()
+        assert prog.topic.name == "ProgressTopic"
+        assert (prog.total_questions, prog.total_correct, prog.attempt_count) == (3, 3, 2)
+        assert prog.accuracy == 1.0
+
+    @patch("app.api.practice.get_rag_client")
+    def test_complete_twice_applies_progress_once(self, mock_get_rag, client: TestClient, db: Session):
+        mock_get_rag.return_value = _mock_rag_grade_correct()
+        student_token = _register_and_login(client)
+        subject = _create_subject(db, name="ProgressOnce", level="S3")
+
+        session_id = client.post(
+            "/api/practice/start",
+            json={"subject_id": str(subject.id), "question_count": 5},
+            headers=_auth(student_token),
+        ).json()["id"]
+        client.post(
+            f"/api/practice/{session_id}/answers/batch",
+            json={"answers": [{"question_text": "Q", "answer_text": "A"}]},
+            headers=_auth(student_token),
+        )
+        for _ in range(2):
+            resp = client.post(f"/api/practice/{session_id}/complete", headers=_auth(student_token))
+            assert resp.status_code == 200
+
+        session = db.get(PracticeSession, uuid.UUID(session_id))
+        db.refresh(session)
+        assert session.progress_applied_at is not None
+        prog = db.query(Progress).filter(Progress.student_id == session.student_id).one()
+        assert (prog.total_questions, prog.attempt_count) == (1, 1)
+
     def test_complete_session_not_found(self, client: TestClient):
         student_token = _register_and_login(client)
         resp = client.post(
@@ -743,6 +920,29 @@ class TestListSessions:
         resp = client.get("/api/practice?limit=2&skip=2", headers=_auth(student_token))
         assert len(resp.json()) == 2
 
+    def test_list_sessions_keyset_pagination(self, client: TestClient, db: Session):
+        student_token = _register_and_login(client)
+        subject = _create_subject(db, name="Keyset", level="S3")
+
+        for _ in range(5):
+            client.post(
+                "/api/practice/start",
+                json={"subject_id": str(subject.id)},
+                headers=_auth(student_token),
+            )
+
+        seen: list[str] = []
+        params = {"limit": 2}
+        while True:
+            page = client.get("/api/practice", params=params, headers=_auth(student_token)).json()
+            if not page:
+                break
+            seen.extend(s["id"] for s in page)
+            params = {"limit": 2, "before": page[-1]["created_at"], "before_id": page[-1]["id"]}
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+
     def test_list_sessions_requires_auth(self, client: TestClient):
         resp = client.get("/api/practice")
         assert resp.status_code == 401
@@ -762,7 +962,7 @@ class TestMCQGrading:
         q = Question(
             text="What is the capital of Rwanda?",
             question_type=QuestionTypeEnum.MCQ,
-            options="Kigali|Nairobi|Kampala|Dar es Salaam",
+            options=["Kigali", "Nairobi", "Kampala", "Dar es Salaam"],
             correct_answer="Kigali",
             document_id=doc.id,
         )
@@ -832,3 +1032,196 @@ class TestParseGradeJson:
         result = _parse_grade_json("")
         assert result["is_correct"] is False
         assert result["score"] == 0.0
+
+
+class TestGradeAnswerWithRag:
+    """Test the split correctness/feedback grading path directly."""
+
+    def _grade(self, **kwargs):
+        import asyncio
+        from app.api.practice import _grade_answer_with_rag
+        args = {
+            "question_text": "Name the capital of Rwanda.",
+            "question_type": "short-answer",
+            "collection": None,
+            "context": ("", []),
+        }
+        return asyncio.run(_grade_answer_with_rag(**{**args, **kwargs}))
+
+    @patch("app.api.practice.get_rag_client")
+    def test_exact_match_skips_llm(self, mock_get_rag):
+        result = self._grade(student_answer="kigali.", correct_answer="Kigali")
+        assert result["is_correct"] is True
+        assert result["score"] == 1.0
+        mock_get_rag.return_value.query_direct.assert_not_called()
+
+    @patch("app.api.practice._retrieve_grading_context")
+    @patch("app.api.practice.get_rag_client")
+    def test_normalised_match_skips_retrieval(self, mock_get_rag, mock_retrieve):
+        result = self._grade(
+            student_answer="Ｐhotosynthesis.",
+            correct_answer="photosynthesis",
+            context=None,
+        )
+        assert result["is_correct"] is True
+        mock_retrieve.assert_not_called()
+        mock_get_rag.return_value.query_direct.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "student_answer, correct_answer",
+        [
+            ("increases the rate of reaction", "decreases the rate of reaction"),
+            ("the cell membrane is impermeable", "the cell membrane is permeable"),
+            ("intracellular", "intercellular"),
+            ("interspecific", "intraspecific"),
+            ("intramolecular", "intermolecular"),
+            ("123456789012", "123456789013"),
+            ("photosynthesys", "photosynthesis"),
+        ],
+    )
+    @patch("app.api.practice.get_rag_client")
+    def test_opposite_meaning_is_not_near_match(self, mock_get_rag, student_answer, correct_answer):
+        mock_get_rag.return_value.query_direct.side_effect = RuntimeError("offline")
+        result = self._grade(student_answer=student_answer, correct_answer=correct_answer)
+        assert result["is_correct"] is not True
+        assert mock_get_rag.return_value.query_direct.called
+
+    @patch("app.api.practice.get_rag_client")
+    def test_essay_typo_goes_to_llm(self, mock_get_rag):
+        mock_get_rag.return_value.query_direct.side_effect = RuntimeError("offline")
+        self._grade(
+            student_answer="photosynthesys",
+            correct_answer="photosynthesis",
+            question_type="essay",
+        )
+        assert mock_get_rag.return_value.query_direct.called
+
+    @patch("app.api.practice.get_rag_client")
+    def test_correctness_and_feedback_are_merged(self, mock_get_rag):
+        verdicts = {
+            "correctness": {"reasoning": "Different city.", "is_correct": False, "score": 0.0},
+            "feedback": {"feedback": "Kigali is the capital.", "correct_answer_explanation": "Kigali"},
+        }
+        mock_get_rag.return_value.query_direct.side_effect = lambda question: {
+            "answer": json.dumps(
+                verdicts["correctness"] if '"is_correct"' in question else verdicts["feedback"]
+            )
+        }
+
+        result = self._grade(student_answer="Huye", correct_answer="Kigali")
+        assert mock_get_rag.return_value.query_direct.call_count == 2
+        assert result["is_correct"] is False
+        assert result["feedback"] == "Kigali is the capital."
+        assert result["correct_answer_explanation"] == "Kigali"
+        assert "reasoning" not in result
+
+
+class TestGenerateRagQuestion:
+    """Test RAG question generation directly with a mocked client."""
+
+    @pytest.mark.parametrize("q_type", ["short-answer", "multiple-choice", "explain"])
+    @patch("app.api.practice.get_rag_client")
+    def test_generates_question_from_retrieved_chunks(self, mock_get_rag, q_type):
+        from app.api.practice import _generate_rag_question
+
+        client = mock_get_rag.return_value
+        client.retrieve.return_value = {
+            "results": [
+                {"content": "Kigali is the capital of Rwanda.", "metadata": {"page_number": 1}},
+            ]
+        }
+        client.query_direct.return_value = {
+            "answer": json.dumps({
+                "text": "What is the capital of Rwanda?",
+                "question_type": "short-answer",
+                "correct_answer": "Kigali",
+                "topic": "Geography",
+            })
+        }
+
+        with patch("app.api.practice._QUESTION_TYPES", (q_type,)):
+            result = _generate_rag_question("S3_Geography", "Geography", 1, 5, ["Name a lake."])
+
+        assert result["text"] == "What is the capital of Rwanda?"
+        assert result["correct_answer"] == "Kigali"
+        assert result["source_references"][0]["page_number"] == 1
+        prompt = client.query_direct.call_args.kwargs["question"]
+        assert '"text": "The question text"' in prompt
+        assert "Name a lake." in prompt
+        expected_type = "short-answer" if q_type == "explain" else q_type
+        assert f'"question_type": "{expected_type}"' in prompt
+        assert ('"options": [' in prompt) == (q_type == "multiple-choice")
+
+    @patch("app.api.practice.get_rag_client")
+    def test_no_chunks_returns_none(self, mock_get_rag):
+        from app.api.practice import _generate_rag_question
+
+        mock_get_rag.return_value.retrieve.return_value = {"results": []}
+        assert _generate_rag_question("S3_Geography", None, 1, 5, []) is None
+        mock_get_rag.return_value.query_direct.assert_not_called()
+
+
+class TestSubjectDocIdCache:
+    def test_cached_until_invalidated(self, client: TestClient, db: Session):
+        from app.services.doc_lookup import get_subject_doc_ids, invalidate_document_caches
+
+        admin_token = _register_and_login(client, role="admin")
+        user_id = _get_user_id(client, admin_token)
+        subject = _create_subject(db, name="Cached", level="S6")
+        first = _create_ingested_document(db, user_id, subject="Cached")
+
+        assert get_subject_doc_ids(db, subject.id, subject) == [first.id]
+
+        second = _create_ingested_document(db, user_id, subject="Cached")
+        assert get_subject_doc_ids(db, subject.id, subject) == [first.id]
+
+        invalidate_document_caches(subject.id)
+        assert set(get_subject_doc_ids(db, subject.id, subject)) == {first.id, second.id}
+
+    def test_latest_collection_cached_until_invalidated(self, client: TestClient, db: Session):
+        from app.services.doc_lookup import get_latest_collection, invalidate_document_caches
+
+        admin_token = _register_and_login(client, role="admin")
+        user_id = _get_user_id(client, admin_token)
+        _create_ingested_document(db, user_id, subject="Older Latest")
+        assert get_latest_collection(db) == ("S6_Older_Latest", "Older Latest")
+
+        _create_ingested_document(db, user_id, subject="Newer Latest")
+        assert get_latest_collection(db) == ("S6_Older_Latest", "Older Latest")
+
+        invalidate_document_caches()
+        assert get_latest_collection(db) == ("S6_Newer_Latest", "Newer Latest")
+
+
+class TestResolveDocumentIds:
+    def test_resolve_document_ids_by_filename_and_basename(self, client: TestClient, db: Session):
+        from app.services.doc_lookup import resolve_document_ids
+
+        admin_token = _register_and_login(client, role="admin")
+        user_id = _get_user_id(client, admin_token)
+        doc = _create_ingested_document(db, user_id)
+        doc.filename = "indexed_paper.pdf"
+        doc.file_path = "uploads/0192abcd_indexed_paper.pdf"
+        db.commit()
+
+        ids = resolve_document_ids(
+            db, {"indexed_paper.pdf", "0192abcd_indexed_paper.pdf", "missing.pdf"}
+        )
+        assert ids == {
+            "indexed_paper.pdf": str(doc.id),
+            "0192abcd_indexed_paper.pdf": str(doc.id),
+        }
+
+
+class TestBoundedContext:
+    def test_chunks_and_total_are_capped(self):
+        from app.api.practice import _MAX_CHUNK_CHARS, _MAX_CONTEXT_CHARS, _bounded_context
+
+        context = _bounded_context([{"content": "x" * 5000}] * 10)
+        assert len(context) <= _MAX_CONTEXT_CHARS
+        assert all(len(part) <= _MAX_CHUNK_CHARS for part in context.split("\n\n"))
+
+    def test_short_chunks_pass_through(self):
+        from app.api.practice import _bounded_context
+
+        assert _bounded_context([{"content": "a"}, {}, {"content": "b"}]) == "a\n\nb"
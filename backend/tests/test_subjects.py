@@ -121,6 +121,31 @@ class TestCreateSubject:
         assert resp2.status_code == 201
         assert resp1.json()["id"] != resp2.json()["id"]
 
+    def test_create_subject_links_existing_documents(self, client: TestClient, db: Session):
+        admin_token = _register_and_login(client, role="admin")
+        admin_id = client.get("/api/users/me", headers=_auth(admin_token)).json()["id"]
+        name = f"Geology_{str(uuid.uuid4())[:6]}"
+        doc = Document(
+            filename="rocks.pdf",
+            subject=name,
+            level=EducationLevelEnum.S6,
+            year="2023",
+            file_path="/fake/rocks.pdf",
+            uploaded_by=uuid.UUID(admin_id),
+        )
+        db.add(doc)
+        db.commit()
+
+        resp = client.post(
+            "/api/subjects",
+            json={"name": name, "level": "S6"},
+            headers=_auth(admin_token),
+        )
+        assert resp.status_code == 201
+        assert resp.json()["document_count"] == 1
+        db.refresh(doc)
+        assert str(doc.subject_id) == resp.json()["id"]
+
     def test_create_subject_requires_admin(self, client: TestClient):
         student_token = _register_and_login(client, role="student")
         resp = client.post(
@@ -182,6 +207,28 @@ class TestListSubjects:
         # Initially all should be unenrolled
         assert all(s["enrolled"] is False for s in data)
 
+    def test_list_subjects_counts_unarchived_documents(self, client: TestClient, db: Session):
+        admin_token = _register_and_login(client, role="admin")
+        admin_id = client.get("/api/users/me", headers=_auth(admin_token)).json()["id"]
+        name = f"Counted_{str(uuid.uuid4())[:6]}"
+        subject = _seed_subject(db, name=name, level="S3")
+        for archived in (False, False, True):
+            db.add(Document(
+                filename="paper.pdf",
+                subject=name,
+                level=EducationLevelEnum.S3,
+                year="2023",
+                file_path="/fake/paper.pdf",
+                uploaded_by=uuid.UUID(admin_id),
+                subject_id=subject.id,
+                is_archived=archived,
+            ))
+        db.commit()
+
+        resp = client.get("/api/subjects?level=S3", headers=_auth(admin_token))
+        counted = [s for s in resp.json() if s["id"] == str(subject.id)]
+        assert counted[0]["document_count"] == 2
+
     def test_list_subjects_requires_auth(self, client: TestClient):
         resp = client.get("/api/subjects")
         assert resp.status_code == 401
@@ -291,6 +338,25 @@ class TestEnrollment:
         assert resp.status_code == 200
         assert resp.json()["enrolled_count"] == 0
 
+    def test_register_practice_user_auto_enrolls(self, client: TestClient):
+        admin_token = _register_and_login(client, role="admin")
+        client.post("/api/subjects/seed-defaults", headers=_auth(admin_token))
+
+        email = f"driver_{str(uuid.uuid4())[:8]}@ex.com"
+        resp = client.post("/api/users/register", json={
+            "email": email,
+            "password": "testpwd1",
+            "full_name": "Test Driver",
+            "role": "student",
+            "account_type": "practice",
+            "education_level": "DRIVING",
+        })
+        assert resp.status_code == 201, resp.text
+        token = resp.json()["access_token"]
+
+        subjects = client.get("/api/subjects", headers=_auth(token)).json()
+        assert subjects and all(s["enrolled"] for s in subjects)
+
     def test_enroll_multiple_subjects(self, client: TestClient):
         admin_token = _register_and_login(client, role="admin")
         ids = []
@@ -119,3 +119,28 @@ def test_unauthorized_access(client: TestClient):
     # Will return 401 Unauthorized due to missing token
     assert response.status_code == 401
 
+
+
+def test_decode_access_token_caches_valid_tokens_only():
+    """Valid tokens are decoded once; expired tokens are always rejected."""
+    from datetime import timedelta
+
+    from app.core.security import create_access_token, decode_access_token
+
+    token = create_access_token({"sub": "cached@ex.com"}, timedelta(minutes=5))
+    payload = decode_access_token(token)
+    assert payload["sub"] == "cached@ex.com"
+    assert decode_access_token(token) is payload
+
+    expired = create_access_token({"sub": "cached@ex.com"}, timedelta(seconds=-1))
+    assert decode_access_token(expired) is None
+
+
+def test_verify_password_rejects_unusable_input():
+    """Over-long passwords and non-bcrypt hashes fail without raising."""
+    from app.core.security import hash_password, verify_password
+
+    hashed = hash_password("pwd1")
+    assert verify_password("pwd1", hashed)
+    assert not verify_password("x" * 73, hashed)
+    assert not verify_password("pwd1", "not-a-bcrypt-hash")
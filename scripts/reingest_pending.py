@@ -36,12 +36,13 @@ if not DATABASE_URL:
 parser = argparse.ArgumentParser(description="Re-ingest documents")
 parser.add_argument("--failed", action="store_true", help="Include FAILED documents")
 parser.add_argument("--all", action="store_true", help="Include all non-COMPLETED documents")
+parser.add_argument("--batch-size", type=int, default=None, help="Documents per queued task")
 args = parser.parse_args()
 
 print("Connecting to DB...")
 
 from app.db.models import Document, IngestionStatusEnum
-from app.tasks import ingest_document
+from app.tasks import INGEST_BATCH_SIZE, ingest_document_batch
 
 statuses = [IngestionStatusEnum.PENDING]
 if args.failed or args.all:
@@ -72,10 +73,17 @@ with Session(engine) as db:
         print("Aborted.")
         sys.exit(0)
 
-    for d in docs:
-        print(f"\n→ Triggering ingest for {d.filename}...")
+    # Fixed-size batch tasks instead of one task per document: per-task
+    # broker overhead adds up over hundreds of documents, while small
+    # slices still spread across workers and finish well inside the
+    # broker's visibility timeout.
+    batch_size = max(1, args.batch_size or INGEST_BATCH_SIZE)
+    items = [(str(d.id), d.file_path) for d in docs]
+    print(f"\n→ Triggering ingest for {len(docs)} document(s) in batches of {batch_size}...")
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
         try:
-            result = ingest_document.delay(str(d.id), d.file_path)
-            print(f"   ✅ Queued: {result}")
+            result = ingest_document_batch.apply_async(args=[batch])
+            print(f"   ✅ Queued {len(batch)} document(s): {result}")
         except Exception as e:
-            print(f"   ❌ Error: {e}")
+            print(f"   ❌ Error queuing {len(batch)} document(s): {e}")